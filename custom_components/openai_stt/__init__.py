@@ -4,31 +4,74 @@ from __future__ import annotations
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.const import Platform
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN
+from .const import (
+    CONF_PROMPT,
+    CONF_ROUTER_ENTITIES,
+    CONF_ROUTER_POLICY,
+    CONF_TEMP,
+    DOMAIN,
+)
+from .services import async_setup_services
 
 PLATFORMS = [Platform.STT]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the OpenAI STT services."""
+    async_setup_services(hass)
+    return True
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up OpenAI STT from a config entry."""
+    # The STT platform stores the entry's engine here
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = entry.data
 
     # Wait for platform setup to complete before returning
     result = await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     if not result:
         return False
 
-    entry.async_on_unload(entry.add_update_listener(async_update_options))
+    reload_key = _reload_key(entry)
+
+    async def _async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Apply changed options in place, reloading only when required."""
+        if _reload_key(entry) != reload_key:
+            await hass.config_entries.async_reload(entry.entry_id)
+        else:
+            # Loaded with the platform, it pulls in numpy and the audio code
+            # pylint: disable-next=import-outside-toplevel
+            from .stt import async_apply_options
+
+            await async_apply_options(hass, entry)
+
+    entry.async_on_unload(entry.add_update_listener(_async_update_options))
     return True
 
-async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Handle options update."""
-    await hass.config_entries.async_reload(entry.entry_id)
+def _reload_key(entry: ConfigEntry) -> tuple:
+    """Return what can't change without a reload.
+
+    The credentials and connection settings are used by the clients, and
+    the router options decide which entities the entry has. The prompt and
+    temperature of entries set up before they were options are applied in
+    place like the options replacing them.
+    """
+    return (
+        {
+            key: value
+            for key, value in entry.data.items()
+            if key not in (CONF_PROMPT, CONF_TEMP)
+        },
+        entry.options.get(CONF_ROUTER_ENTITIES),
+        entry.options.get(CONF_ROUTER_POLICY),
+    )
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        hass.data[DOMAIN].pop(entry.entry_id, None)
     return unload_ok 
\ No newline at end of file
@@ -0,0 +1,392 @@
+"""Audio helpers for the OpenAI STT integration."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import io
+import struct
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from collections.abc import Buffer
+
+# Raw PCM as delivered by the voice pipeline: signed 16-bit little endian
+PCM_DTYPE = np.dtype("<i2")
+
+# Size of the header written by wav_header
+WAV_HEADER_SIZE = 44
+
+# Ten seconds of 16 kHz mono audio, the buffer doubles when it is exceeded
+PCM_BUFFER_INITIAL_SIZE = 320_000
+
+# Length of the windows compared when looking for a quiet point to split at
+SPLIT_WINDOW_SECONDS = 0.03
+# How far back from the size limit to look for a quiet point
+SPLIT_SEARCH_SECONDS = 10.0
+# Audio repeated at the start of each segment so no word is lost at a split
+SEGMENT_OVERLAP_SECONDS = 1.0
+# Most words of a segment's transcript that may repeat the previous one
+MAX_OVERLAP_WORDS = 12
+
+
+def whole_samples(pending: bytes, chunk: bytes) -> tuple[bytes, bytes]:
+    """Return the whole 16-bit samples of a chunk and the byte left over.
+
+    Chunks of a stream may split a sample, so the odd byte at the end of a
+    chunk is passed back as pending to be prepended to the next chunk.
+    """
+    if pending:
+        chunk = pending + chunk
+    if len(chunk) % 2:
+        return chunk[:-1], chunk[-1:]
+    return chunk, b""
+
+
+class PcmResampler:
+    """Resample a stream of mono 16-bit PCM chunks with linear interpolation.
+
+    The last sample of each chunk is carried over to the next one, so the
+    output is continuous across chunk boundaries. So is the odd byte of a
+    chunk ending in the middle of a sample.
+    """
+
+    def __init__(self, source_rate: int, target_rate: int) -> None:
+        """Initialize the resampler."""
+        self._step = source_rate / target_rate
+        self._passthrough = source_rate == target_rate
+        self._position = 0.0
+        self._last: np.ndarray | None = None
+        self._pending = b""
+
+    def process(self, chunk: bytes) -> bytes:
+        """Resample a chunk of PCM audio."""
+        if self._passthrough:
+            return chunk
+        chunk, self._pending = whole_samples(self._pending, chunk)
+        samples = np.frombuffer(chunk, dtype=PCM_DTYPE).astype(np.float32)
+        if self._last is not None:
+            samples = np.concatenate((self._last, samples))
+        if len(samples) == 0:
+            return b""
+
+        end = len(samples) - 1
+        positions = np.arange(self._position, end, self._step)
+        resampled = np.interp(positions, np.arange(len(samples)), samples)
+        # Position of the next output sample relative to the carried sample
+        self._position = (
+            positions[-1] + self._step - end if len(positions) else self._position - end
+        )
+        self._last = samples[-1:]
+        return np.round(resampled).astype(PCM_DTYPE).tobytes()
+
+
+class PcmBuffer:
+    """Growable buffer of streamed PCM audio that hands out snapshots.
+
+    Chunks are written into spare capacity, so a snapshot is a view of the
+    audio received so far rather than a copy. When the buffer has to grow,
+    the audio moves to a new buffer and earlier snapshots keep the old one.
+    """
+
+    def __init__(self, capacity: int = PCM_BUFFER_INITIAL_SIZE) -> None:
+        """Initialize the buffer."""
+        self._buffer = bytearray(capacity)
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Return the number of bytes received."""
+        return self._size
+
+    def append(self, chunk: bytes) -> None:
+        """Add a chunk of audio."""
+        end = self._size + len(chunk)
+        if end > len(self._buffer):
+            grown = bytearray(max(end, 2 * len(self._buffer)))
+            grown[: self._size] = memoryview(self._buffer)[: self._size]
+            self._buffer = grown
+        # Writing without changing the size is allowed while views exist
+        self._buffer[self._size : end] = chunk
+        self._size = end
+
+    def snapshot(self) -> memoryview:
+        """Return a read-only view of the audio received so far."""
+        return memoryview(self._buffer)[: self._size].toreadonly()
+
+
+class PauseDetector:
+    """Find pauses after speech from the level of PCM chunks as they arrive.
+
+    The odd byte of a chunk ending in the middle of a sample is measured
+    with the next chunk.
+    """
+
+    def __init__(
+        self, bytes_per_second: int, speech_level: float, pause_seconds: float
+    ) -> None:
+        """Initialize the detector for speech louder than speech_level dBFS."""
+        self._speech_rms = 32768 * 10 ** (speech_level / 20)
+        self._pause_bytes = int(bytes_per_second * pause_seconds)
+        self._quiet_bytes = 0
+        self._pending = b""
+        self.heard_speech = False
+        self.speaking = False
+
+    def add(self, chunk: bytes) -> bool:
+        """Measure a chunk, returning True if it completes a pause after speech."""
+        chunk, self._pending = whole_samples(self._pending, chunk)
+        samples = np.frombuffer(chunk, dtype=PCM_DTYPE).astype(np.float32)
+        level = float(np.sqrt(np.mean(np.square(samples)))) if len(samples) else 0.0
+        self.speaking = level >= self._speech_rms
+        if self.speaking:
+            self.heard_speech = True
+            self._quiet_bytes = 0
+            return False
+        if not self.heard_speech:
+            return False
+        quiet_before = self._quiet_bytes
+        self._quiet_bytes += len(chunk)
+        return quiet_before < self._pause_bytes <= self._quiet_bytes
+
+
+def wav_header(
+    channels: int, sample_width: int, sample_rate: int, data_size: int
+) -> bytes:
+    """Return a canonical WAV header for PCM audio."""
+    block_align = channels * sample_width
+    return b"".join(
+        (
+            b"RIFF",
+            struct.pack("<I", 36 + data_size),
+            b"WAVEfmt ",
+            struct.pack(
+                "<IHHIIHH",
+                16,
+                1,
+                channels,
+                sample_rate,
+                sample_rate * block_align,
+                block_align,
+                sample_width * 8,
+            ),
+            b"data",
+            struct.pack("<I", data_size),
+        )
+    )
+
+
+@dataclass(slots=True)
+class WavInfo:
+    """Format and location of the PCM data in a WAV file."""
+
+    channels: int
+    sample_width: int
+    sample_rate: int
+    data_offset: int
+    data_size: int
+
+    @property
+    def frame_size(self) -> int:
+        """Return the number of bytes per frame."""
+        return self.channels * self.sample_width
+
+    def seconds(self, size: int) -> float:
+        """Return the duration of a number of bytes of PCM data."""
+        return size / (self.sample_rate * self.frame_size)
+
+
+def parse_wav(buffer: Buffer) -> WavInfo:
+    """Parse the header of a PCM WAV file without reading its audio data.
+
+    Raises ValueError for anything but a complete header of integer PCM.
+    """
+    view = memoryview(buffer)
+    if len(view) < 12 or view[0:4] != b"RIFF" or view[8:12] != b"WAVE":
+        raise ValueError("Not a WAV file")
+
+    fmt: tuple[int, ...] | None = None
+    offset = 12
+    while offset + 8 <= len(view):
+        chunk_id = bytes(view[offset : offset + 4])
+        (chunk_size,) = struct.unpack_from("<I", view, offset + 4)
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            if chunk_size < 16 or body + 16 > len(view):
+                raise ValueError("Truncated WAV format chunk")
+            fmt = struct.unpack_from("<HHIIHH", view, body)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("WAV data before format chunk")
+            audio_format, channels, sample_rate, _, _, bits = fmt
+            if audio_format != 1:
+                raise ValueError("Only PCM WAV files are supported")
+            if not channels or not sample_rate or not bits or bits % 8:
+                raise ValueError(
+                    f"Unsupported WAV format: {channels} channels, "
+                    f"{sample_rate} Hz, {bits} bits"
+                )
+            return WavInfo(
+                channels,
+                bits // 8,
+                sample_rate,
+                body,
+                min(chunk_size, len(view) - body),
+            )
+        # Chunks are padded to an even size
+        offset = body + chunk_size + (chunk_size & 1)
+    raise ValueError("WAV file has no data chunk")
+
+
+class PcmWavReader(io.RawIOBase):
+    """Read-only file serving a WAV header followed by borrowed PCM data.
+
+    The PCM data is read straight from the given buffer, such as a memory
+    mapped file, instead of being copied into a new WAV file first.
+    """
+
+    def __init__(
+        self,
+        data: Buffer,
+        channels: int,
+        sample_width: int,
+        sample_rate: int,
+    ) -> None:
+        """Initialize the reader."""
+        self._data = memoryview(data).cast("B")
+        self._header = wav_header(channels, sample_width, sample_rate, len(self._data))
+        self._size = len(self._header) + len(self._data)
+        self._position = 0
+
+    def readable(self) -> bool:
+        """Return True, the reader is readable."""
+        return True
+
+    def seekable(self) -> bool:
+        """Return True, the reader is seekable."""
+        return True
+
+    def tell(self) -> int:
+        """Return the current position."""
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """Move to a new position."""
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self._size
+        self._position = max(0, min(offset, self._size))
+        return self._position
+
+    def readinto(self, buffer: Buffer) -> int:
+        """Read into a buffer, returning the number of bytes read."""
+        out = memoryview(buffer).cast("B")
+        written = 0
+        header_size = len(self._header)
+        while written < len(out) and self._position < self._size:
+            if self._position < header_size:
+                source = memoryview(self._header)[self._position :]
+            else:
+                source = self._data[self._position - header_size :]
+            count = min(len(source), len(out) - written)
+            out[written : written + count] = source[:count]
+            written += count
+            self._position += count
+        return written
+
+    def close(self) -> None:
+        """Release the borrowed buffer."""
+        self._data.release()
+        super().close()
+
+
+def frame_rms(samples: np.ndarray, window: int) -> np.ndarray:
+    """Return the RMS level of consecutive windows of mono samples."""
+    usable = len(samples) - len(samples) % window
+    frames = samples[:usable].astype(np.float32).reshape(-1, window)
+    return np.sqrt(np.mean(np.square(frames), axis=1))
+
+
+def find_split_points(
+    pcm: Buffer,
+    info: WavInfo,
+    max_frames: int,
+    search_seconds: float = SPLIT_SEARCH_SECONDS,
+) -> list[int]:
+    """Return frame offsets to split PCM audio into parts of at most max_frames.
+
+    Each split is placed in the quietest window of the last search_seconds
+    before the limit, so words are rarely cut in half.
+    """
+    if info.sample_width != 2:
+        raise ValueError("Only 16-bit audio can be split")
+    samples = np.frombuffer(pcm, dtype=PCM_DTYPE)
+    total_frames = len(samples) // info.channels
+    window = max(1, int(info.sample_rate * SPLIT_WINDOW_SECONDS))
+    search_frames = min(int(info.sample_rate * search_seconds), max_frames // 2)
+
+    splits: list[int] = []
+    start = 0
+    while total_frames - start > max_frames:
+        search_start = start + max_frames - search_frames
+        region = samples[
+            search_start * info.channels : (start + max_frames) * info.channels
+        ]
+        if info.channels > 1:
+            region = region.reshape(-1, info.channels)[:, 0]
+        levels = frame_rms(region, window)
+        split = (
+            search_start + int(np.argmin(levels)) * window + window // 2
+            if len(levels)
+            else start + max_frames
+        )
+        splits.append(split)
+        start = split
+    return splits
+
+
+def segment_bounds(
+    pcm: Buffer,
+    info: WavInfo,
+    max_frames: int,
+    overlap_frames: int = 0,
+) -> list[tuple[int, int]]:
+    """Return the frame ranges of overlapping segments of at most max_frames.
+
+    Every segment after the first starts overlap_frames before the quiet
+    point the previous segment ended at.
+    """
+    total_frames = len(memoryview(pcm).cast("B")) // info.frame_size
+    splits = find_split_points(pcm, info, max_frames - overlap_frames)
+    return [
+        (max(0, start - overlap_frames), end)
+        for start, end in zip([0, *splits], [*splits, total_frames])
+    ]
+
+
+def _normalize_word(word: str) -> str:
+    """Return a word without case and surrounding punctuation."""
+    return word.strip(".,!?;:\"'()").casefold()
+
+
+def merge_overlapping_transcripts(texts: list[str]) -> str:
+    """Join the transcripts of overlapping segments.
+
+    Words at the start of a transcript that repeat the end of the previous
+    one were spoken in the overlap and are dropped.
+    """
+    words: list[str] = []
+    for text in texts:
+        new_words = text.split()
+        tail = [_normalize_word(word) for word in words[-MAX_OVERLAP_WORDS:]]
+        head = [_normalize_word(word) for word in new_words[:MAX_OVERLAP_WORDS]]
+        overlap = next(
+            (
+                count
+                for count in range(min(len(tail), len(head)), 0, -1)
+                if tail[-count:] == head[:count]
+            ),
+            0,
+        )
+        words.extend(new_words[overlap:])
+    return " ".join(words)
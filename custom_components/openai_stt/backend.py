@@ -0,0 +1,614 @@
+"""Transcription backends for the OpenAI STT engine."""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import asyncio
+import functools
+import importlib.util
+import io
+import itertools
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from types import ModuleType
+from typing import TYPE_CHECKING, Any
+
+from .const import (
+    DEFAULT_BASE_URL,
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_MODEL,
+    DEFAULT_TIMEOUT,
+    MODELS_CACHE_TTL,
+)
+from .key_pool import ApiKeyPool, PooledKey
+from .transcript import Transcript
+
+if TYPE_CHECKING:
+    from multiprocessing.sharedctypes import SynchronizedArray
+
+    import httpx
+    from openai import AsyncOpenAI
+
+_LOGGER = logging.getLogger(__name__)
+
+# (start, end, text) spans returned by the local worker process
+_Spans = list[tuple[float, float, str]]
+
+# Model loaded once per local worker process by _init_local_worker
+_LOCAL_MODEL: Any = None
+# Ids of jobs the parent process asked the local worker to stop, each in
+# the slot of its id modulo the number of slots
+_LOCAL_CANCELLED_JOBS: SynchronizedArray[int] | None = None
+LOCAL_CANCEL_SLOTS = 64
+
+# Model ids returned by /models, keyed by (base_url, api_key)
+_MODELS_CACHE: dict[tuple[str, str], tuple[float, list[str]]] = {}
+
+
+@dataclass(frozen=True, slots=True)
+class ModelCapabilities:
+    """What a transcription model supports."""
+
+    streaming: bool = False
+    translation: bool = False
+    response_formats: tuple[str, ...] = ("json", "text")
+
+
+# Keyed by model name; dated snapshots match on the name they start with
+MODEL_CAPABILITIES: dict[str, ModelCapabilities] = {
+    "whisper-1": ModelCapabilities(
+        translation=True,
+        response_formats=("json", "text", "srt", "verbose_json", "vtt"),
+    ),
+    "gpt-4o-transcribe": ModelCapabilities(streaming=True),
+    "gpt-4o-mini-transcribe": ModelCapabilities(streaming=True),
+}
+
+
+@functools.lru_cache(maxsize=32)
+def get_model_capabilities(model: str) -> ModelCapabilities:
+    """Return the capabilities of a model.
+
+    Unknown models, like those of self-hosted servers, are treated as
+    Whisper models.
+    """
+    if (capabilities := MODEL_CAPABILITIES.get(model)) is not None:
+        return capabilities
+    # Longest name first so gpt-4o-mini-transcribe wins over gpt-4o
+    for name in sorted(MODEL_CAPABILITIES, key=len, reverse=True):
+        if model.startswith(name):
+            return MODEL_CAPABILITIES[name]
+    return MODEL_CAPABILITIES[DEFAULT_MODEL]
+
+
+def _avg_logprob(logprobs: list[Any] | None) -> float | None:
+    """Return the average log probability of the tokens of a transcript."""
+    if not logprobs:
+        return None
+    return sum(logprob.logprob for logprob in logprobs) / len(logprobs)
+
+
+def import_openai() -> ModuleType:
+    """Import the OpenAI SDK.
+
+    The SDK and its pydantic models take a while to import, so it is only
+    imported when a client is first needed, and never on the event loop.
+    """
+    return importlib.import_module("openai")
+
+
+# Self-hosted OpenAI compatible servers often don't check the key, but the
+# client refuses to start without one
+PLACEHOLDER_API_KEY = "no-key"
+
+
+async def async_get_models(
+    client: AsyncOpenAI, base_url: str, api_key: str
+) -> list[str]:
+    """Return the transcription models offered by an endpoint.
+
+    Results are cached for MODELS_CACHE_TTL seconds per endpoint and key.
+    """
+    cache_key = (base_url, api_key)
+    if (cached := _MODELS_CACHE.get(cache_key)) and (
+        time.monotonic() - cached[0] < MODELS_CACHE_TTL
+    ):
+        return cached[1]
+
+    model_ids = sorted([model.id async for model in client.models.list()])
+    # The public API lists chat and embedding models too; self-hosted
+    # servers usually only list what they can transcribe with
+    models = [
+        model_id
+        for model_id in model_ids
+        if "whisper" in model_id or "transcribe" in model_id
+    ] or model_ids
+    _MODELS_CACHE[cache_key] = (time.monotonic(), models)
+    return models
+
+
+class STTBackend(ABC):
+    """A transcription backend.
+
+    Backends run on the event loop and hand blocking work to threads or
+    processes themselves. A cancelled transcription stops its work before
+    it finishes: it raises CancelledError once the work stopped, or returns
+    the transcript if the work couldn't be stopped and ran to completion.
+    """
+
+    @abstractmethod
+    async def async_transcribe(
+        self,
+        audio_file: tuple,
+        model: str,
+        language: str | None,
+        prompt: str,
+        temperature: float,
+        *,
+        on_partial: Callable[[str], None] | None = None,
+        timestamp_granularities: list[str] | None = None,
+        translate: bool = False,
+        detect_language: bool = False,
+        confidence: bool = False,
+    ) -> Transcript:
+        """Transcribe a ``(name, file, content_type)`` audio file to text.
+
+        Backends that can stream call ``on_partial`` with the text
+        transcribed so far as it arrives. ``timestamp_granularities`` asks
+        for "segment" and/or "word" timings where the model supports them.
+        ``translate`` returns an English translation instead, and
+        ``detect_language`` asks for the spoken language and the average
+        log probability of the transcript where the model reports them.
+        ``confidence`` only asks for the average log probability.
+        """
+
+    def reports_language(self, model: str) -> bool:
+        """Return if transcripts of a model report the spoken language."""
+        return "verbose_json" in get_model_capabilities(model).response_formats
+
+    def warm_up(self) -> None:
+        """Prepare the backend so the first transcription is fast.
+
+        Called from an executor thread, it may block.
+        """
+
+    async def async_close(self) -> None:
+        """Release resources held by the backend."""
+
+
+class OpenAIBackend(STTBackend):
+    """Backend using the OpenAI audio transcription API.
+
+    Works with any OpenAI compatible endpoint. A single connection pool is
+    shared by all requests of the backend, so cancelling a transcription
+    aborts its upload or response right away.
+
+    With several API keys, each key has its own client on the shared
+    connection pool, and every request goes to the key the pool picks from
+    the rate limit headers of earlier responses. A request rate limited on
+    one key is retried on another, once per key.
+    """
+
+    def __init__(
+        self,
+        api_key: str | None,
+        base_url: str = DEFAULT_BASE_URL,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        extra_keys: list[dict[str, str | None]] | None = None,
+    ) -> None:
+        """Initialize the OpenAI backend."""
+        keys = [PooledKey(api_key or PLACEHOLDER_API_KEY)]
+        for extra_key in extra_keys or ():
+            if all(key.api_key != extra_key["api_key"] for key in keys):
+                keys.append(
+                    PooledKey(str(extra_key["api_key"]), extra_key.get("organization"))
+                )
+        self.pool = ApiKeyPool(keys)
+        self._base_url = base_url
+        self._timeout = timeout
+        self._max_connections = max_connections
+        self._http_client: httpx.AsyncClient | None = None
+        self._clients: dict[str, AsyncOpenAI] | None = None
+        self._client_lock = threading.Lock()
+
+    def _get_clients(self) -> dict[str, AsyncOpenAI]:
+        """Return the clients by API key, creating them on first use.
+
+        Importing the SDK and loading the SSL context block, so this is
+        called from an executor thread.
+        """
+        with self._client_lock:
+            if self._clients is None:
+                import httpx  # pylint: disable=import-outside-toplevel
+
+                openai = import_openai()
+                self._http_client = httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=self._max_connections,
+                        max_keepalive_connections=self._max_connections,
+                    ),
+                    timeout=self._timeout,
+                    event_hooks={"response": [self._async_on_response]},
+                )
+                self._clients = {
+                    key.api_key: openai.AsyncOpenAI(
+                        api_key=key.api_key,
+                        organization=key.organization,
+                        base_url=self._base_url,
+                        timeout=self._timeout,
+                        # A pool moves rate limited requests to other keys
+                        # itself, rather than retrying them on the same key
+                        **({"max_retries": 0} if len(self.pool) > 1 else {}),
+                        http_client=self._http_client,
+                    )
+                    for key in self.pool.keys
+                }
+            return self._clients
+
+    async def _async_get_clients(self) -> dict[str, AsyncOpenAI]:
+        """Return the clients, creating them in the executor on first use."""
+        if self._clients is not None:
+            return self._clients
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self._get_clients
+        )
+
+    async def _async_on_response(self, response: httpx.Response) -> None:
+        """Update the rate limits of the key that sent a request."""
+        authorization = response.request.headers.get("authorization", "")
+        if (key := self.pool.get(authorization.removeprefix("Bearer "))) is not None:
+            self.pool.update(key, response.headers)
+
+    def warm_up(self) -> None:
+        """Create the clients outside of the first request."""
+        self._get_clients()
+
+    async def async_transcribe(
+        self,
+        audio_file: tuple,
+        model: str,
+        language: str | None,
+        prompt: str,
+        temperature: float,
+        *,
+        on_partial: Callable[[str], None] | None = None,
+        timestamp_granularities: list[str] | None = None,
+        translate: bool = False,
+        detect_language: bool = False,
+        confidence: bool = False,
+    ) -> Transcript:
+        """Transcribe audio using OpenAI API, with the key the pool picks."""
+        clients = await self._async_get_clients()
+        rate_limit_error = import_openai().RateLimitError
+        attempt = 0
+        while True:
+            key = await self.pool.async_acquire()
+            try:
+                transcript = await self._async_request(
+                    clients[key.api_key],
+                    audio_file,
+                    model,
+                    language,
+                    prompt,
+                    temperature,
+                    on_partial=on_partial,
+                    timestamp_granularities=timestamp_granularities,
+                    translate=translate,
+                    detect_language=detect_language,
+                    confidence=confidence,
+                )
+            except rate_limit_error as err:
+                self.pool.throttle(key, err.response.headers)
+                if attempt >= len(self.pool) - 1:
+                    raise
+                attempt += 1
+                audio_file[1].seek(0)
+                continue
+            finally:
+                self.pool.release(key)
+            self.pool.succeeded(key)
+            return transcript
+
+    async def _async_request(
+        self,
+        client: AsyncOpenAI,
+        audio_file: tuple,
+        model: str,
+        language: str | None,
+        prompt: str,
+        temperature: float,
+        *,
+        on_partial: Callable[[str], None] | None,
+        timestamp_granularities: list[str] | None,
+        translate: bool,
+        detect_language: bool,
+        confidence: bool,
+    ) -> Transcript:
+        """Send a transcription request with a client."""
+        capabilities = get_model_capabilities(model)
+        if translate:
+            return await self._async_translate(
+                client, audio_file, model, prompt, temperature
+            )
+
+        if (
+            timestamp_granularities or detect_language or confidence
+        ) and "verbose_json" in capabilities.response_formats:
+            response = await client.audio.transcriptions.create(
+                model=model,
+                language=language,
+                prompt=prompt,
+                temperature=temperature,
+                response_format="verbose_json",
+                file=audio_file,
+                **(
+                    {"timestamp_granularities": timestamp_granularities}
+                    if timestamp_granularities
+                    else {}
+                ),
+            )
+            return Transcript.from_verbose_json(response)
+
+        if not capabilities.streaming:
+            response = await client.audio.transcriptions.create(
+                model=model,
+                language=language,
+                prompt=prompt,
+                temperature=temperature,
+                response_format="json",
+                file=audio_file,
+            )
+            return Transcript(response.text)
+
+        stream = await client.audio.transcriptions.create(
+            model=model,
+            language=language,
+            prompt=prompt,
+            temperature=temperature,
+            response_format="json",
+            file=audio_file,
+            stream=True,
+            **({"include": ["logprobs"]} if confidence else {}),
+        )
+        text = ""
+        try:
+            async for event in stream:
+                if event.type == "transcript.text.delta":
+                    text += event.delta
+                    if on_partial is not None:
+                        on_partial(text)
+                elif event.type == "transcript.text.done":
+                    # Don't wait for the server to close the stream
+                    return Transcript(
+                        event.text, avg_logprob=_avg_logprob(event.logprobs)
+                    )
+        finally:
+            await stream.close()
+        return Transcript(text)
+
+    @staticmethod
+    async def _async_translate(
+        client: AsyncOpenAI,
+        audio_file: tuple,
+        model: str,
+        prompt: str,
+        temperature: float,
+    ) -> Transcript:
+        """Translate audio to English using the OpenAI API.
+
+        The translation endpoint detects the spoken language itself. Models
+        that can't translate, like the streaming models, fall back to
+        whisper-1.
+        """
+        capabilities = get_model_capabilities(model)
+        if not capabilities.translation:
+            model = DEFAULT_MODEL
+            capabilities = get_model_capabilities(model)
+        if "verbose_json" in capabilities.response_formats:
+            response = await client.audio.translations.create(
+                model=model,
+                prompt=prompt,
+                temperature=temperature,
+                response_format="verbose_json",
+                file=audio_file,
+            )
+            return Transcript.from_verbose_json(response)
+        response = await client.audio.translations.create(
+            model=model,
+            prompt=prompt,
+            temperature=temperature,
+            response_format="json",
+            file=audio_file,
+        )
+        return Transcript(response.text)
+
+    async def async_close(self) -> None:
+        """Close the connection pool."""
+        self._clients = None
+        if self._http_client is not None:
+            http_client, self._http_client = self._http_client, None
+            await http_client.aclose()
+
+
+def _init_local_worker(
+    model: str, cpu_threads: int, cancelled_jobs: SynchronizedArray[int]
+) -> None:
+    """Load the Whisper model in the worker process."""
+    global _LOCAL_MODEL, _LOCAL_CANCELLED_JOBS  # pylint: disable=global-statement
+    _LOCAL_CANCELLED_JOBS = cancelled_jobs
+    # ctranslate2 reads the OpenMP thread limit when it is first imported
+    os.environ["OMP_NUM_THREADS"] = str(cpu_threads)
+    from faster_whisper import (  # pylint: disable=import-outside-toplevel
+        WhisperModel,
+    )
+
+    _LOCAL_MODEL = WhisperModel(
+        model,
+        device="cpu",
+        compute_type="int8",
+        cpu_threads=cpu_threads,
+        num_workers=1,
+    )
+
+
+def _local_warm_up() -> bool:
+    """Return once the worker process has loaded its model."""
+    return _LOCAL_MODEL is not None
+
+
+def _local_transcribe(
+    job_id: int,
+    wav_data: bytes,
+    language: str | None,
+    prompt: str,
+    temperature: float,
+    word_timestamps: bool,
+    task: str,
+) -> tuple[str, str, float, float | None, _Spans, _Spans] | None:
+    """Transcribe WAV audio with the worker's Whisper model.
+
+    Returns plain tuples, which are cheap to send back to the parent process.
+    faster-whisper decodes a segment at a time as they are iterated, so the
+    job stops between segments, returning None, once the parent cancels it.
+    """
+    segments, info = _LOCAL_MODEL.transcribe(
+        io.BytesIO(wav_data),
+        language=language,
+        initial_prompt=prompt or None,
+        temperature=temperature,
+        beam_size=1,
+        condition_on_previous_text=False,
+        word_timestamps=word_timestamps,
+        task=task,
+    )
+    segment_spans: _Spans = []
+    word_spans: _Spans = []
+    logprob_sum = 0.0
+    for segment in segments:
+        if (
+            _LOCAL_CANCELLED_JOBS is not None
+            and _LOCAL_CANCELLED_JOBS[job_id % LOCAL_CANCEL_SLOTS] == job_id
+        ):
+            return None
+        segment_spans.append((segment.start, segment.end, segment.text.strip()))
+        logprob_sum += segment.avg_logprob
+        for word in segment.words or ():
+            word_spans.append((word.start, word.end, word.word))
+    text = " ".join(text for _start, _end, text in segment_spans if text)
+    avg_logprob = logprob_sum / len(segment_spans) if segment_spans else None
+    return (
+        text,
+        info.language,
+        info.duration,
+        avg_logprob,
+        segment_spans,
+        word_spans,
+    )
+
+
+class LocalWhisperBackend(STTBackend):
+    """Backend running faster-whisper on the CPU in a dedicated process.
+
+    The model is quantized to int8 and loaded once when the worker process
+    starts, so it stays warm between requests without holding the GIL of
+    the Home Assistant process.
+    """
+
+    def __init__(self, model: str, cpu_threads: int) -> None:
+        """Initialize the local Whisper backend."""
+        self._model = model
+        self._cpu_threads = cpu_threads
+        self._executor: ProcessPoolExecutor | None = None
+        self._context = multiprocessing.get_context("spawn")
+        self._cancelled_jobs = self._context.Array("q", LOCAL_CANCEL_SLOTS)
+        self._job_ids = itertools.count(1)
+
+    @staticmethod
+    def is_available() -> bool:
+        """Return if faster-whisper is installed."""
+        return importlib.util.find_spec("faster_whisper") is not None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Return the worker process, starting it if needed."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=self._context,
+                initializer=_init_local_worker,
+                initargs=(self._model, self._cpu_threads, self._cancelled_jobs),
+            )
+        return self._executor
+
+    def reports_language(self, model: str) -> bool:
+        """Return True, faster-whisper always reports the spoken language."""
+        return True
+
+    def warm_up(self) -> None:
+        """Start the worker process and load the model."""
+        self._get_executor().submit(_local_warm_up).result()
+        _LOGGER.debug("Local Whisper model %s loaded", self._model)
+
+    async def async_transcribe(
+        self,
+        audio_file: tuple,
+        model: str,
+        language: str | None,
+        prompt: str,
+        temperature: float,
+        *,
+        on_partial: Callable[[str], None] | None = None,
+        timestamp_granularities: list[str] | None = None,
+        translate: bool = False,
+        detect_language: bool = False,
+        confidence: bool = False,
+    ) -> Transcript:
+        """Transcribe audio using the local Whisper model.
+
+        faster-whisper always reports the language and log probabilities,
+        so ``detect_language`` and ``confidence`` need no extra work. A
+        cancelled job that hasn't started is dropped, a running one is asked
+        to stop at its next segment.
+        """
+        _name, wav_stream, _content_type = audio_file
+        wav_stream.seek(0)
+        job_id = next(self._job_ids)
+        future = self._get_executor().submit(
+            _local_transcribe,
+            job_id,
+            wav_stream.read(),
+            language,
+            prompt,
+            temperature,
+            "word" in (timestamp_granularities or ()),
+            "translate" if translate else "transcribe",
+        )
+        try:
+            result = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            if future.cancelled():
+                raise
+            self._cancelled_jobs[job_id % LOCAL_CANCEL_SLOTS] = job_id
+            if (result := await asyncio.wrap_future(future)) is None:
+                raise
+
+        assert result is not None
+        text, detected_language, duration, avg_logprob, segments, words = result
+        transcript = Transcript(text, detected_language, duration, avg_logprob)
+        if timestamp_granularities:
+            for span in segments:
+                transcript.segments.append(*span)
+            for span in words:
+                transcript.words.append(*span)
+        return transcript
+
+    async def async_close(self) -> None:
+        """Stop the worker process."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,292 @@
+"""Batch transcription of recorded audio files."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+import glob
+import io
+import logging
+import mimetypes
+import mmap
+import os
+from typing import IO, Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from .audio import WAV_HEADER_SIZE, PcmWavReader, find_split_points, parse_wav
+from .const import (
+    EVENT_FILE_TRANSCRIBED,
+    EVENT_TRANSCRIBE_PROGRESS,
+    MAX_AUDIO_SIZE,
+)
+from .transcript import TimedSpans, Transcript
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class AudioPart:
+    """A part of an audio file small enough to be transcribed in one request."""
+
+    audio: AudioFile
+    index: int
+    file: IO[bytes]
+    start: float
+    end: float | None
+
+
+@dataclass(slots=True)
+class AudioSegment:
+    """The transcript of an audio part."""
+
+    start: float
+    end: float | None
+    transcript: Transcript
+
+
+class AudioFile:
+    """An audio file, memory mapped while its parts are being transcribed."""
+
+    def __init__(self, path: str) -> None:
+        """Open and map the file."""
+        self.path = path
+        self.parts: list[AudioPart] = []
+        self.segments: list[AudioSegment | None] = []
+        self.error: str | None = None
+        self._content_type: str | None = None
+        self._file = open(path, "rb")  # pylint: disable=consider-using-with
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self._file.close()
+            raise
+
+    @property
+    def name(self) -> str:
+        """Return the file name."""
+        return os.path.basename(self.path)
+
+    def split(self, max_size: int) -> None:
+        """Split the file into parts of at most max_size bytes.
+
+        Files within the limit are uploaded as they are, whatever their
+        format. Only PCM WAV files can be split. The parts read their audio
+        straight from the mapped file.
+        """
+        if len(self._mmap) <= max_size:
+            self._content_type = mimetypes.guess_type(self.path)[0]
+            self.parts = [AudioPart(self, 0, self._file, 0.0, None)]
+            return
+        if self._mmap[:4] != b"RIFF":
+            raise ValueError("Only WAV files can be split into smaller parts")
+
+        info = parse_wav(self._mmap)
+        data_size = info.data_size - info.data_size % info.frame_size
+        max_frames = (max_size - WAV_HEADER_SIZE) // info.frame_size
+        with memoryview(self._mmap) as view:
+            pcm = view[info.data_offset : info.data_offset + data_size]
+            total_frames = data_size // info.frame_size
+            bounds = [0, *find_split_points(pcm, info, max_frames), total_frames]
+            for index, (start, end) in enumerate(zip(bounds, bounds[1:])):
+                reader = PcmWavReader(
+                    pcm[start * info.frame_size : end * info.frame_size],
+                    info.channels,
+                    info.sample_width,
+                    info.sample_rate,
+                )
+                self.parts.append(
+                    AudioPart(
+                        self,
+                        index,
+                        reader,
+                        start / info.sample_rate,
+                        end / info.sample_rate,
+                    )
+                )
+            pcm.release()
+
+    def file_tuple(self, part: AudioPart) -> tuple[str, IO[bytes], str | None]:
+        """Return the file of a part in the form expected by the engine.
+
+        The part is read into memory here, in the executor, since the engine
+        uploads it from the event loop, where reading the file or the mapping
+        could block on disk access. Each worker holds at most one part.
+        """
+        size = part.file.seek(0, io.SEEK_END)
+        part.file.seek(0)
+        audio = io.BytesIO(part.file.read(size))
+        if part.file is self._file:
+            return (self.name, audio, self._content_type)
+        return (f"{self.name}.{part.index}.wav", audio, "audio/wav")
+
+    def close(self) -> None:
+        """Release the parts and unmap the file."""
+        for part in self.parts:
+            if part.file is not self._file:
+                part.file.close()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # An abandoned upload thread still reads from the mapping, it is
+            # unmapped when that thread lets go of it
+            _LOGGER.debug("Deferring unmap of %s", self.path)
+        self._file.close()
+
+
+def _resolve_paths(hass: HomeAssistant, patterns: list[str]) -> list[str]:
+    """Expand globs and check the files may be read."""
+    paths: dict[str, None] = {}
+    for pattern in patterns:
+        matches = (
+            sorted(glob.glob(pattern, recursive=True))
+            if glob.has_magic(pattern)
+            else [pattern]
+        )
+        for path in matches:
+            if not hass.config.is_allowed_path(path):
+                raise HomeAssistantError(f"Access to {path} is not allowed")
+            if not os.path.isfile(path):
+                raise HomeAssistantError(f"{path} is not a file")
+            paths[path] = None
+    return list(paths)
+
+
+def _open_file(path: str) -> AudioFile:
+    """Open an audio file and split it into parts."""
+    audio = AudioFile(path)
+    try:
+        audio.split(MAX_AUDIO_SIZE)
+    except BaseException:
+        audio.close()
+        raise
+    return audio
+
+
+async def async_transcribe_files(
+    hass: HomeAssistant,
+    transcribe: Callable[[tuple, str | None], Awaitable[Transcript]],
+    patterns: list[str],
+    language: str | None,
+    concurrency: int,
+) -> list[dict[str, Any]]:
+    """Transcribe audio files through a bounded pool of workers.
+
+    ``transcribe`` is a coroutine function taking a file tuple and a language
+    and returning a Transcript.
+    Files are opened and split while earlier parts are being transcribed,
+    so at most ``concurrency`` parts are queued ahead of the workers.
+    """
+    paths = await hass.async_add_executor_job(_resolve_paths, hass, patterns)
+    results: dict[str, AudioFile | str] = {}
+    pending: dict[AudioFile, int] = {}
+    queue: asyncio.Queue[AudioPart | None] = asyncio.Queue(maxsize=concurrency)
+    files_done = 0
+
+    def _finish(audio: AudioFile) -> None:
+        """Close a file once all of its parts are done."""
+        nonlocal files_done
+        pending[audio] -= 1
+        if pending[audio]:
+            return
+        del pending[audio]
+        audio.close()
+        files_done += 1
+        hass.bus.async_fire(EVENT_FILE_TRANSCRIBED, _file_result(audio))
+
+    async def _async_produce() -> None:
+        for path in paths:
+            try:
+                audio = await hass.async_add_executor_job(_open_file, path)
+            except (OSError, ValueError) as err:
+                _LOGGER.error("Error opening %s: %s", path, err)
+                results[path] = str(err)
+                continue
+            results[path] = audio
+            audio.segments = [None] * len(audio.parts)
+            pending[audio] = len(audio.parts)
+            for part in audio.parts:
+                await queue.put(part)
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def _async_work() -> None:
+        while (part := await queue.get()) is not None:
+            audio = part.audio
+            try:
+                if audio.error is None:
+                    file = await hass.async_add_executor_job(audio.file_tuple, part)
+                    transcript = await transcribe(file, language)
+                    audio.segments[part.index] = AudioSegment(
+                        part.start, part.end, transcript
+                    )
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.error("Error transcribing %s: %s", audio.path, err)
+                audio.error = str(err)
+            _finish(audio)
+            hass.bus.async_fire(
+                EVENT_TRANSCRIBE_PROGRESS,
+                {
+                    "path": audio.path,
+                    "part": part.index + 1,
+                    "parts": len(audio.parts),
+                    "files_done": files_done,
+                    "files": len(paths),
+                },
+            )
+
+    try:
+        async with asyncio.TaskGroup() as group:
+            group.create_task(_async_produce())
+            for _ in range(concurrency):
+                group.create_task(_async_work())
+    finally:
+        for audio in pending:
+            audio.close()
+
+    return [
+        (
+            _file_result(result)
+            if isinstance(result, AudioFile)
+            else {"path": path, "error": result}
+        )
+        for path, result in results.items()
+    ]
+
+
+def _file_result(audio: AudioFile) -> dict[str, Any]:
+    """Return the transcription result of a file.
+
+    Timestamps of each part are shifted by the start of the part. Parts
+    transcribed without timestamps are reported as a single segment.
+    """
+    if audio.error is not None:
+        return {"path": audio.path, "error": audio.error}
+    segments = TimedSpans()
+    words = TimedSpans()
+    texts: list[str] = []
+    for segment in audio.segments:
+        if segment is None:
+            continue
+        transcript = segment.transcript
+        text = transcript.text.strip()
+        if text:
+            texts.append(text)
+        if transcript.segments:
+            segments.extend(transcript.segments, segment.start)
+        else:
+            segments.append(
+                segment.start,
+                segment.end if segment.end is not None else transcript.duration or 0.0,
+                text,
+            )
+        words.extend(transcript.words, segment.start)
+    result: dict[str, Any] = {
+        "path": audio.path,
+        "text": " ".join(texts),
+        "segments": segments.as_list(),
+    }
+    if words:
+        result["words"] = words.as_list()
+    return result
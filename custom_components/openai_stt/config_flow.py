@@ -3,11 +3,14 @@ from __future__ import annotations
 
 import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
-from openai import OpenAI, AsyncOpenAI
+from homeassistant.helpers.httpx_client import get_async_client
 from homeassistant.helpers.selector import (
+    BooleanSelector,
+    EntitySelector,
+    EntitySelectorConfig,
     TextSelector,
     TextSelectorConfig,
     SelectSelector,
@@ -18,16 +21,72 @@ from homeassistant.helpers.selector import (
 import logging
 from typing import Any
 
+from .backend import (
+    LocalWhisperBackend,
+    PLACEHOLDER_API_KEY,
+    async_get_models,
+    import_openai,
+)
+from .key_pool import parse_api_keys
 from .const import (
     DOMAIN,
+    BACKEND_LOCAL,
+    BACKENDS,
     CONF_API_KEY,
+    CONF_API_KEYS,
+    CONF_BACKEND,
+    CONF_BASE_URL,
+    CONF_CPU_THREADS,
+    CONF_DETECT_LANGUAGE,
+    CONF_DSP_WORKERS,
+    CONF_FAST_MODEL,
+    CONF_GATE_MAX_CLIPPING,
+    CONF_GATE_MIN_LEVEL,
+    CONF_GATE_MIN_SPEECH_RATIO,
+    CONF_LOCAL_MODEL,
+    CONF_MAX_CONNECTIONS,
     CONF_MODEL,
+    CONF_MODEL_ROUTING,
     CONF_PROMPT,
+    CONF_PROMPT_CONTEXT,
+    CONF_REALTIME,
+    CONF_RECORD_SESSIONS,
+    CONF_ROUTER_ENTITIES,
+    CONF_ROUTER_POLICY,
+    CONF_ROUTING_LATENCY_TARGET,
+    CONF_ROUTING_MAX_LOAD,
+    CONF_ROUTING_SHORT_CLIP,
+    CONF_SPECULATIVE,
+    CONF_SPECULATIVE_PAUSE,
+    CONF_SPEECH_GATE,
     CONF_TEMP,
+    CONF_TIMEOUT,
+    CONF_TIMESTAMP_GRANULARITIES,
+    CONF_TRANSLATE,
+    DEFAULT_BACKEND,
+    DEFAULT_BASE_URL,
+    DEFAULT_CPU_THREADS,
+    DEFAULT_DSP_WORKERS,
+    DEFAULT_FAST_MODEL,
+    DEFAULT_GATE_MAX_CLIPPING,
+    DEFAULT_GATE_MIN_LEVEL,
+    DEFAULT_GATE_MIN_SPEECH_RATIO,
+    DEFAULT_LOCAL_MODEL,
+    DEFAULT_MAX_CONNECTIONS,
     DEFAULT_MODEL,
     DEFAULT_PROMPT,
+    DEFAULT_ROUTER_POLICY,
+    DEFAULT_ROUTING_LATENCY_TARGET,
+    DEFAULT_ROUTING_MAX_LOAD,
+    DEFAULT_ROUTING_SHORT_CLIP,
+    DEFAULT_SPECULATIVE_PAUSE,
     DEFAULT_TEMP,
+    DEFAULT_TIMEOUT,
+    MAX_DSP_WORKERS,
+    ROUTER_POLICIES,
+    SUPPORTED_LOCAL_MODELS,
     SUPPORTED_MODELS,
+    TIMESTAMP_GRANULARITIES,
     TITLE,
 )
 
@@ -35,16 +94,60 @@ _LOGGER = logging.getLogger(__name__)
 
 STEP_USER_DATA_SCHEMA = vol.Schema(
     {
-        vol.Required(CONF_API_KEY): TextSelector(
+        vol.Optional(CONF_BACKEND, default=DEFAULT_BACKEND): SelectSelector(
+            SelectSelectorConfig(
+                options=BACKENDS,
+                mode="dropdown",
+                translation_key="backend",
+            )
+        ),
+        vol.Optional(CONF_API_KEY): TextSelector(
             TextSelectorConfig(type="password")
         ),
-        vol.Optional(CONF_MODEL, default=DEFAULT_MODEL): SelectSelector(
+        vol.Optional(CONF_API_KEYS): TextSelector(
+            TextSelectorConfig(multiline=True)
+        ),
+        vol.Optional(CONF_BASE_URL, default=DEFAULT_BASE_URL): TextSelector(
+            TextSelectorConfig(type="url")
+        ),
+        vol.Optional(CONF_TIMEOUT, default=DEFAULT_TIMEOUT): NumberSelector(
+            NumberSelectorConfig(
+                min=1,
+                max=300,
+                step=1,
+                mode="box",
+                unit_of_measurement="s",
+            )
+        ),
+        vol.Optional(
+            CONF_MAX_CONNECTIONS, default=DEFAULT_MAX_CONNECTIONS
+        ): NumberSelector(
+            NumberSelectorConfig(
+                min=1,
+                max=32,
+                step=1,
+                mode="box",
+            )
+        ),
+        vol.Optional(CONF_LOCAL_MODEL, default=DEFAULT_LOCAL_MODEL): SelectSelector(
             SelectSelectorConfig(
-                options=SUPPORTED_MODELS,
+                options=SUPPORTED_LOCAL_MODELS,
                 mode="dropdown",
-                translation_key="model",
             )
         ),
+        vol.Optional(CONF_CPU_THREADS, default=DEFAULT_CPU_THREADS): NumberSelector(
+            NumberSelectorConfig(
+                min=1,
+                max=16,
+                step=1,
+                mode="box",
+            )
+        ),
+    }
+)
+
+STEP_MODEL_DATA_SCHEMA = vol.Schema(
+    {
         vol.Optional(CONF_PROMPT, default=DEFAULT_PROMPT): TextSelector(
             TextSelectorConfig(multiline=True)
         ),
@@ -64,14 +167,46 @@ class OpenAISTTConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    def __init__(self) -> None:
+        """Initialize the config flow."""
+        self._data: dict[str, Any] = {}
+        self._models: list[str] = SUPPORTED_MODELS
+
     async def async_validate_input(self, user_input: dict[str, Any]) -> None:
         """Validate the user input allows us to connect."""
+        if user_input[CONF_BACKEND] == BACKEND_LOCAL:
+            if not LocalWhisperBackend.is_available():
+                raise LocalBackendUnavailable
+            return
+        base_url = user_input[CONF_BASE_URL]
+        api_key = user_input.get(CONF_API_KEY)
+        if not api_key:
+            # Only self-hosted endpoints may be used without a key
+            if base_url == DEFAULT_BASE_URL:
+                raise InvalidAuth
+            api_key = PLACEHOLDER_API_KEY
+        extra_keys = parse_api_keys(user_input.get(CONF_API_KEYS, ""))
         try:
-            client = AsyncOpenAI(api_key=user_input[CONF_API_KEY])
-            await client.models.list()
+            openai = await self.hass.async_add_executor_job(import_openai)
+            client = openai.AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                http_client=get_async_client(self.hass),
+            )
+            self._models = (
+                await async_get_models(client, base_url, api_key) or SUPPORTED_MODELS
+            )
+            for extra_key in extra_keys:
+                await openai.AsyncOpenAI(
+                    api_key=extra_key["api_key"],
+                    organization=extra_key["organization"],
+                    base_url=base_url,
+                    http_client=get_async_client(self.hass),
+                ).models.list()
         except Exception as ex:
             _LOGGER.error("Error validating API key: %s", str(ex))
             raise CannotConnect from ex
+        user_input[CONF_API_KEYS] = extra_keys
 
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
@@ -84,16 +219,16 @@ class OpenAISTTConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 await self.async_validate_input(user_input)
             except CannotConnect:
                 errors["base"] = "cannot_connect"
+            except InvalidAuth:
+                errors["base"] = "invalid_auth"
+            except LocalBackendUnavailable:
+                errors["base"] = "local_backend_unavailable"
             except Exception as ex:  # pylint: disable=broad-except
                 _LOGGER.exception("Unexpected exception: %s", ex)
                 errors["base"] = "unknown"
             else:
-                await self.async_set_unique_id(user_input[CONF_MODEL])
-                self._abort_if_unique_id_configured()
-                return self.async_create_entry(
-                    title=f"{TITLE} ({user_input[CONF_MODEL]})",
-                    data=user_input,
-                )
+                self._data = user_input
+                return await self.async_step_model()
 
         return self.async_show_form(
             step_id="user",
@@ -101,9 +236,223 @@ class OpenAISTTConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             errors=errors,
         )
 
+    async def async_step_model(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Handle the model and transcription settings step."""
+        local = self._data[CONF_BACKEND] == BACKEND_LOCAL
+
+        if user_input is not None:
+            data = {**self._data, **user_input}
+            model = data[CONF_LOCAL_MODEL] if local else data[CONF_MODEL]
+            # Several entries may use a model, with other keys or settings
+            if local:
+                match = {CONF_BACKEND: BACKEND_LOCAL, CONF_LOCAL_MODEL: model}
+            else:
+                match = {CONF_BASE_URL: data[CONF_BASE_URL], CONF_MODEL: model}
+                if CONF_API_KEY in data:
+                    match[CONF_API_KEY] = data[CONF_API_KEY]
+            self._async_abort_entries_match(match)
+            return self.async_create_entry(
+                title=f"{TITLE} ({model})",
+                data=data,
+            )
+
+        schema = STEP_MODEL_DATA_SCHEMA
+        if not local:
+            default_model = (
+                DEFAULT_MODEL if DEFAULT_MODEL in self._models else self._models[0]
+            )
+            schema = schema.extend(
+                {
+                    vol.Optional(CONF_MODEL, default=default_model): SelectSelector(
+                        SelectSelectorConfig(
+                            options=self._models,
+                            mode="dropdown",
+                            custom_value=True,
+                        )
+                    ),
+                }
+            )
+
+        return self.async_show_form(
+            step_id="model",
+            data_schema=schema,
+        )
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> OpenAISTTOptionsFlow:
+        """Create the options flow."""
+        return OpenAISTTOptionsFlow()
+
+class OpenAISTTOptionsFlow(config_entries.OptionsFlow):
+    """Handle OpenAI STT options."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        # Entries set up before the prompt and temperature were options
+        suggested_values = {
+            key: self.config_entry.data[key]
+            for key in (CONF_PROMPT, CONF_TEMP)
+            if key in self.config_entry.data
+        }
+        suggested_values.update(self.config_entry.options)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=self.add_suggested_values_to_schema(
+                STEP_MODEL_DATA_SCHEMA.extend(
+                    {
+                        vol.Optional(CONF_REALTIME, default=False): BooleanSelector(),
+                        vol.Optional(CONF_TRANSLATE, default=False): BooleanSelector(),
+                        vol.Optional(
+                            CONF_DETECT_LANGUAGE, default=False
+                        ): BooleanSelector(),
+                        vol.Optional(
+                            CONF_PROMPT_CONTEXT, default=False
+                        ): BooleanSelector(),
+                        vol.Optional(
+                            CONF_TIMESTAMP_GRANULARITIES, default=[]
+                        ): SelectSelector(
+                            SelectSelectorConfig(
+                                options=TIMESTAMP_GRANULARITIES,
+                                multiple=True,
+                                translation_key="timestamp_granularities",
+                            )
+                        ),
+                        vol.Optional(
+                            CONF_SPEECH_GATE, default=False
+                        ): BooleanSelector(),
+                        vol.Optional(
+                            CONF_GATE_MIN_LEVEL, default=DEFAULT_GATE_MIN_LEVEL
+                        ): NumberSelector(
+                            NumberSelectorConfig(
+                                min=-90,
+                                max=0,
+                                step=1,
+                                mode="box",
+                                unit_of_measurement="dBFS",
+                            )
+                        ),
+                        vol.Optional(
+                            CONF_GATE_MIN_SPEECH_RATIO,
+                            default=DEFAULT_GATE_MIN_SPEECH_RATIO,
+                        ): NumberSelector(
+                            NumberSelectorConfig(
+                                min=0,
+                                max=100,
+                                step=1,
+                                mode="box",
+                                unit_of_measurement="%",
+                            )
+                        ),
+                        vol.Optional(
+                            CONF_GATE_MAX_CLIPPING, default=DEFAULT_GATE_MAX_CLIPPING
+                        ): NumberSelector(
+                            NumberSelectorConfig(
+                                min=0,
+                                max=100,
+                                step=1,
+                                mode="box",
+                                unit_of_measurement="%",
+                            )
+                        ),
+                        vol.Optional(
+                            CONF_SPECULATIVE, default=False
+                        ): BooleanSelector(),
+                        vol.Optional(
+                            CONF_SPECULATIVE_PAUSE, default=DEFAULT_SPECULATIVE_PAUSE
+                        ): NumberSelector(
+                            NumberSelectorConfig(
+                                min=100,
+                                max=2000,
+                                step=50,
+                                mode="box",
+                                unit_of_measurement="ms",
+                            )
+                        ),
+                        vol.Optional(
+                            CONF_MODEL_ROUTING, default=False
+                        ): BooleanSelector(),
+                        vol.Optional(
+                            CONF_FAST_MODEL, default=DEFAULT_FAST_MODEL
+                        ): SelectSelector(
+                            SelectSelectorConfig(
+                                options=SUPPORTED_MODELS,
+                                mode="dropdown",
+                                custom_value=True,
+                            )
+                        ),
+                        vol.Optional(
+                            CONF_ROUTING_SHORT_CLIP, default=DEFAULT_ROUTING_SHORT_CLIP
+                        ): NumberSelector(
+                            NumberSelectorConfig(
+                                min=1,
+                                max=30,
+                                step=0.5,
+                                mode="box",
+                                unit_of_measurement="s",
+                            )
+                        ),
+                        vol.Optional(
+                            CONF_ROUTING_LATENCY_TARGET,
+                            default=DEFAULT_ROUTING_LATENCY_TARGET,
+                        ): NumberSelector(
+                            NumberSelectorConfig(
+                                min=250,
+                                max=10000,
+                                step=250,
+                                mode="box",
+                                unit_of_measurement="ms",
+                            )
+                        ),
+                        vol.Optional(
+                            CONF_ROUTING_MAX_LOAD, default=DEFAULT_ROUTING_MAX_LOAD
+                        ): NumberSelector(
+                            NumberSelectorConfig(min=1, max=16, step=1, mode="box")
+                        ),
+                        vol.Optional(
+                            CONF_DSP_WORKERS, default=DEFAULT_DSP_WORKERS
+                        ): NumberSelector(
+                            NumberSelectorConfig(
+                                min=0, max=MAX_DSP_WORKERS, step=1, mode="box"
+                            )
+                        ),
+                        vol.Optional(
+                            CONF_RECORD_SESSIONS, default=False
+                        ): BooleanSelector(),
+                        vol.Optional(CONF_ROUTER_ENTITIES, default=[]): EntitySelector(
+                            EntitySelectorConfig(domain="stt", multiple=True)
+                        ),
+                        vol.Optional(
+                            CONF_ROUTER_POLICY, default=DEFAULT_ROUTER_POLICY
+                        ): SelectSelector(
+                            SelectSelectorConfig(
+                                options=ROUTER_POLICIES,
+                                mode="dropdown",
+                                translation_key="router_policy",
+                            )
+                        ),
+                    }
+                ),
+                suggested_values,
+            ),
+        )
+
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
 
 class InvalidAuth(HomeAssistantError):
     """Error to indicate there is invalid auth."""
+
+class LocalBackendUnavailable(HomeAssistantError):
+    """Error to indicate faster-whisper is not installed."""
  
\ No newline at end of file
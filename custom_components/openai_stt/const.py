@@ -7,16 +7,122 @@ DOMAIN = "openai_stt"
 TITLE = "OpenAI STT"
 
 DEFAULT_MODEL = "whisper-1"
+DEFAULT_BACKEND = "openai"
+DEFAULT_LOCAL_MODEL = "base"
+DEFAULT_CPU_THREADS = 2
 DEFAULT_PROMPT = ""
 DEFAULT_TEMP = 0.0
 DEFAULT_TIMEOUT = 30
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+DEFAULT_MAX_CONNECTIONS = 4
+MODELS_CACHE_TTL = 3600
 MAX_AUDIO_SIZE = 25 * 1024 * 1024  # 25MB
+# Speech gate thresholds: dBFS, percent of windows, percent of samples
+DEFAULT_GATE_MIN_LEVEL = -50
+DEFAULT_GATE_MIN_SPEECH_RATIO = 5
+DEFAULT_GATE_MAX_CLIPPING = 10
+# Pause after speech that starts a speculative transcription, in ms
+DEFAULT_SPECULATIVE_PAUSE = 300
+# Model routing: clips shorter than this many seconds go to the fast model,
+# until the latency target in ms tunes it, and all clips do while this many
+# requests are in flight
+DEFAULT_FAST_MODEL = "gpt-4o-mini-transcribe"
+DEFAULT_ROUTING_SHORT_CLIP = 5
+DEFAULT_ROUTING_LATENCY_TARGET = 1500
+DEFAULT_ROUTING_MAX_LOAD = 3
+# Worker processes for audio processing, none to use Home Assistant's executor
+DEFAULT_DSP_WORKERS = 0
+MAX_DSP_WORKERS = 8
+
+EVENT_TRANSCRIPT = f"{DOMAIN}_transcript"
+EVENT_TRANSCRIPT_PARTIAL = f"{DOMAIN}_transcript_partial"
+EVENT_TRANSCRIBE_PROGRESS = f"{DOMAIN}_transcribe_progress"
+EVENT_FILE_TRANSCRIBED = f"{DOMAIN}_file_transcribed"
+
+SERVICE_TRANSCRIBE_FILES = "transcribe_files"
+ATTR_PATHS = "paths"
+ATTR_LANGUAGE = "language"
+ATTR_CONCURRENCY = "concurrency"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+DEFAULT_CONCURRENCY = 4
+MAX_CONCURRENCY = 16
+
+SERVICE_REPLAY_SESSIONS = "replay_sessions"
+ATTR_CORPUS = "corpus"
+ATTR_SATELLITES = "satellites"
+ATTR_SPEED = "speed"
+ATTR_LIMIT = "limit"
+DEFAULT_SATELLITES = 1
+MAX_SATELLITES = 32
+DEFAULT_SPEED = 1.0
+MAX_SPEED = 100.0
 
 CONF_API_KEY = "api_key"
+CONF_API_KEYS = "api_keys"
+CONF_BASE_URL = "base_url"
+CONF_TIMEOUT = "timeout"
+CONF_MAX_CONNECTIONS = "max_connections"
+CONF_BACKEND = "backend"
+CONF_LOCAL_MODEL = "local_model"
+CONF_CPU_THREADS = "cpu_threads"
 CONF_MODEL = "model"
 CONF_PROMPT = "prompt"
 CONF_TEMP = "temperature"
+CONF_REALTIME = "realtime"
+CONF_TIMESTAMP_GRANULARITIES = "timestamp_granularities"
+CONF_TRANSLATE = "translate"
+CONF_DETECT_LANGUAGE = "detect_language"
+CONF_PROMPT_CONTEXT = "prompt_context"
+CONF_SPEECH_GATE = "speech_gate"
+CONF_GATE_MIN_LEVEL = "gate_min_level"
+CONF_GATE_MIN_SPEECH_RATIO = "gate_min_speech_ratio"
+CONF_GATE_MAX_CLIPPING = "gate_max_clipping"
+CONF_SPECULATIVE = "speculative"
+CONF_SPECULATIVE_PAUSE = "speculative_pause"
+CONF_MODEL_ROUTING = "model_routing"
+CONF_FAST_MODEL = "fast_model"
+CONF_ROUTING_SHORT_CLIP = "routing_short_clip"
+CONF_ROUTING_LATENCY_TARGET = "routing_latency_target"
+CONF_ROUTING_MAX_LOAD = "routing_max_load"
+CONF_DSP_WORKERS = "dsp_workers"
+CONF_RECORD_SESSIONS = "record_sessions"
+CONF_ROUTER_ENTITIES = "router_entities"
+CONF_ROUTER_POLICY = "router_policy"
+
+ROUTER_POLICY_FALLBACK = "primary_fallback"
+ROUTER_POLICY_LATENCY = "latency"
+ROUTER_POLICY_RACE = "race"
+ROUTER_POLICIES = [
+    ROUTER_POLICY_FALLBACK,
+    ROUTER_POLICY_LATENCY,
+    ROUTER_POLICY_RACE,
+]
+DEFAULT_ROUTER_POLICY = ROUTER_POLICY_FALLBACK
+
+TIMESTAMP_GRANULARITIES = [
+    "segment",
+    "word",
+]
 
 SUPPORTED_MODELS = [
     "whisper-1",
-] 
\ No newline at end of file
+    "gpt-4o-transcribe",
+    "gpt-4o-mini-transcribe",
+] 
+
+BACKEND_OPENAI = "openai"
+BACKEND_LOCAL = "local"
+BACKENDS = [
+    BACKEND_OPENAI,
+    BACKEND_LOCAL,
+]
+
+# faster-whisper model sizes that run acceptably on a CPU
+SUPPORTED_LOCAL_MODELS = [
+    "tiny",
+    "tiny.en",
+    "base",
+    "base.en",
+    "small",
+    "small.en",
+]
\ No newline at end of file
@@ -0,0 +1,99 @@
+"""Rolling prompt context for the OpenAI STT integration."""
+from __future__ import annotations
+
+from collections import OrderedDict, deque
+import time
+
+# Whisper only looks at the last 224 tokens of a prompt
+PROMPT_MAX_TOKENS = 224
+# Transcripts kept per source, and sources kept at most
+CONTEXT_MAX_TRANSCRIPTS = 8
+CONTEXT_MAX_SOURCES = 32
+# A conversation is over once a source has been quiet for this long
+CONTEXT_IDLE_TIMEOUT = 300
+
+
+def estimate_tokens(text: str) -> int:
+    """Return a cheap estimate of the number of tokens in a text.
+
+    English averages about four characters per token, which is close enough
+    to keep a prompt within budget without loading a tokenizer.
+    """
+    return len(text) // 4 + 1
+
+
+class _SourceContext:
+    """Recent transcripts of one source."""
+
+    __slots__ = ("transcripts", "last_seen")
+
+    def __init__(self, max_transcripts: int) -> None:
+        """Initialize the context."""
+        self.transcripts: deque[str] = deque(maxlen=max_transcripts)
+        self.last_seen = time.monotonic()
+
+
+class PromptContext:
+    """Carry recent transcripts over into the prompt of the next request.
+
+    Whisper recognizes follow-up commands better when it knows what was said
+    before. Each source keeps a ring buffer of its latest transcripts, which
+    is dropped once the source has been idle for ``idle_timeout`` seconds,
+    and the least recently used sources are dropped beyond ``max_sources``.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = PROMPT_MAX_TOKENS,
+        max_transcripts: int = CONTEXT_MAX_TRANSCRIPTS,
+        max_sources: int = CONTEXT_MAX_SOURCES,
+        idle_timeout: float = CONTEXT_IDLE_TIMEOUT,
+    ) -> None:
+        """Initialize the context store."""
+        self._max_tokens = max_tokens
+        self._max_transcripts = max_transcripts
+        self._max_sources = max_sources
+        self._idle_timeout = idle_timeout
+        self._sources: OrderedDict[str, _SourceContext] = OrderedDict()
+
+    def _get(self, source: str) -> _SourceContext | None:
+        """Return the context of a source if it hasn't gone idle."""
+        context = self._sources.get(source)
+        if context is None:
+            return None
+        if time.monotonic() - context.last_seen > self._idle_timeout:
+            del self._sources[source]
+            return None
+        return context
+
+    def prompt(self, source: str, base_prompt: str) -> str:
+        """Return the base prompt followed by as much recent context as fits.
+
+        The newest transcripts are kept when the token budget runs out.
+        """
+        budget = self._max_tokens - (
+            estimate_tokens(base_prompt) if base_prompt else 0
+        )
+        parts: list[str] = []
+        if (context := self._get(source)) is not None:
+            for text in reversed(context.transcripts):
+                budget -= estimate_tokens(text)
+                if budget < 0:
+                    break
+                parts.append(text)
+        parts.reverse()
+        if base_prompt:
+            parts.insert(0, base_prompt)
+        return " ".join(parts)
+
+    def add(self, source: str, text: str) -> None:
+        """Remember the transcript of a request."""
+        if not (text := text.strip()):
+            return
+        if (context := self._get(source)) is None:
+            context = self._sources[source] = _SourceContext(self._max_transcripts)
+        context.transcripts.append(text)
+        context.last_seen = time.monotonic()
+        self._sources.move_to_end(source)
+        while len(self._sources) > self._max_sources:
+            self._sources.popitem(last=False)
@@ -0,0 +1,37 @@
+"""Diagnostics support for OpenAI STT."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .backend import OpenAIBackend
+from .const import CONF_API_KEY, CONF_API_KEYS, DOMAIN
+
+TO_REDACT = {CONF_API_KEY, CONF_API_KEYS}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    diagnostics: dict[str, Any] = {
+        "data": async_redact_data(dict(entry.data), TO_REDACT),
+        "options": dict(entry.options),
+    }
+    if (engine := hass.data.get(DOMAIN, {}).get(entry.entry_id)) is not None:
+        diagnostics["cancellation"] = engine.cancellation.as_dict()
+        diagnostics["speculation"] = dict(engine.speculation)
+        if engine.speech_gate is not None:
+            diagnostics["speech_gate"] = dict(engine.speech_gate.decisions)
+        if isinstance(engine.backend, OpenAIBackend):
+            diagnostics["api_keys"] = engine.backend.pool.as_dict()
+        if engine.recorder is not None:
+            diagnostics["session_recorder"] = engine.recorder.as_dict()
+        if engine.dsp is not None:
+            diagnostics["dsp"] = engine.dsp.as_dict()
+        if engine.router is not None:
+            diagnostics["model_routing"] = engine.router.as_dict()
+    return diagnostics
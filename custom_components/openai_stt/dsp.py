@@ -0,0 +1,203 @@
+"""Worker processes for CPU heavy audio processing."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import logging
+import multiprocessing
+from multiprocessing import resource_tracker, shared_memory
+import sys
+import time
+from typing import TYPE_CHECKING, Any, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Buffer
+
+    from .speech_gate import SpeechDetector
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# Jobs waiting for a worker, per worker, before callers have to wait
+DSP_QUEUE_PER_WORKER = 2
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to a shared memory segment without tracking it.
+
+    The process that created the segment tracks and unlinks it. Before
+    Python 3.13 attaching registers it with the resource tracker again, and
+    since workers share the tracker of the process that started them,
+    unregistering it afterwards would drop that process's registration too.
+    The registration is skipped instead, workers run one job at a time.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _run_job(
+    func: Callable[..., _T], name: str, size: int, args: tuple[Any, ...]
+) -> tuple[_T, float]:
+    """Run a job on audio in shared memory, returning its result and duration.
+
+    The segment is only attached here, the process that created it
+    unlinks it.
+    """
+    start = time.perf_counter()
+    segment = _attach(name)
+    try:
+        pcm = segment.buf[:size]
+        try:
+            result = func(pcm, *args)
+        finally:
+            pcm.release()
+    finally:
+        segment.close()
+    return result, time.perf_counter() - start
+
+
+def _ready() -> bool:
+    """Return once a worker process started."""
+    return True
+
+
+def measure_speech(pcm: Buffer, detector: SpeechDetector) -> SpeechDetector:
+    """Measure audio with a speech detector and return the detector."""
+    detector.add(pcm)
+    return detector
+
+
+@dataclass(slots=True)
+class DspStats:
+    """Counters of the jobs of a DSP pool.
+
+    Waiting jobs were held back because the queue was full. Utilization is
+    the share of the workers' time spent on jobs since the pool started.
+    """
+
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    waiting: int = 0
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+    busy_total: float = 0.0
+
+    def as_dict(self, workers: int, uptime: float) -> dict[str, Any]:
+        """Return the counters, with times in milliseconds."""
+        return {
+            "workers": workers,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "waiting": self.waiting,
+            "wait_avg_ms": (
+                round(self.wait_total / self.submitted * 1000, 1)
+                if self.submitted
+                else None
+            ),
+            "wait_max_ms": round(self.wait_max * 1000, 1),
+            "utilization": (
+                round(self.busy_total / (workers * uptime), 4) if uptime else None
+            ),
+        }
+
+
+class DspPool:
+    """Dedicated processes for audio processing, outside of the GIL.
+
+    Audio is copied once into a shared memory segment that the worker maps,
+    instead of being pickled through a pipe, and only the small result is
+    sent back. At most ``DSP_QUEUE_PER_WORKER`` jobs per worker are queued,
+    further callers wait for a free slot, so a burst of long recordings
+    holds back its callers rather than piling up audio in memory.
+    """
+
+    def __init__(self, workers: int) -> None:
+        """Initialize the pool."""
+        self.workers = workers
+        self.stats = DspStats()
+        self._slots = asyncio.Semaphore(workers * (1 + DSP_QUEUE_PER_WORKER))
+        self._context = multiprocessing.get_context("spawn")
+        self._executor: ProcessPoolExecutor | None = None
+        self._started = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Return the worker processes, starting them if needed."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=self._context
+            )
+            self._started = time.monotonic()
+        return self._executor
+
+    def warm_up(self) -> None:
+        """Start the worker processes."""
+        executor = self._get_executor()
+        for future in [executor.submit(_ready) for _ in range(self.workers)]:
+            future.result()
+        _LOGGER.debug("Started %s DSP worker processes", self.workers)
+
+    async def async_run(
+        self, func: Callable[..., _T], pcm: Buffer, *args: Any
+    ) -> _T:
+        """Run ``func(pcm, *args)`` in a worker process.
+
+        The function and its arguments are pickled, so they must be defined
+        at the top level of a module.
+        """
+        queued = time.monotonic()
+        self.stats.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.stats.waiting -= 1
+        try:
+            waited = time.monotonic() - queued
+            self.stats.submitted += 1
+            self.stats.wait_total += waited
+            self.stats.wait_max = max(self.stats.wait_max, waited)
+
+            view = memoryview(pcm).cast("B")
+            segment = shared_memory.SharedMemory(create=True, size=max(1, len(view)))
+            try:
+                segment.buf[: len(view)] = view
+                future = self._get_executor().submit(
+                    _run_job, func, segment.name, len(view), args
+                )
+                try:
+                    result, busy = await asyncio.wrap_future(future)
+                except Exception:
+                    self.stats.failed += 1
+                    raise
+            finally:
+                # A worker still running a cancelled job keeps its mapping
+                segment.close()
+                segment.unlink()
+        finally:
+            self._slots.release()
+        self.stats.completed += 1
+        self.stats.busy_total += busy
+        return result
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics for diagnostics."""
+        return self.stats.as_dict(
+            self.workers,
+            time.monotonic() - self._started if self._executor is not None else 0.0,
+        )
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,166 @@
+"""Rate limit aware pool of OpenAI API keys."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Mapping
+from dataclasses import dataclass
+import logging
+import math
+import re
+import time
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+# Pause of a key after a 429 response, doubled while it keeps happening
+BACKOFF_INITIAL = 1.0
+BACKOFF_MAX = 60.0
+
+# Durations of the x-ratelimit-reset-* headers, like "20ms", "1s" or "6m0s"
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(value: str | None) -> float | None:
+    """Return a rate limit reset duration in seconds."""
+    if not value:
+        return None
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def parse_api_keys(value: str) -> list[dict[str, str | None]]:
+    """Parse API keys given one per line, optionally followed by an organization."""
+    keys: list[dict[str, str | None]] = []
+    for line in value.splitlines():
+        if fields := line.split():
+            keys.append(
+                {
+                    "api_key": fields[0],
+                    "organization": fields[1] if len(fields) > 1 else None,
+                }
+            )
+    return keys
+
+
+def _header_int(headers: Mapping[str, str], name: str) -> int | None:
+    """Return an integer header, None if it is missing or malformed."""
+    try:
+        return int(headers[name])
+    except (KeyError, ValueError):
+        return None
+
+
+@dataclass(slots=True)
+class PooledKey:
+    """An API key with the rate limit state last reported for it."""
+
+    api_key: str
+    organization: str | None = None
+    remaining_requests: int | None = None
+    remaining_tokens: int | None = None
+    paused_until: float = 0.0
+    backoff: float = BACKOFF_INITIAL
+    in_flight: int = 0
+    requests: int = 0
+    throttled: int = 0
+
+    @property
+    def headroom(self) -> float:
+        """Return the requests the key may still send, infinite if unknown."""
+        if self.remaining_requests is None:
+            return math.inf
+        return self.remaining_requests - self.in_flight
+
+
+class ApiKeyPool:
+    """Spread requests over API keys by the rate limit headroom of each key.
+
+    Every response reports the requests and tokens a key has left in its
+    ``x-ratelimit-*`` headers. Requests go to the key with the most requests
+    left, counting those still in flight, and a key that ran out is paused
+    until its limit resets. A key answered with 429 is paused with its own
+    exponential backoff, while the other keys keep serving requests.
+    """
+
+    def __init__(self, keys: list[PooledKey]) -> None:
+        """Initialize the pool."""
+        self.keys = keys
+        self._by_api_key = {key.api_key: key for key in keys}
+
+    def __len__(self) -> int:
+        """Return the number of keys."""
+        return len(self.keys)
+
+    def get(self, api_key: str) -> PooledKey | None:
+        """Return the pooled key of an API key."""
+        return self._by_api_key.get(api_key)
+
+    async def async_acquire(self) -> PooledKey:
+        """Return the key with the most headroom, waiting while all are paused."""
+        while True:
+            now = time.monotonic()
+            available = [key for key in self.keys if key.paused_until <= now]
+            if available:
+                key = max(available, key=lambda key: (key.headroom, -key.in_flight))
+                key.in_flight += 1
+                key.requests += 1
+                return key
+            await asyncio.sleep(min(key.paused_until for key in self.keys) - now)
+
+    def release(self, key: PooledKey) -> None:
+        """Return a key after its request finished."""
+        key.in_flight -= 1
+
+    def update(self, key: PooledKey, headers: Mapping[str, str]) -> None:
+        """Update the rate limit state of a key from response headers."""
+        requests = _header_int(headers, "x-ratelimit-remaining-requests")
+        tokens = _header_int(headers, "x-ratelimit-remaining-tokens")
+        if requests is not None:
+            key.remaining_requests = requests
+        if tokens is not None:
+            key.remaining_tokens = tokens
+        for remaining, reset_header in (
+            (requests, "x-ratelimit-reset-requests"),
+            (tokens, "x-ratelimit-reset-tokens"),
+        ):
+            if remaining == 0 and (
+                reset := parse_duration(headers.get(reset_header))
+            ) is not None:
+                key.paused_until = max(key.paused_until, time.monotonic() + reset)
+
+    def succeeded(self, key: PooledKey) -> None:
+        """Reset the backoff of a key after a successful request."""
+        key.backoff = BACKOFF_INITIAL
+
+    def throttle(self, key: PooledKey, headers: Mapping[str, str]) -> None:
+        """Pause a key after it was rate limited."""
+        delay = max(key.backoff, parse_duration(headers.get("retry-after")) or 0.0)
+        key.paused_until = time.monotonic() + delay
+        key.backoff = min(key.backoff * 2, BACKOFF_MAX)
+        key.throttled += 1
+        _LOGGER.warning(
+            "OpenAI API key %s rate limited, pausing it for %.1f seconds",
+            self.keys.index(key) + 1,
+            delay,
+        )
+
+    def as_dict(self) -> list[dict[str, Any]]:
+        """Return the state of the keys for diagnostics, without the keys."""
+        now = time.monotonic()
+        return [
+            {
+                "remaining_requests": key.remaining_requests,
+                "remaining_tokens": key.remaining_tokens,
+                "paused_for": round(max(0.0, key.paused_until - now), 1),
+                "in_flight": key.in_flight,
+                "requests": key.requests,
+                "throttled": key.throttled,
+            }
+            for key in self.keys
+        ]
@@ -0,0 +1,120 @@
+"""Spoken language detection helpers for the OpenAI STT integration."""
+from __future__ import annotations
+
+import time
+
+# Languages as named in verbose_json responses of the OpenAI API, which
+# reports the detected language by name while requests take a code
+WHISPER_LANGUAGE_NAMES = {
+    "afrikaans": "af",
+    "arabic": "ar",
+    "armenian": "hy",
+    "azerbaijani": "az",
+    "belarusian": "be",
+    "bosnian": "bs",
+    "bulgarian": "bg",
+    "catalan": "ca",
+    "chinese": "zh",
+    "croatian": "hr",
+    "czech": "cs",
+    "danish": "da",
+    "dutch": "nl",
+    "english": "en",
+    "estonian": "et",
+    "finnish": "fi",
+    "french": "fr",
+    "galician": "gl",
+    "german": "de",
+    "greek": "el",
+    "hebrew": "he",
+    "hindi": "hi",
+    "hungarian": "hu",
+    "icelandic": "is",
+    "indonesian": "id",
+    "italian": "it",
+    "japanese": "ja",
+    "kannada": "kn",
+    "kazakh": "kk",
+    "korean": "ko",
+    "latvian": "lv",
+    "lithuanian": "lt",
+    "macedonian": "mk",
+    "malay": "ms",
+    "marathi": "mr",
+    "maori": "mi",
+    "nepali": "ne",
+    "norwegian": "no",
+    "persian": "fa",
+    "polish": "pl",
+    "portuguese": "pt",
+    "romanian": "ro",
+    "russian": "ru",
+    "serbian": "sr",
+    "slovak": "sk",
+    "slovenian": "sl",
+    "spanish": "es",
+    "swahili": "sw",
+    "swedish": "sv",
+    "tagalog": "tl",
+    "tamil": "ta",
+    "thai": "th",
+    "turkish": "tr",
+    "ukrainian": "uk",
+    "urdu": "ur",
+    "vietnamese": "vi",
+    "welsh": "cy",
+}
+_WHISPER_LANGUAGE_CODES = frozenset(WHISPER_LANGUAGE_NAMES.values())
+
+# How long a detected language is used as a hint without being confirmed
+LANGUAGE_CACHE_TTL = 3600
+# Average log probability below which a hinted transcript is redone with
+# detection, as Whisper forced into the wrong language scores poorly
+LANGUAGE_HINT_MIN_LOGPROB = -1.0
+
+
+def to_language_code(language: str | None) -> str | None:
+    """Return the code of a language reported by name or code.
+
+    Returns None for languages that can't be passed back as a hint.
+    """
+    if not language:
+        return None
+    language = language.casefold()
+    if language in _WHISPER_LANGUAGE_CODES:
+        return language
+    return WHISPER_LANGUAGE_NAMES.get(language)
+
+
+class LanguageDetectionCache:
+    """Remember the language last detected for each audio source.
+
+    Transcribing with a known language skips Whisper's detection pass, so
+    the last detected language of a source is used as a hint until it
+    expires or a poorly scoring transcript shows the language changed.
+    """
+
+    def __init__(self, ttl: float = LANGUAGE_CACHE_TTL) -> None:
+        """Initialize the cache."""
+        self._ttl = ttl
+        self._languages: dict[str, tuple[float, str]] = {}
+
+    def get(self, source: str) -> str | None:
+        """Return the language to hint for a source, if still fresh."""
+        if (entry := self._languages.get(source)) is None:
+            return None
+        detected_at, language = entry
+        if time.monotonic() - detected_at > self._ttl:
+            self._languages.pop(source, None)
+            return None
+        return language
+
+    def update(self, source: str, language: str | None) -> None:
+        """Record the language detected for a source."""
+        if (code := to_language_code(language)) is None:
+            return
+        self._languages[source] = (time.monotonic(), code)
+
+    def clear(self, source: str) -> None:
+        """Forget the language of a source."""
+        self._languages.pop(source, None)
@@ -0,0 +1,304 @@
+"""Realtime WebSocket transcription sessions for the OpenAI STT integration."""
+from __future__ import annotations
+
+import asyncio
+import base64
+from collections.abc import AsyncIterable, Callable
+import json
+import logging
+from typing import Any
+
+import aiohttp
+import async_timeout
+
+from .audio import PcmResampler
+from .backend import PLACEHOLDER_API_KEY
+
+_LOGGER = logging.getLogger(__name__)
+
+# The realtime API only accepts 24kHz mono 16-bit PCM
+REALTIME_SAMPLE_RATE = 24000
+REALTIME_POOL_SIZE = 2
+
+
+def realtime_url(base_url: str) -> str:
+    """Return the realtime transcription WebSocket URL of an API base URL."""
+    if base_url.startswith("https://"):
+        base_url = "wss://" + base_url.removeprefix("https://")
+    elif base_url.startswith("http://"):
+        base_url = "ws://" + base_url.removeprefix("http://")
+    return f"{base_url.rstrip('/')}/realtime?intent=transcription"
+
+
+class RealtimeTranscriptionSession:
+    """A realtime transcription session transcribing one utterance at a time.
+
+    Audio is appended while it is spoken. The server detects the end of
+    speech, commits the audio buffer and starts transcribing, so the
+    transcript is mostly done by the time the audio stream ends.
+    """
+
+    def __init__(
+        self,
+        http_session: aiohttp.ClientSession,
+        url: str,
+        api_key: str | None,
+        model: str,
+        prompt: str,
+    ) -> None:
+        """Initialize the realtime session."""
+        self._http_session = http_session
+        self._url = url
+        self._api_key = api_key or PLACEHOLDER_API_KEY
+        self._model = model
+        self._prompt = prompt
+        self._language: str | None = None
+        self._ws: aiohttp.ClientWebSocketResponse | None = None
+        self._receiver: asyncio.Task[None] | None = None
+        self._changed = asyncio.Event()
+        self._on_partial: Callable[[str], None] | None = None
+        # Transcripts of the utterance by item id, None while pending
+        self._items: dict[str, str | None] = {}
+        self._partials: dict[str, str] = {}
+        # Items of the last utterance, whose late events are ignored
+        self._previous_items: set[str] = set()
+        self._active = False
+        self._speech_pending = False
+        self._commit_pending = False
+
+    @property
+    def closed(self) -> bool:
+        """Return if the session can no longer be used."""
+        return self._ws is None or self._ws.closed
+
+    def _session_config(self) -> dict[str, Any]:
+        """Return the transcription session configuration."""
+        transcription: dict[str, Any] = {"model": self._model}
+        if self._prompt:
+            transcription["prompt"] = self._prompt
+        if self._language:
+            transcription["language"] = self._language
+        return {
+            "input_audio_format": "pcm16",
+            "input_audio_transcription": transcription,
+            "turn_detection": {"type": "server_vad"},
+        }
+
+    async def _async_send(self, event: dict[str, Any]) -> None:
+        """Send a client event."""
+        assert self._ws is not None
+        await self._ws.send_str(json.dumps(event))
+
+    async def async_connect(self) -> None:
+        """Open the WebSocket and configure the session."""
+        self._ws = await self._http_session.ws_connect(
+            self._url,
+            headers={
+                "Authorization": f"Bearer {self._api_key}",
+                "OpenAI-Beta": "realtime=v1",
+            },
+            heartbeat=30,
+        )
+        self._receiver = asyncio.get_running_loop().create_task(
+            self._async_receive()
+        )
+        await self._async_send(
+            {"type": "transcription_session.update", "session": self._session_config()}
+        )
+
+    async def async_close(self) -> None:
+        """Close the session."""
+        if self._ws is not None:
+            await self._ws.close()
+        if self._receiver is not None:
+            await self._receiver
+
+    def _notify(self) -> None:
+        """Wake up the utterance waiting for server events."""
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def _transcript(self) -> str:
+        """Return the transcript of the utterance so far."""
+        return " ".join(
+            text
+            for item_id, transcript in self._items.items()
+            if (text := transcript if transcript is not None else self._partials.get(item_id))
+        ).strip()
+
+    def _handle_event(self, event: dict[str, Any]) -> None:
+        """Update the utterance state from a server event.
+
+        Only items committed while the utterance is streamed belong to it.
+        Events of items of an earlier utterance, which can still arrive on a
+        pooled session, are ignored.
+        """
+        event_type = event.get("type")
+        item_id = event.get("item_id")
+        if event_type == "error":
+            error = event.get("error", {})
+            if error.get("code") == "input_audio_buffer_commit_empty":
+                # The server already committed the audio at the end of speech
+                self._speech_pending = False
+            else:
+                _LOGGER.error("Realtime session error: %s", error.get("message"))
+            self._commit_pending = False
+        elif not self._active:
+            return
+        elif event_type == "input_audio_buffer.speech_started":
+            self._speech_pending = True
+        elif event_type == "input_audio_buffer.committed":
+            self._speech_pending = False
+            self._commit_pending = False
+            if item_id not in self._previous_items:
+                self._items.setdefault(item_id, None)
+        elif item_id not in self._items:
+            return
+        elif event_type == "conversation.item.input_audio_transcription.delta":
+            self._partials[item_id] = self._partials.get(item_id, "") + event["delta"]
+            if self._on_partial is not None:
+                self._on_partial(self._transcript())
+        elif event_type == "conversation.item.input_audio_transcription.completed":
+            self._items[item_id] = event["transcript"].strip()
+        elif event_type == "conversation.item.input_audio_transcription.failed":
+            _LOGGER.error("Realtime transcription failed: %s", event.get("error"))
+            self._items[item_id] = ""
+
+    async def _async_receive(self) -> None:
+        """Handle server events until the WebSocket closes."""
+        assert self._ws is not None
+        try:
+            async for msg in self._ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    continue
+                self._handle_event(json.loads(msg.data))
+                self._notify()
+        finally:
+            self._notify()
+
+    async def async_transcribe(
+        self,
+        language: str | None,
+        sample_rate: int,
+        stream: AsyncIterable[bytes],
+        timeout: float,
+        on_partial: Callable[[str], None] | None = None,
+    ) -> str:
+        """Stream an utterance to the session and return its transcript."""
+        if language != self._language:
+            self._language = language
+            await self._async_send(
+                {
+                    "type": "transcription_session.update",
+                    "session": self._session_config(),
+                }
+            )
+        await self._async_send({"type": "input_audio_buffer.clear"})
+        self._previous_items = set(self._items)
+        self._items = {}
+        self._partials = {}
+        self._speech_pending = False
+        self._commit_pending = False
+        self._on_partial = on_partial
+        self._active = True
+
+        try:
+            resampler = PcmResampler(sample_rate, REALTIME_SAMPLE_RATE)
+            async for chunk in stream:
+                if audio := resampler.process(chunk):
+                    await self._async_send(
+                        {
+                            "type": "input_audio_buffer.append",
+                            "audio": base64.b64encode(audio).decode(),
+                        }
+                    )
+
+            # Commit speech the server hasn't detected the end of yet
+            if self._speech_pending or not self._items:
+                self._commit_pending = True
+                await self._async_send({"type": "input_audio_buffer.commit"})
+
+            async with async_timeout.timeout(timeout):
+                while self._commit_pending or None in self._items.values():
+                    if self.closed:
+                        raise ConnectionError("Realtime session closed")
+                    await self._changed.wait()
+        finally:
+            self._on_partial = None
+            self._active = False
+
+        return self._transcript()
+
+
+class RealtimeSessionPool:
+    """Keep realtime sessions open and warm between utterances."""
+
+    def __init__(
+        self,
+        http_session: aiohttp.ClientSession,
+        base_url: str,
+        api_key: str | None,
+        model: str,
+        prompt: str,
+        size: int = REALTIME_POOL_SIZE,
+    ) -> None:
+        """Initialize the session pool."""
+        self._http_session = http_session
+        self._url = realtime_url(base_url)
+        self._api_key = api_key
+        self._model = model
+        self._prompt = prompt
+        self._size = size
+        self._idle: list[RealtimeTranscriptionSession] = []
+
+    async def _async_acquire(self) -> RealtimeTranscriptionSession:
+        """Return an open session, connecting a new one if none are idle."""
+        while self._idle:
+            session = self._idle.pop()
+            if not session.closed:
+                return session
+        session = RealtimeTranscriptionSession(
+            self._http_session, self._url, self._api_key, self._model, self._prompt
+        )
+        await session.async_connect()
+        return session
+
+    async def _async_release(self, session: RealtimeTranscriptionSession) -> None:
+        """Return a session to the pool."""
+        if session.closed:
+            return
+        if len(self._idle) < self._size:
+            self._idle.append(session)
+        else:
+            await session.async_close()
+
+    async def async_warm_up(self) -> None:
+        """Open a session so the first utterance doesn't wait for it."""
+        await self._async_release(await self._async_acquire())
+
+    async def async_transcribe(
+        self,
+        language: str | None,
+        sample_rate: int,
+        stream: AsyncIterable[bytes],
+        timeout: float,
+        on_partial: Callable[[str], None] | None = None,
+    ) -> str:
+        """Transcribe an utterance on a pooled session."""
+        session = await self._async_acquire()
+        try:
+            text = await session.async_transcribe(
+                language, sample_rate, stream, timeout, on_partial
+            )
+        except BaseException:
+            # The session state is unknown, don't reuse it
+            await session.async_close()
+            raise
+        await self._async_release(session)
+        return text
+
+    async def async_close(self) -> None:
+        """Close all idle sessions."""
+        sessions, self._idle = self._idle, []
+        for session in sessions:
+            await session.async_close()
@@ -0,0 +1,153 @@
+"""Recording of pipeline sessions to an on-disk corpus for replaying them."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterable, AsyncIterator
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+import json
+import logging
+import os
+import time
+from typing import Any
+
+from homeassistant.components.stt import SpeechMetadata, SpeechResult
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from homeassistant.util.ulid import ulid_now
+
+_LOGGER = logging.getLogger(__name__)
+
+# Folder of the corpus in the configuration directory, one folder per entry
+CORPUS_DIR = "openai_stt_sessions"
+CORPUS_INDEX = "index.jsonl"
+# Sessions are no longer recorded once an entry's corpus is this large
+CORPUS_MAX_BYTES = 512 * 1024 * 1024
+
+# Set while sessions of a corpus are replayed, so they aren't recorded again
+replaying_sessions: ContextVar[bool] = ContextVar(
+    "openai_stt_replaying_sessions", default=False
+)
+
+
+@dataclass(slots=True)
+class RecordedSession:
+    """The audio of a session as it arrived, with the result it got.
+
+    Chunks are kept as received, without copying them, and their arrival
+    times are relative to the start of the session.
+    """
+
+    entity_id: str | None
+    metadata: SpeechMetadata
+    started: float = field(default_factory=time.monotonic)
+    chunks: list[bytes] = field(default_factory=list)
+    times: list[float] = field(default_factory=list)
+    ended: float | None = None
+    latency: float | None = None
+    result: SpeechResult | None = None
+
+    async def stream(self, stream: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+        """Pass the audio stream through, recording its chunks."""
+        async for chunk in stream:
+            self.times.append(time.monotonic() - self.started)
+            self.chunks.append(chunk)
+            yield chunk
+        self.ended = time.monotonic()
+
+    def finish(self, result: SpeechResult) -> None:
+        """Record the result, and how long it took after the audio ended."""
+        self.result = result
+        if self.ended is not None:
+            self.latency = time.monotonic() - self.ended
+
+    def index_entry(self, session_id: str) -> dict[str, Any]:
+        """Return the line of the session in the corpus index."""
+        assert self.result is not None
+        return {
+            "id": session_id,
+            "recorded": dt_util.utcnow().isoformat(),
+            "entity_id": self.entity_id,
+            "metadata": {
+                key: getattr(value, "value", value)
+                for key, value in asdict(self.metadata).items()
+            },
+            "chunks": [
+                [round(at * 1000), len(chunk)]
+                for at, chunk in zip(self.times, self.chunks)
+            ],
+            "result": {
+                "text": self.result.text,
+                "state": self.result.result.value,
+            },
+            "latency_ms": (
+                round(self.latency * 1000) if self.latency is not None else None
+            ),
+        }
+
+
+class SessionRecorder:
+    """Write recorded sessions to a corpus folder.
+
+    The audio of each session is stored as its raw chunks back to back in
+    ``<id>.raw``, and ``index.jsonl`` gets a line per session with its
+    metadata, the arrival time and size of every chunk, and the result.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """Initialize the recorder of a corpus folder."""
+        self.directory = directory
+        self.recorded = 0
+        self.skipped = 0
+        self._size: int | None = None
+        self._lock = asyncio.Lock()
+
+    def start(self, entity_id: str | None, metadata: SpeechMetadata) -> RecordedSession:
+        """Return a new session to record."""
+        return RecordedSession(entity_id, metadata)
+
+    def _corpus_size(self) -> int:
+        """Return the size of the files in the corpus folder."""
+        with os.scandir(self.directory) as entries:
+            return sum(entry.stat().st_size for entry in entries if entry.is_file())
+
+    def _write(self, session: RecordedSession) -> bool:
+        """Append a session to the corpus, False if the corpus is full."""
+        os.makedirs(self.directory, exist_ok=True)
+        if self._size is None:
+            self._size = self._corpus_size()
+        size = sum(len(chunk) for chunk in session.chunks)
+        if self._size + size > CORPUS_MAX_BYTES:
+            return False
+        session_id = ulid_now()
+        with open(os.path.join(self.directory, f"{session_id}.raw"), "wb") as file:
+            file.writelines(session.chunks)
+        line = json.dumps(session.index_entry(session_id), separators=(",", ":"))
+        with open(
+            os.path.join(self.directory, CORPUS_INDEX), "a", encoding="utf-8"
+        ) as file:
+            file.write(line + "\n")
+        self._size += size + len(line) + 1
+        return True
+
+    async def async_save(self, hass: HomeAssistant, session: RecordedSession) -> None:
+        """Write a finished session to the corpus."""
+        async with self._lock:
+            try:
+                written = await hass.async_add_executor_job(self._write, session)
+            except OSError as err:
+                _LOGGER.error("Error recording session to %s: %s", self.directory, err)
+                return
+        if written:
+            self.recorded += 1
+            return
+        if not self.skipped:
+            _LOGGER.warning(
+                "Session corpus %s is full, sessions are no longer recorded",
+                self.directory,
+            )
+        self.skipped += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters for diagnostics."""
+        return {"recorded": self.recorded, "skipped": self.skipped}
@@ -0,0 +1,167 @@
+"""Replay of recorded sessions against an STT entity, for load testing."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+import glob
+import json
+import logging
+import os
+import time
+from typing import Any
+
+from homeassistant.components.stt import (
+    AudioCodecs,
+    AudioFormats,
+    SpeechMetadata,
+    SpeechResultState,
+    SpeechToTextEntity,
+)
+from homeassistant.core import HomeAssistant
+
+from .recorder import CORPUS_INDEX, replaying_sessions
+from .routing import LatencyHistogram
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class CorpusSession:
+    """A session of the corpus, with its audio left on disk until replayed."""
+
+    path: str
+    metadata: SpeechMetadata
+    chunks: list[tuple[float, int]]
+    text: str | None
+
+    @property
+    def duration(self) -> float:
+        """Return the time from the start of the session to its last chunk."""
+        return self.chunks[-1][0] if self.chunks else 0.0
+
+    def read(self) -> bytes:
+        """Return the recorded audio."""
+        with open(self.path, "rb") as file:
+            return file.read()
+
+
+def _session(directory: str, entry: dict[str, Any]) -> CorpusSession:
+    """Return a session from its line in the corpus index."""
+    metadata = entry["metadata"]
+    return CorpusSession(
+        os.path.join(directory, f"{entry['id']}.raw"),
+        SpeechMetadata(
+            language=metadata["language"],
+            format=AudioFormats(metadata["format"]),
+            codec=AudioCodecs(metadata["codec"]),
+            bit_rate=metadata["bit_rate"],
+            sample_rate=metadata["sample_rate"],
+            channel=metadata["channel"],
+        ),
+        [(at / 1000, size) for at, size in entry["chunks"]],
+        entry["result"]["text"],
+    )
+
+
+def load_corpus(path: str) -> list[CorpusSession]:
+    """Return the sessions of a corpus folder and the corpora below it."""
+    sessions: list[CorpusSession] = []
+    for index in sorted(
+        glob.glob(os.path.join(glob.escape(path), "**", CORPUS_INDEX), recursive=True)
+    ):
+        directory = os.path.dirname(index)
+        with open(index, encoding="utf-8") as file:
+            for number, line in enumerate(file, 1):
+                try:
+                    sessions.append(_session(directory, json.loads(line)))
+                except (KeyError, TypeError, ValueError) as err:
+                    _LOGGER.warning("Skipping line %s of %s: %s", number, index, err)
+    return sessions
+
+
+async def _async_chunks(
+    session: CorpusSession, audio: bytes, speed: float, ended: list[float]
+) -> AsyncIterator[bytes]:
+    """Yield the chunks of a session at their recorded pace.
+
+    The pace is scaled by the speed, and 0 sends the chunks as fast as they
+    are read. The time the last chunk was sent is appended to ``ended``.
+    """
+    start = time.monotonic()
+    offset = 0
+    for at, size in session.chunks:
+        if speed and (delay := start + at / speed - time.monotonic()) > 0:
+            await asyncio.sleep(delay)
+        yield audio[offset : offset + size]
+        offset += size
+    ended.append(time.monotonic())
+
+
+async def async_replay(
+    hass: HomeAssistant,
+    entity: SpeechToTextEntity,
+    sessions: list[CorpusSession],
+    satellites: int,
+    speed: float,
+) -> dict[str, Any]:
+    """Replay sessions from concurrent virtual satellites and report the load.
+
+    Each satellite streams one session after the other, like a satellite
+    whose user starts the next command once the last one was answered.
+    Latency is measured from the last chunk sent to the result, as it is
+    noticed by the user. Transcripts differing from the recorded ones are
+    counted as changed. Entities recording sessions don't record the
+    replayed ones.
+    """
+    pending = iter(sessions)
+    latency = LatencyHistogram()
+    counts = {"sessions": 0, "errors": 0, "changed": 0}
+    audio_seconds = 0.0
+    latency_max = 0.0
+
+    async def _async_satellite() -> None:
+        nonlocal audio_seconds, latency_max
+        for session in pending:
+            counts["sessions"] += 1
+            audio = await hass.async_add_executor_job(session.read)
+            ended: list[float] = []
+            try:
+                result = await entity.async_process_audio_stream(
+                    session.metadata, _async_chunks(session, audio, speed, ended)
+                )
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.debug("Replayed session failed: %s", err)
+                counts["errors"] += 1
+                continue
+            finished = time.monotonic()
+            audio_seconds += session.duration
+            if result.result != SpeechResultState.SUCCESS:
+                counts["errors"] += 1
+            elif result.text != session.text:
+                counts["changed"] += 1
+            # The entity may have stopped reading before the end of the stream
+            if ended:
+                latency.record(finished - ended[0])
+                latency_max = max(latency_max, finished - ended[0])
+
+    start = time.monotonic()
+    # The satellites' tasks inherit the mark
+    token = replaying_sessions.set(True)
+    try:
+        await asyncio.gather(*(_async_satellite() for _ in range(satellites)))
+    finally:
+        replaying_sessions.reset(token)
+    wall = time.monotonic() - start
+    return {
+        "entity_id": entity.entity_id,
+        "satellites": satellites,
+        "speed": speed,
+        **counts,
+        "wall_s": round(wall, 3),
+        "audio_s": round(audio_seconds, 3),
+        "sessions_per_s": round(counts["sessions"] / wall, 3) if wall else None,
+        "audio_s_per_s": round(audio_seconds / wall, 3) if wall else None,
+        "latency": latency.as_dict(),
+        "latency_max_ms": round(latency_max * 1000, 1),
+    }
@@ -0,0 +1,256 @@
+"""Route speech to text requests across several STT entities."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterable, AsyncIterator
+from dataclasses import replace
+import logging
+import time
+
+import async_timeout
+from homeassistant.components.stt import (
+    AudioBitRates,
+    AudioChannels,
+    AudioCodecs,
+    AudioFormats,
+    AudioSampleRates,
+    SpeechMetadata,
+    SpeechResult,
+    SpeechResultState,
+    SpeechToTextEntity,
+    async_get_speech_to_text_entity,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.util import language as language_util
+
+from .const import (
+    DEFAULT_TIMEOUT,
+    ROUTER_POLICY_LATENCY,
+    ROUTER_POLICY_RACE,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Weight of the newest sample in the per-target latency average
+LATENCY_SMOOTHING = 0.3
+
+
+class AudioTee:
+    """Read an audio stream once and fan its chunks out to several readers.
+
+    Chunks are kept as the ``bytes`` objects produced by the source stream,
+    so every reader is handed the same buffers without copying them.
+    """
+
+    def __init__(self, stream: AsyncIterable[bytes]) -> None:
+        """Initialize the tee."""
+        self._stream = stream
+        self._chunks: list[bytes] = []
+        self._finished = False
+        self._error: BaseException | None = None
+        self._changed = asyncio.Event()
+        self._pump: asyncio.Task[None] | None = None
+
+    def _notify(self) -> None:
+        """Wake up all readers waiting for new chunks."""
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def _async_pump(self) -> None:
+        """Read the source stream into the shared chunk list."""
+        try:
+            async for chunk in self._stream:
+                self._chunks.append(chunk)
+                self._notify()
+        except Exception as err:  # pylint: disable=broad-except
+            self._error = err
+        finally:
+            self._finished = True
+            self._notify()
+
+    async def reader(self) -> AsyncIterator[bytes]:
+        """Return an iterator over every chunk of the stream from the start."""
+        if self._pump is None:
+            self._pump = asyncio.get_running_loop().create_task(self._async_pump())
+
+        index = 0
+        while True:
+            while index < len(self._chunks):
+                yield self._chunks[index]
+                index += 1
+            if self._finished:
+                if self._error is not None:
+                    raise self._error
+                return
+            await self._changed.wait()
+
+    async def async_close(self) -> None:
+        """Stop reading the source stream."""
+        if self._pump is not None and not self._pump.done():
+            self._pump.cancel()
+            try:
+                await self._pump
+            except asyncio.CancelledError:
+                pass
+
+
+class STTRouterEntity(SpeechToTextEntity):
+    """STT entity that dispatches audio to a primary and fallback entities."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        name: str,
+        primary: SpeechToTextEntity,
+        fallback_entity_ids: list[str],
+        policy: str,
+    ) -> None:
+        """Initialize the STT router."""
+        self.hass = hass
+        self._attr_unique_id = f"{entry_id}_stt_router"
+        self._attr_name = f"{name} Router"
+        self._primary = primary
+        self._fallback_entity_ids = fallback_entity_ids
+        self._policy = policy
+        self._latency: dict[str, float] = {}
+
+    @property
+    def device_info(self) -> dr.DeviceInfo:
+        """Return device information about the STT router."""
+        return self._primary.device_info
+
+    @property
+    def supported_languages(self) -> list[str]:
+        """Return a list of supported languages."""
+        return self._primary.supported_languages
+
+    @property
+    def supported_formats(self) -> list[AudioFormats]:
+        """Return a list of supported formats."""
+        return self._primary.supported_formats
+
+    @property
+    def supported_codecs(self) -> list[AudioCodecs]:
+        """Return a list of supported codecs."""
+        return self._primary.supported_codecs
+
+    @property
+    def supported_bit_rates(self) -> list[AudioBitRates]:
+        """Return a list of supported bitrates."""
+        return self._primary.supported_bit_rates
+
+    @property
+    def supported_sample_rates(self) -> list[AudioSampleRates]:
+        """Return a list of supported samplerates."""
+        return self._primary.supported_sample_rates
+
+    @property
+    def supported_channels(self) -> list[AudioChannels]:
+        """Return a list of supported channels."""
+        return self._primary.supported_channels
+
+    def _targets(self) -> list[SpeechToTextEntity]:
+        """Return the entities to route to, primary first."""
+        targets: list[SpeechToTextEntity] = [self._primary]
+        for entity_id in self._fallback_entity_ids:
+            if entity_id in (self.entity_id, self._primary.entity_id):
+                continue
+            if (entity := async_get_speech_to_text_entity(self.hass, entity_id)) is None:
+                _LOGGER.warning("STT entity %s is not available", entity_id)
+                continue
+            targets.append(entity)
+        if self._policy == ROUTER_POLICY_LATENCY:
+            # Untried targets keep their configured position ahead of slow ones
+            targets.sort(key=lambda target: self._latency.get(target.entity_id, 0.0))
+        return targets
+
+    def _record_latency(self, target: SpeechToTextEntity, latency: float) -> None:
+        """Update the moving latency average of a target."""
+        previous = self._latency.get(target.entity_id)
+        if previous is None:
+            self._latency[target.entity_id] = latency
+        else:
+            self._latency[target.entity_id] = (
+                LATENCY_SMOOTHING * latency + (1 - LATENCY_SMOOTHING) * previous
+            )
+
+    async def _async_run(
+        self, target: SpeechToTextEntity, metadata: SpeechMetadata, tee: AudioTee
+    ) -> SpeechResult:
+        """Run a single target against the shared audio."""
+        if matches := language_util.matches(
+            metadata.language, target.supported_languages
+        ):
+            metadata = replace(metadata, language=matches[0])
+        if not target.check_metadata(metadata):
+            _LOGGER.debug("Skipping %s: unsupported audio metadata", target.entity_id)
+            return SpeechResult(None, SpeechResultState.ERROR)
+
+        start = time.monotonic()
+        try:
+            async with async_timeout.timeout(DEFAULT_TIMEOUT):
+                result = await target.async_process_audio_stream(
+                    metadata, tee.reader()
+                )
+        except asyncio.TimeoutError:
+            _LOGGER.warning("STT entity %s timed out", target.entity_id)
+            result = SpeechResult(None, SpeechResultState.ERROR)
+        except Exception as e:  # pylint: disable=broad-except
+            _LOGGER.error("STT entity %s failed: %s", target.entity_id, e)
+            result = SpeechResult(None, SpeechResultState.ERROR)
+
+        if result.result == SpeechResultState.SUCCESS:
+            self._record_latency(target, time.monotonic() - start)
+        else:
+            self._record_latency(target, DEFAULT_TIMEOUT)
+        return result
+
+    async def _async_fallback(
+        self, targets: list[SpeechToTextEntity], metadata: SpeechMetadata, tee: AudioTee
+    ) -> SpeechResult:
+        """Try each target in order until one succeeds."""
+        result = SpeechResult(None, SpeechResultState.ERROR)
+        for target in targets:
+            result = await self._async_run(target, metadata, tee)
+            if result.result == SpeechResultState.SUCCESS:
+                _LOGGER.debug("Routed transcription to %s", target.entity_id)
+                return result
+        return result
+
+    async def _async_race(
+        self, targets: list[SpeechToTextEntity], metadata: SpeechMetadata, tee: AudioTee
+    ) -> SpeechResult:
+        """Run all targets at once and return the first successful result."""
+        pending = {
+            asyncio.ensure_future(self._async_run(target, metadata, tee))
+            for target in targets
+        }
+        result = SpeechResult(None, SpeechResultState.ERROR)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    result = task.result()
+                    if result.result == SpeechResultState.SUCCESS:
+                        return result
+        finally:
+            for task in pending:
+                task.cancel()
+        return result
+
+    async def async_process_audio_stream(
+        self, metadata: SpeechMetadata, stream: AsyncIterable[bytes]
+    ) -> SpeechResult:
+        """Process audio stream to text."""
+        tee = AudioTee(stream)
+        try:
+            targets = self._targets()
+            if self._policy == ROUTER_POLICY_RACE:
+                return await self._async_race(targets, metadata, tee)
+            return await self._async_fallback(targets, metadata, tee)
+        finally:
+            await tee.async_close()
@@ -0,0 +1,167 @@
+"""Route each transcription to a fast or an accurate model."""
+from __future__ import annotations
+
+from bisect import bisect_left
+import math
+from typing import Any
+
+# Short clips, usually voice commands, go to the fast model
+ROUTE_SHORT = "short"
+# Long clips and clips of unknown length go to the accurate model
+ROUTE_LONG = "long"
+# Any clip goes to the fast model while too many requests are in flight
+ROUTE_LOAD = "load"
+# Short clips transcribed with low confidence are sent to the accurate model
+ROUTE_RETRY = "retry"
+ROUTES = (ROUTE_SHORT, ROUTE_LONG, ROUTE_LOAD, ROUTE_RETRY)
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0, 30.0, math.inf)
+# Transcripts of the fast model scoring below this are retried
+ROUTING_MIN_LOGPROB = -0.5
+# Latencies of accurate transcriptions near the threshold between a tuning step
+TUNING_SAMPLES = 20
+TUNING_PERCENTILE = 0.9
+# Factor the short clip threshold is raised or lowered by in a tuning step
+TUNING_STEP = 1.25
+MIN_SHORT_CLIP = 1.0
+MAX_SHORT_CLIP = 30.0
+
+
+class LatencyHistogram:
+    """Counts of latencies in fixed buckets."""
+
+    __slots__ = ("counts", "count", "total")
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, latency: float) -> None:
+        """Count a latency in seconds."""
+        self.counts[bisect_left(LATENCY_BUCKETS, latency)] += 1
+        self.count += 1
+        self.total += latency
+
+    def percentile(self, fraction: float) -> float:
+        """Return the upper bound of the bucket holding a percentile."""
+        rank = math.ceil(fraction * self.count)
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the histogram, with latencies in milliseconds."""
+
+        def _ms(latency: float) -> float | None:
+            return round(latency * 1000, 1) if math.isfinite(latency) else None
+
+        return {
+            "count": self.count,
+            "avg_ms": _ms(self.total / self.count) if self.count else None,
+            "p50_ms": _ms(self.percentile(0.5)) if self.count else None,
+            "p90_ms": _ms(self.percentile(0.9)) if self.count else None,
+            "buckets": {
+                (f"le_{bound * 1000:.0f}ms" if math.isfinite(bound) else "inf"): count
+                for bound, count in zip(LATENCY_BUCKETS, self.counts)
+            },
+        }
+
+
+class ModelRouter:
+    """Pick the model for a transcription by clip length, load and confidence.
+
+    Clips shorter than the short clip threshold go to the fast model, others
+    to the accurate one, and every clip goes to the fast model while the
+    maximum number of requests is in flight. A short clip the fast model
+    transcribed with low confidence is transcribed again by the accurate
+    model.
+
+    The threshold tunes itself from the latency of the accurate model on
+    clips up to twice as long as the threshold. When these usually take
+    longer than the latency target, the threshold is raised so more clips
+    go to the fast model. When they take less than half the target, it is
+    lowered again.
+    """
+
+    def __init__(
+        self,
+        fast_model: str,
+        accurate_model: str,
+        short_clip: float,
+        latency_target: float,
+        max_load: int,
+    ) -> None:
+        """Initialize the router, with times in seconds."""
+        self.fast_model = fast_model
+        self.accurate_model = accurate_model
+        self.short_clip = short_clip
+        self._latency_target = latency_target
+        self._max_load = max_load
+        self.in_flight = 0
+        self.adjustments = 0
+        self.latency = {route: LatencyHistogram() for route in ROUTES}
+        self._boundary = LatencyHistogram()
+
+    @property
+    def loaded(self) -> bool:
+        """Return if the maximum number of requests is in flight."""
+        return self.in_flight >= self._max_load
+
+    def route(self, duration: float | None) -> tuple[str, str]:
+        """Return the route and model for a clip of a duration in seconds."""
+        if self.loaded:
+            return ROUTE_LOAD, self.fast_model
+        if duration is not None and duration < self.short_clip:
+            return ROUTE_SHORT, self.fast_model
+        return ROUTE_LONG, self.accurate_model
+
+    def should_retry(self, avg_logprob: float | None) -> bool:
+        """Return if a short clip should be transcribed again accurately."""
+        return (
+            avg_logprob is not None
+            and avg_logprob < ROUTING_MIN_LOGPROB
+            and not self.loaded
+        )
+
+    def record(self, route: str, duration: float | None, latency: float) -> None:
+        """Record the latency of a transcription and tune the threshold."""
+        self.latency[route].record(latency)
+        if (
+            route == ROUTE_LONG
+            and duration is not None
+            and duration < self.short_clip * 2
+        ):
+            self._boundary.record(latency)
+            if self._boundary.count >= TUNING_SAMPLES:
+                self._tune()
+
+    def _tune(self) -> None:
+        """Move the threshold towards meeting the latency target."""
+        latency = self._boundary.percentile(TUNING_PERCENTILE)
+        short_clip = self.short_clip
+        if latency > self._latency_target:
+            short_clip = min(MAX_SHORT_CLIP, short_clip * TUNING_STEP)
+        elif latency < self._latency_target / 2:
+            short_clip = max(MIN_SHORT_CLIP, short_clip / TUNING_STEP)
+        if short_clip != self.short_clip:
+            self.short_clip = short_clip
+            self.adjustments += 1
+        # Clips near the new threshold are measured from scratch
+        self._boundary = LatencyHistogram()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the thresholds and latencies for diagnostics."""
+        return {
+            "short_clip": round(self.short_clip, 2),
+            "adjustments": self.adjustments,
+            "in_flight": self.in_flight,
+            "latency": {
+                route: histogram.as_dict() for route, histogram in self.latency.items()
+            },
+        }
@@ -0,0 +1,137 @@
+"""Services for the OpenAI STT integration."""
+from __future__ import annotations
+
+from functools import partial
+from typing import TYPE_CHECKING
+
+import voluptuous as vol
+from homeassistant.components.stt import async_get_speech_to_text_entity
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+
+from .const import (
+    ATTR_CONCURRENCY,
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_CORPUS,
+    ATTR_LANGUAGE,
+    ATTR_LIMIT,
+    ATTR_PATHS,
+    ATTR_SATELLITES,
+    ATTR_SPEED,
+    DEFAULT_CONCURRENCY,
+    DEFAULT_SATELLITES,
+    DEFAULT_SPEED,
+    DOMAIN,
+    MAX_CONCURRENCY,
+    MAX_SATELLITES,
+    MAX_SPEED,
+    SERVICE_REPLAY_SESSIONS,
+    SERVICE_TRANSCRIBE_FILES,
+)
+from .recorder import CORPUS_DIR
+from .replay import async_replay, load_corpus
+
+if TYPE_CHECKING:
+    from .stt import OpenAISTTEngine
+
+TRANSCRIBE_FILES_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_PATHS): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_LANGUAGE): cv.string,
+        vol.Optional(ATTR_CONCURRENCY, default=DEFAULT_CONCURRENCY): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_CONCURRENCY)
+        ),
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+
+REPLAY_SESSIONS_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTITY_ID): cv.entity_domain("stt"),
+        vol.Optional(ATTR_CORPUS): cv.string,
+        vol.Optional(ATTR_SATELLITES, default=DEFAULT_SATELLITES): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_SATELLITES)
+        ),
+        vol.Optional(ATTR_SPEED, default=DEFAULT_SPEED): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=MAX_SPEED)
+        ),
+        vol.Optional(ATTR_LIMIT): vol.All(vol.Coerce(int), vol.Range(min=1)),
+    }
+)
+
+
+@callback
+def _async_get_engine(hass: HomeAssistant, entry_id: str | None) -> OpenAISTTEngine:
+    """Return the engine of a config entry, or of the only loaded entry."""
+    engines: dict[str, OpenAISTTEngine] = hass.data.get(DOMAIN, {})
+    if entry_id is not None:
+        if (engine := engines.get(entry_id)) is None:
+            raise ServiceValidationError(f"OpenAI STT entry {entry_id} is not loaded")
+        return engine
+    if not engines:
+        raise ServiceValidationError("No OpenAI STT entry is loaded")
+    return next(iter(engines.values()))
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the OpenAI STT services."""
+
+    async def async_transcribe_files_service(call: ServiceCall) -> ServiceResponse:
+        """Transcribe recorded audio files."""
+        engine = _async_get_engine(hass, call.data.get(ATTR_CONFIG_ENTRY_ID))
+        # Imported with numpy by the STT platform that loaded the engine
+        # pylint: disable-next=import-outside-toplevel
+        from .batch import async_transcribe_files
+
+        files = await async_transcribe_files(
+            hass,
+            # Recordings are unrelated to the conversations of the pipeline
+            partial(engine.async_transcribe, carry_context=False),
+            call.data[ATTR_PATHS],
+            call.data.get(ATTR_LANGUAGE),
+            call.data[ATTR_CONCURRENCY],
+        )
+        return {"files": files}
+
+    async def async_replay_sessions_service(call: ServiceCall) -> ServiceResponse:
+        """Replay recorded sessions against an STT entity and report the load."""
+        entity_id = call.data[ATTR_ENTITY_ID]
+        if (entity := async_get_speech_to_text_entity(hass, entity_id)) is None:
+            raise ServiceValidationError(f"{entity_id} is not a speech-to-text entity")
+        if not (corpus := call.data.get(ATTR_CORPUS)):
+            # The integration's own corpus, in the configuration folder
+            corpus = hass.config.path(CORPUS_DIR)
+        elif not hass.config.is_allowed_path(corpus):
+            raise HomeAssistantError(f"Access to {corpus} is not allowed")
+        sessions = await hass.async_add_executor_job(load_corpus, corpus)
+        if not sessions:
+            raise HomeAssistantError(f"No recorded sessions in {corpus}")
+        if (limit := call.data.get(ATTR_LIMIT)) is not None:
+            sessions = sessions[:limit]
+        return await async_replay(
+            hass, entity, sessions, call.data[ATTR_SATELLITES], call.data[ATTR_SPEED]
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_TRANSCRIBE_FILES,
+        async_transcribe_files_service,
+        schema=TRANSCRIBE_FILES_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REPLAY_SESSIONS,
+        async_replay_sessions_service,
+        schema=REPLAY_SESSIONS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -1,13 +1,14 @@
 """Support for the OpenAI speech to text service."""
 from __future__ import annotations
 
+import asyncio
+from collections import Counter
 import logging
-from collections.abc import AsyncIterable
-import wave
-import io
+from collections.abc import AsyncIterable, Callable, Mapping
+import time
+from typing import TYPE_CHECKING, Any, TypeVar
 
 import async_timeout
-from openai import OpenAI
 from homeassistant.components.stt import (
     AudioBitRates,
     AudioChannels,
@@ -20,47 +21,429 @@ from homeassistant.components.stt import (
     SpeechToTextEntity,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.exceptions import MaxLengthExceeded
+from homeassistant.helpers.start import async_at_started
 
+from .audio import (
+    SEGMENT_OVERLAP_SECONDS,
+    WAV_HEADER_SIZE,
+    PauseDetector,
+    PcmBuffer,
+    PcmWavReader,
+    WavInfo,
+    merge_overlapping_transcripts,
+    segment_bounds,
+)
+from .backend import LocalWhisperBackend, OpenAIBackend, STTBackend
+from .cancellation import CancellationStats, async_cancellable
 from .const import (
     DOMAIN,
+    BACKEND_LOCAL,
     CONF_API_KEY,
+    CONF_API_KEYS,
+    CONF_BACKEND,
+    CONF_BASE_URL,
+    CONF_CPU_THREADS,
+    CONF_DETECT_LANGUAGE,
+    CONF_DSP_WORKERS,
+    CONF_FAST_MODEL,
+    CONF_GATE_MAX_CLIPPING,
+    CONF_GATE_MIN_LEVEL,
+    CONF_GATE_MIN_SPEECH_RATIO,
+    CONF_LOCAL_MODEL,
+    CONF_MAX_CONNECTIONS,
     CONF_MODEL,
+    CONF_MODEL_ROUTING,
     CONF_PROMPT,
+    CONF_PROMPT_CONTEXT,
+    CONF_REALTIME,
+    CONF_RECORD_SESSIONS,
+    CONF_ROUTER_ENTITIES,
+    CONF_ROUTER_POLICY,
+    CONF_ROUTING_LATENCY_TARGET,
+    CONF_ROUTING_MAX_LOAD,
+    CONF_ROUTING_SHORT_CLIP,
+    CONF_SPECULATIVE,
+    CONF_SPECULATIVE_PAUSE,
+    CONF_SPEECH_GATE,
     CONF_TEMP,
+    CONF_TIMEOUT,
+    CONF_TIMESTAMP_GRANULARITIES,
+    CONF_TRANSLATE,
+    DEFAULT_BACKEND,
+    DEFAULT_BASE_URL,
+    DEFAULT_CPU_THREADS,
+    DEFAULT_DSP_WORKERS,
+    DEFAULT_FAST_MODEL,
+    DEFAULT_GATE_MAX_CLIPPING,
+    DEFAULT_GATE_MIN_LEVEL,
+    DEFAULT_GATE_MIN_SPEECH_RATIO,
+    DEFAULT_LOCAL_MODEL,
+    DEFAULT_MAX_CONNECTIONS,
     DEFAULT_MODEL,
     DEFAULT_PROMPT,
+    DEFAULT_ROUTER_POLICY,
+    DEFAULT_ROUTING_LATENCY_TARGET,
+    DEFAULT_ROUTING_MAX_LOAD,
+    DEFAULT_ROUTING_SHORT_CLIP,
+    DEFAULT_SPECULATIVE_PAUSE,
     DEFAULT_TEMP,
     DEFAULT_TIMEOUT,
+    EVENT_TRANSCRIPT,
+    EVENT_TRANSCRIPT_PARTIAL,
     MAX_AUDIO_SIZE,
 )
+from .context import PromptContext
+from .dsp import DspPool, measure_speech
+from .language import LANGUAGE_HINT_MIN_LOGPROB, LanguageDetectionCache
+from .realtime import RealtimeSessionPool
+from .recorder import CORPUS_DIR, SessionRecorder, replaying_sessions
+from .router import STTRouterEntity
+from .routing import ROUTE_RETRY, ROUTE_SHORT, ModelRouter
+from .speech_gate import GATE_PASSED, SpeechGate
+from .transcript import Transcript
+
+if TYPE_CHECKING:
+    from collections.abc import Buffer
 
 _LOGGER = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+
+
+def _wav_file(pcm: memoryview, info: WavInfo) -> tuple:
+    """Return buffered PCM audio as a WAV file for the engine, without copying it."""
+    return (
+        "whisper_audio.wav",
+        PcmWavReader(pcm, info.channels, info.sample_width, info.sample_rate),
+        "audio/wav",
+    )
+
+
+def _discard(task: asyncio.Task[Transcript]) -> None:
+    """Cancel a speculative transcription whose result is no longer needed."""
+    if not task.done():
+        task.cancel()
+    elif not task.cancelled():
+        # Retrieve the error so it isn't logged as never retrieved
+        task.exception()
+
 class OpenAISTTEngine:
     """OpenAI STT engine."""
 
-    def __init__(self, api_key: str, model: str, prompt: str, temperature: float):
+    def __init__(
+        self,
+        backend: STTBackend,
+        model: str,
+        prompt: str,
+        temperature: float,
+        timestamp_granularities: list[str] | None = None,
+        translate: bool = False,
+        language_cache: LanguageDetectionCache | None = None,
+        prompt_context: PromptContext | None = None,
+        speech_gate: SpeechGate | None = None,
+        router: ModelRouter | None = None,
+    ):
         """Initialize OpenAI STT engine."""
-        self._api_key = api_key
+        self._backend = backend
         self._model = model
         self._prompt = prompt
         self._temperature = temperature
+        self.timestamp_granularities = timestamp_granularities or None
+        self.translate = translate
+        self._language_cache = language_cache
+        self._prompt_context = prompt_context
+        self.speech_gate = speech_gate
+        self.router = router
+        self.realtime: RealtimeSessionPool | None = None
+        self.dsp: DspPool | None = None
+        self.recorder: SessionRecorder | None = None
+        self.speculative_pause: float | None = None
+        self.speech_level: float = DEFAULT_GATE_MIN_LEVEL
+        self.speculation: Counter[str] = Counter()
+        self.cancellation = CancellationStats()
+        self._routing: tuple[Any, ...] | None = None
+
+    def apply_options(self, options: Mapping[str, Any]) -> None:
+        """Apply the options of the config entry.
+
+        Called again whenever the options change, so the backend keeps its
+        connections. Features that stay enabled keep their state, like the
+        languages detected so far and the tuned routing threshold. Without
+        the prompt and temperature options, those of the entry data are kept.
+        """
+        self._prompt = options.get(CONF_PROMPT, self._prompt)
+        self._temperature = options.get(CONF_TEMP, self._temperature)
+        self.timestamp_granularities = (
+            options.get(CONF_TIMESTAMP_GRANULARITIES) or None
+        )
+        self.translate = options.get(CONF_TRANSLATE, False)
+        if not options.get(CONF_DETECT_LANGUAGE, False):
+            self._language_cache = None
+        elif self._language_cache is None:
+            self._language_cache = LanguageDetectionCache()
+        if not options.get(CONF_PROMPT_CONTEXT, False):
+            self._prompt_context = None
+        elif self._prompt_context is None:
+            self._prompt_context = PromptContext()
+
+        speech_gate = None
+        if options.get(CONF_SPEECH_GATE, False):
+            speech_gate = SpeechGate(
+                options.get(CONF_GATE_MIN_LEVEL, DEFAULT_GATE_MIN_LEVEL),
+                options.get(CONF_GATE_MIN_SPEECH_RATIO, DEFAULT_GATE_MIN_SPEECH_RATIO)
+                / 100,
+                options.get(CONF_GATE_MAX_CLIPPING, DEFAULT_GATE_MAX_CLIPPING) / 100,
+            )
+            if self.speech_gate is not None:
+                speech_gate.decisions = self.speech_gate.decisions
+        self.speech_gate = speech_gate
+
+        routing = (
+            options.get(CONF_FAST_MODEL, DEFAULT_FAST_MODEL),
+            options.get(CONF_ROUTING_SHORT_CLIP, DEFAULT_ROUTING_SHORT_CLIP),
+            options.get(CONF_ROUTING_LATENCY_TARGET, DEFAULT_ROUTING_LATENCY_TARGET)
+            / 1000,
+            int(options.get(CONF_ROUTING_MAX_LOAD, DEFAULT_ROUTING_MAX_LOAD)),
+        )
+        # Local models are picked when the worker process starts
+        if not options.get(CONF_MODEL_ROUTING, False) or not isinstance(
+            self._backend, OpenAIBackend
+        ):
+            self.router = None
+        elif self.router is None or routing != self._routing:
+            fast_model, short_clip, latency_target, max_load = routing
+            self.router = ModelRouter(
+                fast_model, self._model, short_clip, latency_target, max_load
+            )
+        self._routing = routing
+
+        self.speculative_pause = (
+            options.get(CONF_SPECULATIVE_PAUSE, DEFAULT_SPECULATIVE_PAUSE) / 1000
+            if options.get(CONF_SPECULATIVE, False)
+            else None
+        )
+        self.speech_level = options.get(CONF_GATE_MIN_LEVEL, DEFAULT_GATE_MIN_LEVEL)
+
+        workers = int(options.get(CONF_DSP_WORKERS, DEFAULT_DSP_WORKERS))
+        if self.dsp is not None and self.dsp.workers != workers:
+            self.dsp.close()
+            self.dsp = None
+        if workers and self.dsp is None:
+            self.dsp = DspPool(workers)
+
+    async def async_run_dsp(
+        self, func: Callable[..., _T], pcm: Buffer, *args: Any
+    ) -> _T:
+        """Run audio processing in the DSP pool, or the executor without one."""
+        if self.dsp is not None:
+            return await self.dsp.async_run(func, pcm, *args)
+        return await asyncio.get_running_loop().run_in_executor(
+            None, func, pcm, *args
+        )
+
+    async def _async_request(
+        self,
+        audio_file: tuple,
+        model: str,
+        language: str | None,
+        prompt: str,
+        on_partial: Callable[[str], None] | None,
+        confidence: bool = False,
+    ) -> Transcript:
+        """Transcribe audio with a model of the backend."""
+        return await async_cancellable(
+            self.cancellation,
+            self._backend.async_transcribe(
+                audio_file,
+                model,
+                language,
+                prompt,
+                self._temperature,
+                on_partial=on_partial,
+                timestamp_granularities=self.timestamp_granularities,
+                translate=self.translate,
+                detect_language=(
+                    self._language_cache is not None
+                    and self._backend.reports_language(model)
+                ),
+                confidence=confidence,
+            ),
+        )
+
+    async def _async_routed(
+        self,
+        route: str,
+        model: str,
+        duration: float | None,
+        audio_file: tuple,
+        language: str | None,
+        prompt: str,
+        on_partial: Callable[[str], None] | None,
+    ) -> Transcript:
+        """Transcribe audio on a route of the model router, timing it."""
+        router = self.router
+        assert router is not None
+        router.in_flight += 1
+        start = time.monotonic()
+        try:
+            transcript = await self._async_request(
+                audio_file,
+                model,
+                language,
+                prompt,
+                on_partial,
+                confidence=route == ROUTE_SHORT,
+            )
+        finally:
+            router.in_flight -= 1
+        router.record(route, duration, time.monotonic() - start)
+        return transcript
+
+    async def _async_transcribe(
+        self,
+        audio_file: tuple,
+        language: str | None,
+        prompt: str,
+        on_partial: Callable[[str], None] | None,
+        duration: float | None,
+    ) -> Transcript:
+        """Transcribe audio with the model it is routed to."""
+        if self.router is None:
+            return await self._async_request(
+                audio_file, self._model, language, prompt, on_partial
+            )
 
-    def transcribe(self, audio_file: tuple, language: str | None = None):
-        """Transcribe audio using OpenAI API."""
-        client = OpenAI(api_key=self._api_key)
-        return client.audio.transcriptions.create(
-            model=self._model,
-            language=language,
-            prompt=self._prompt,
-            temperature=self._temperature,
-            response_format="json",
-            file=audio_file,
+        route, model = self.router.route(duration)
+        transcript = await self._async_routed(
+            route, model, duration, audio_file, language, prompt, on_partial
         )
+        if (
+            route == ROUTE_SHORT
+            and model != self.router.accurate_model
+            and self.router.should_retry(transcript.avg_logprob)
+        ):
+            _LOGGER.debug(
+                "Transcript of %s scored %.2f, transcribing with %s",
+                model,
+                transcript.avg_logprob,
+                self.router.accurate_model,
+            )
+            audio_file[1].seek(0)
+            transcript = await self._async_routed(
+                ROUTE_RETRY,
+                self.router.accurate_model,
+                duration,
+                audio_file,
+                language,
+                prompt,
+                on_partial,
+            )
+        return transcript
+
+    async def async_transcribe(
+        self,
+        audio_file: tuple,
+        language: str | None = None,
+        on_partial: Callable[[str], None] | None = None,
+        *,
+        carry_context: bool = True,
+        remember: bool = True,
+        duration: float | None = None,
+    ) -> Transcript:
+        """Transcribe audio using the configured backend.
+
+        With model routing, ``duration`` is the length of the audio in
+        seconds if known, which picks the model. The requested language
+        identifies the source of the audio. With
+        prompt context enabled, recent transcripts of the source are added
+        to the prompt unless ``carry_context`` is False. With ``remember``
+        False, the transcript is only remembered for the source once it is
+        passed to ``remember``, for transcripts that may be discarded.
+
+        With language detection enabled and a model reporting the spoken
+        language, the language last detected for the source is sent as a
+        hint instead of the requested one, which is sent until a language
+        was detected. The audio is transcribed again with detection when the
+        hinted transcript scores poorly.
+        """
+        source = language or ""
+        prompt = self._prompt
+        if carry_context and self._prompt_context is not None:
+            prompt = self._prompt_context.prompt(source, prompt)
+
+        if (
+            self.translate
+            or self._language_cache is None
+            or not self._backend.reports_language(self._model)
+        ):
+            transcript = await self._async_transcribe(
+                audio_file, language, prompt, on_partial, duration
+            )
+        else:
+            hint = self._language_cache.get(source) or language
+            transcript = await self._async_transcribe(
+                audio_file, hint, prompt, on_partial, duration
+            )
+            if (
+                hint is not None
+                and transcript.avg_logprob is not None
+                and transcript.avg_logprob < LANGUAGE_HINT_MIN_LOGPROB
+            ):
+                _LOGGER.debug(
+                    "Transcript in %s scored %.2f, detecting language",
+                    hint,
+                    transcript.avg_logprob,
+                )
+                audio_file[1].seek(0)
+                transcript = await self._async_transcribe(
+                    audio_file, None, prompt, on_partial, duration
+                )
+
+        if remember:
+            self.remember(language, transcript, carry_context=carry_context)
+        return transcript
+
+    def remember(
+        self,
+        language: str | None,
+        transcript: Transcript,
+        *,
+        carry_context: bool = True,
+    ) -> None:
+        """Remember the language detected for a source.
+
+        The transcript is added to the context of the source too, unless
+        ``carry_context`` is False.
+        """
+        source = language or ""
+        if self._language_cache is not None and not self.translate:
+            self._language_cache.update(source, transcript.language)
+        if carry_context and self._prompt_context is not None:
+            self._prompt_context.add(source, transcript.text)
+
+    @property
+    def backend(self) -> STTBackend:
+        """Return the transcription backend."""
+        return self._backend
+
+    @property
+    def prompt(self) -> str:
+        """Return the configured prompt."""
+        return self._prompt
+
+    async def async_close(self) -> None:
+        """Release the resources of the backend, realtime sessions and DSP pool."""
+        if self.dsp is not None:
+            self.dsp.close()
+            self.dsp = None
+        if self.realtime is not None:
+            realtime, self.realtime = self.realtime, None
+            await realtime.async_close()
+        await self._backend.async_close()
 
     @staticmethod
     def get_supported_languages() -> list[str]:
@@ -72,29 +455,136 @@ class OpenAISTTEngine:
                 "pt", "ro", "ru", "sr", "sk", "sl", "es", "sw", "sv", "tl",
                 "ta", "th", "tr", "uk", "ur", "vi", "cy"]
 
+def _session_recorder(
+    hass: HomeAssistant, config_entry: ConfigEntry, recorder: SessionRecorder | None
+) -> SessionRecorder | None:
+    """Return the session recorder of a config entry, None if not recording."""
+    if not config_entry.options.get(CONF_RECORD_SESSIONS, False):
+        return None
+    return recorder or SessionRecorder(
+        hass.config.path(CORPUS_DIR, config_entry.entry_id)
+    )
+
+
+def _realtime_pool(
+    hass: HomeAssistant, config_entry: ConfigEntry, prompt: str
+) -> RealtimeSessionPool:
+    """Return a pool of realtime sessions for a config entry."""
+    return RealtimeSessionPool(
+        async_get_clientsession(hass),
+        config_entry.data.get(CONF_BASE_URL, DEFAULT_BASE_URL),
+        config_entry.data.get(CONF_API_KEY),
+        config_entry.data.get(CONF_MODEL, DEFAULT_MODEL),
+        prompt,
+    )
+
+
+async def async_apply_options(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    """Apply changed options to the live engine of a config entry."""
+    engine: OpenAISTTEngine = hass.data[DOMAIN][config_entry.entry_id]
+    dsp = engine.dsp
+    prompt = engine.prompt
+    engine.apply_options(config_entry.options)
+    engine.recorder = _session_recorder(hass, config_entry, engine.recorder)
+    if engine.dsp is not None and engine.dsp is not dsp:
+        config_entry.async_create_background_task(
+            hass,
+            hass.async_add_executor_job(engine.dsp.warm_up),
+            "openai_stt DSP warm up",
+        )
+    realtime = config_entry.options.get(CONF_REALTIME, False) and isinstance(
+        engine.backend, OpenAIBackend
+    )
+    # Open sessions were configured with the previous prompt
+    if engine.realtime is not None and (not realtime or engine.prompt != prompt):
+        pool, engine.realtime = engine.realtime, None
+        await pool.async_close()
+    if realtime and engine.realtime is None:
+        engine.realtime = _realtime_pool(hass, config_entry, engine.prompt)
+        config_entry.async_create_background_task(
+            hass, engine.realtime.async_warm_up(), "openai_stt realtime warm up"
+        )
+    _LOGGER.debug("Applied options of %s", config_entry.title)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up OpenAI STT platform from a config entry."""
-    api_key = config_entry.data[CONF_API_KEY]
     model = config_entry.data.get(CONF_MODEL, DEFAULT_MODEL)
     prompt = config_entry.data.get(CONF_PROMPT, DEFAULT_PROMPT)
     temperature = config_entry.data.get(CONF_TEMP, DEFAULT_TEMP)
+    timeout = float(config_entry.data.get(CONF_TIMEOUT, DEFAULT_TIMEOUT))
+
+    backend: STTBackend
+    if config_entry.data.get(CONF_BACKEND, DEFAULT_BACKEND) == BACKEND_LOCAL:
+        model = config_entry.data.get(CONF_LOCAL_MODEL, DEFAULT_LOCAL_MODEL)
+        backend = LocalWhisperBackend(
+            model,
+            int(config_entry.data.get(CONF_CPU_THREADS, DEFAULT_CPU_THREADS)),
+        )
+
+    else:
+        backend = OpenAIBackend(
+            config_entry.data.get(CONF_API_KEY),
+            config_entry.data.get(CONF_BASE_URL, DEFAULT_BASE_URL),
+            timeout,
+            int(config_entry.data.get(CONF_MAX_CONNECTIONS, DEFAULT_MAX_CONNECTIONS)),
+            config_entry.data.get(CONF_API_KEYS),
+        )
+
+    engine = OpenAISTTEngine(backend, model, prompt, temperature)
+    engine.apply_options(config_entry.options)
+    engine.recorder = _session_recorder(hass, config_entry, None)
+    if config_entry.options.get(CONF_REALTIME) and isinstance(backend, OpenAIBackend):
+        engine.realtime = _realtime_pool(hass, config_entry, engine.prompt)
+    config_entry.async_on_unload(engine.async_close)
+    hass.data[DOMAIN][config_entry.entry_id] = engine
+
+    async def _async_warm_up() -> None:
+        """Prepare the backend in the background so the first command is fast."""
+        try:
+            await hass.async_add_executor_job(backend.warm_up)
+            if engine.dsp is not None:
+                await hass.async_add_executor_job(engine.dsp.warm_up)
+            if engine.realtime is not None:
+                await engine.realtime.async_warm_up()
+        except Exception as e:  # pylint: disable=broad-except
+            _LOGGER.error("Error preparing transcription backend: %s", e)
 
-    engine = OpenAISTTEngine(api_key, model, prompt, temperature)
-    
-    async_add_entities(
-        [
-            OpenAISTTProvider(
+    @callback
+    def _async_started(hass: HomeAssistant) -> None:
+        """Warm up once Home Assistant started, so boot doesn't wait on it."""
+        config_entry.async_create_background_task(
+            hass, _async_warm_up(), "openai_stt backend warm up"
+        )
+
+    config_entry.async_on_unload(async_at_started(hass, _async_started))
+
+    provider = OpenAISTTProvider(
+        hass,
+        config_entry.entry_id,
+        engine,
+        config_entry.title,
+        timeout,
+    )
+    entities: list[SpeechToTextEntity] = [provider]
+
+    if router_entities := config_entry.options.get(CONF_ROUTER_ENTITIES):
+        entities.append(
+            STTRouterEntity(
                 hass,
                 config_entry.entry_id,
-                engine,
                 config_entry.title,
+                provider,
+                router_entities,
+                config_entry.options.get(CONF_ROUTER_POLICY, DEFAULT_ROUTER_POLICY),
             )
-        ]
-    )
+        )
+
+    async_add_entities(entities)
 
 class OpenAISTTProvider(SpeechToTextEntity):
     """OpenAI STT provider."""
@@ -105,9 +595,11 @@ class OpenAISTTProvider(SpeechToTextEntity):
         entry_id: str,
         engine: OpenAISTTEngine,
         name: str,
+        timeout: float = DEFAULT_TIMEOUT,
     ) -> None:
         """Initialize OpenAI STT provider."""
         self.hass = hass
+        self._timeout = timeout
         self._attr_unique_id = f"{entry_id}_stt"
         self._attr_name = name
         self._engine = engine
@@ -165,46 +657,296 @@ class OpenAISTTProvider(SpeechToTextEntity):
         """Return a list of supported channels."""
         return [AudioChannels.CHANNEL_MONO]
 
+    @callback
+    def _async_fire_partial(self, text: str) -> None:
+        """Fire an event with a partial transcript."""
+        self.hass.bus.async_fire(
+            EVENT_TRANSCRIPT_PARTIAL,
+            {"entity_id": self.entity_id, "text": text},
+        )
+
+    async def _async_process_realtime(
+        self, metadata: SpeechMetadata, stream: AsyncIterable[bytes]
+    ) -> SpeechResult:
+        """Transcribe the audio stream while it is spoken."""
+        realtime = self._engine.realtime
+        assert realtime is not None
+        try:
+            text = await async_cancellable(
+                self._engine.cancellation,
+                realtime.async_transcribe(
+                    metadata.language,
+                    metadata.sample_rate,
+                    stream,
+                    self._timeout,
+                    self._async_fire_partial,
+                ),
+            )
+        except Exception as e:
+            _LOGGER.error("Realtime transcription error: %s", e)
+            return SpeechResult("", SpeechResultState.ERROR)
+        _LOGGER.info(f"Process audio stream end: {text}")
+        return SpeechResult(text, SpeechResultState.SUCCESS)
+
     async def async_process_audio_stream(
         self, metadata: SpeechMetadata, stream: AsyncIterable[bytes]
+    ) -> SpeechResult:
+        """Process audio stream to text, recording the session if enabled.
+
+        Replayed sessions are not recorded, they are in a corpus already.
+        """
+        recorder = self._engine.recorder
+        if recorder is None or replaying_sessions.get():
+            return await self._async_process_audio_stream(metadata, stream)
+        session = recorder.start(self.entity_id, metadata)
+        result = await self._async_process_audio_stream(
+            metadata, session.stream(stream)
+        )
+        session.finish(result)
+        self.hass.async_create_background_task(
+            recorder.async_save(self.hass, session), "openai_stt record session"
+        )
+        return result
+
+    async def _async_process_audio_stream(
+        self, metadata: SpeechMetadata, stream: AsyncIterable[bytes]
     ) -> SpeechResult:
         """Process audio stream to text."""
         _LOGGER.debug("Process audio stream start")
 
-        audio_data = b""
-        async for chunk in stream:
-            audio_data += chunk
+        if (
+            self._engine.realtime is not None
+            and metadata.codec == AudioCodecs.PCM
+            and not self._engine.translate
+        ):
+            return await self._async_process_realtime(metadata, stream)
+
+        info = WavInfo(
+            int(metadata.channel),
+            metadata.bit_rate // 8,
+            int(metadata.sample_rate),
+            0,
+            0,
+        )
+        audio_data, speculation = await self._async_read_stream(
+            metadata, stream, info
+        )
+        info.data_size = len(audio_data)
 
         _LOGGER.debug(f"Process audio stream transcribe: {len(audio_data)} bytes")
 
-        # convert audio data to the correct format
-        wav_stream = io.BytesIO()
+        if (
+            self._engine.speech_gate is not None
+            and metadata.codec == AudioCodecs.PCM
+            and not await self._async_has_speech(audio_data, info)
+        ):
+            if speculation is not None:
+                _discard(speculation)
+            return SpeechResult("", SpeechResultState.SUCCESS)
 
-        with wave.open(wav_stream, 'wb') as wf:
-            wf.setnchannels(metadata.channel)
-            wf.setsampwidth(metadata.bit_rate // 8)
-            wf.setframerate(metadata.sample_rate)
-            wf.writeframes(audio_data)
-        
-        file = ("whisper_audio.wav", wav_stream, "audio/wav")
+        if (
+            metadata.codec != AudioCodecs.PCM
+            and len(audio_data) > MAX_AUDIO_SIZE - WAV_HEADER_SIZE
+        ):
+            _LOGGER.error(
+                "%s audio of %s bytes is over the %s byte limit, only PCM audio "
+                "can be split into segments",
+                metadata.codec,
+                len(audio_data),
+                MAX_AUDIO_SIZE - WAV_HEADER_SIZE,
+            )
+            if speculation is not None:
+                _discard(speculation)
+            return SpeechResult("", SpeechResultState.ERROR)
 
         try:
-            if len(audio_data) > MAX_AUDIO_SIZE:
-                raise MaxLengthExceeded
-                
-            async with async_timeout.timeout(DEFAULT_TIMEOUT):
+            async with async_timeout.timeout(self._timeout):
                 assert self.hass
-                response = await self.hass.async_add_executor_job(
-                    lambda: self._engine.transcribe(file, metadata.language)
+                transcript = (
+                    await self._async_speculative_result(
+                        speculation, metadata.language
+                    )
+                    if speculation is not None
+                    else None
                 )
-                if hasattr(response, 'text'):
-                    _LOGGER.info(f"Process audio stream end: {response.text}")
-                    return SpeechResult(response.text, SpeechResultState.SUCCESS)
-                return SpeechResult("", SpeechResultState.ERROR) 
+                if transcript is None:
+                    transcript = await self._async_transcribe_audio(
+                        audio_data, info, metadata
+                    )
+                _LOGGER.info(f"Process audio stream end: {transcript.text}")
+                if self._engine.timestamp_granularities:
+                    self.hass.bus.async_fire(
+                        EVENT_TRANSCRIPT,
+                        {"entity_id": self.entity_id, **transcript.as_dict()},
+                    )
+                return SpeechResult(transcript.text, SpeechResultState.SUCCESS)
 
-        except MaxLengthExceeded:
-            _LOGGER.error("Maximum length of the audio exceeded")
-            return SpeechResult("", SpeechResultState.ERROR)
         except Exception as e:
             _LOGGER.error("Unknown Error: %s", e)
-            return SpeechResult("", SpeechResultState.ERROR) 
\ No newline at end of file
+            return SpeechResult("", SpeechResultState.ERROR)
+
+    async def _async_read_stream(
+        self,
+        metadata: SpeechMetadata,
+        stream: AsyncIterable[bytes],
+        info: WavInfo,
+    ) -> tuple[memoryview, asyncio.Task[Transcript] | None]:
+        """Buffer the audio stream, transcribing speculatively at pauses.
+
+        In speculative mode, the audio received so far is transcribed as
+        soon as the speaker pauses for long enough, which is usually the end
+        of the command. The transcription is cancelled when speech resumes.
+        Returns the audio and the speculative transcription if it is still
+        valid at the end of the stream.
+        """
+        buffer = PcmBuffer()
+        speculative_pause = self._engine.speculative_pause
+        if speculative_pause is None or metadata.codec != AudioCodecs.PCM:
+            async for chunk in stream:
+                buffer.append(chunk)
+            return buffer.snapshot(), None
+
+        pauses = PauseDetector(
+            info.sample_rate * info.frame_size,
+            self._engine.speech_level,
+            speculative_pause,
+        )
+        speculation: asyncio.Task[Transcript] | None = None
+        try:
+            async for chunk in stream:
+                buffer.append(chunk)
+                paused = pauses.add(chunk)
+                if pauses.speaking and speculation is not None:
+                    _discard(speculation)
+                    self._engine.speculation["cancelled"] += 1
+                    speculation = None
+                elif (
+                    paused
+                    and speculation is None
+                    and len(buffer) <= MAX_AUDIO_SIZE - WAV_HEADER_SIZE
+                ):
+                    _LOGGER.debug("Pause after %s bytes, transcribing", len(buffer))
+                    self._engine.speculation["started"] += 1
+                    speculation = self.hass.async_create_task(
+                        self._engine.async_transcribe(
+                            _wav_file(buffer.snapshot(), info),
+                            metadata.language,
+                            remember=False,
+                            duration=info.seconds(len(buffer)),
+                        )
+                    )
+        except BaseException:
+            if speculation is not None:
+                _discard(speculation)
+            raise
+        return buffer.snapshot(), speculation
+
+    async def _async_speculative_result(
+        self, speculation: asyncio.Task[Transcript], language: str | None
+    ) -> Transcript | None:
+        """Return the result of a speculative transcription, None if it failed."""
+        try:
+            transcript = await speculation
+        except Exception as e:  # pylint: disable=broad-except
+            _LOGGER.debug("Speculative transcription failed: %s", e)
+            self._engine.speculation["failed"] += 1
+            return None
+        self._engine.speculation["used"] += 1
+        self._engine.remember(language, transcript)
+        return transcript
+
+    async def _async_transcribe_audio(
+        self, audio_data: memoryview, info: WavInfo, metadata: SpeechMetadata
+    ) -> Transcript:
+        """Transcribe the buffered audio, in segments if PCM is over the limit."""
+        if (
+            metadata.codec == AudioCodecs.PCM
+            and len(audio_data) > MAX_AUDIO_SIZE - WAV_HEADER_SIZE
+        ):
+            return await self._async_transcribe_segments(
+                audio_data, info, metadata.language
+            )
+        return await self._engine.async_transcribe(
+            _wav_file(audio_data, info),
+            metadata.language,
+            self._async_fire_partial,
+            duration=(
+                info.seconds(len(audio_data))
+                if metadata.codec == AudioCodecs.PCM
+                else None
+            ),
+        )
+
+    async def _async_has_speech(self, audio_data: memoryview, info: WavInfo) -> bool:
+        """Return if the speech gate lets the audio through to be transcribed."""
+        gate = self._engine.speech_gate
+        assert gate is not None
+        detector = await self._engine.async_run_dsp(
+            measure_speech,
+            audio_data,
+            gate.detector(info.channels, info.sample_rate),
+        )
+        decision = gate.decide(detector)
+        gate.record(decision)
+        if decision == GATE_PASSED:
+            return True
+        _LOGGER.debug(
+            "Not transcribing audio, speech gate decided %s: %s",
+            decision,
+            detector.as_dict(),
+        )
+        return False
+
+    async def _async_transcribe_segments(
+        self, audio_data: memoryview, info: WavInfo, language: str | None
+    ) -> Transcript:
+        """Transcribe audio over the size limit as concurrent overlapping segments."""
+        bounds = await self._engine.async_run_dsp(
+            segment_bounds,
+            audio_data,
+            info,
+            (MAX_AUDIO_SIZE - WAV_HEADER_SIZE) // info.frame_size,
+            int(SEGMENT_OVERLAP_SECONDS * info.sample_rate),
+        )
+        _LOGGER.debug("Transcribing audio in %s segments", len(bounds))
+
+        pcm = memoryview(audio_data)
+        files = [
+            (
+                f"whisper_audio.{index}.wav",
+                PcmWavReader(
+                    pcm[start * info.frame_size : end * info.frame_size],
+                    info.channels,
+                    info.sample_width,
+                    info.sample_rate,
+                ),
+                "audio/wav",
+            )
+            for index, (start, end) in enumerate(bounds)
+        ]
+        parts = await asyncio.gather(
+            *(
+                # Parts finish in any order, so they don't carry context
+                self._engine.async_transcribe(
+                    file,
+                    language,
+                    carry_context=False,
+                    duration=(end - start) / info.sample_rate,
+                )
+                for file, (start, end) in zip(files, bounds)
+            )
+        )
+
+        transcript = Transcript(
+            merge_overlapping_transcripts([part.text for part in parts]),
+            parts[0].language,
+            bounds[-1][1] / info.sample_rate,
+        )
+        previous_end: float | None = None
+        for part, (start, end) in zip(parts, bounds):
+            # Timings inside the overlap were reported by the previous part
+            offset = start / info.sample_rate
+            transcript.segments.extend(part.segments, offset, previous_end)
+            transcript.words.extend(part.words, offset, previous_end)
+            previous_end = end / info.sample_rate
+        return transcript
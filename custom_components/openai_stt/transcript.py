@@ -0,0 +1,114 @@
+"""Transcription results of the OpenAI STT integration."""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterator
+from typing import Any
+
+from .language import to_language_code
+
+
+class TimedSpans:
+    """Spans of text with start and end times in seconds.
+
+    Times are kept in float arrays rather than a dict per span, so word
+    level timestamps of long recordings stay small.
+    """
+
+    __slots__ = ("starts", "ends", "texts")
+
+    def __init__(self) -> None:
+        """Initialize an empty list of spans."""
+        self.starts = array("f")
+        self.ends = array("f")
+        self.texts: list[str] = []
+
+    def __len__(self) -> int:
+        """Return the number of spans."""
+        return len(self.texts)
+
+    def __iter__(self) -> Iterator[tuple[float, float, str]]:
+        """Iterate over (start, end, text) tuples."""
+        return zip(self.starts, self.ends, self.texts)
+
+    def append(self, start: float, end: float, text: str) -> None:
+        """Add a span."""
+        self.starts.append(start)
+        self.ends.append(end)
+        self.texts.append(text)
+
+    def extend(
+        self, other: TimedSpans, offset: float = 0.0, after: float | None = None
+    ) -> None:
+        """Add the spans of another list shifted by offset.
+
+        Spans ending at or before ``after`` once shifted are skipped.
+        """
+        for start, end, text in other:
+            if after is None or end + offset > after:
+                self.append(start + offset, end + offset, text)
+
+    def as_list(self) -> list[dict[str, Any]]:
+        """Return the spans as a list of dicts."""
+        return [
+            {"start": round(start, 3), "end": round(end, 3), "text": text}
+            for start, end, text in self
+        ]
+
+
+class Transcript:
+    """The text of a transcription with optional timing information."""
+
+    __slots__ = ("text", "language", "duration", "avg_logprob", "segments", "words")
+
+    def __init__(
+        self,
+        text: str,
+        language: str | None = None,
+        duration: float | None = None,
+        avg_logprob: float | None = None,
+    ) -> None:
+        """Initialize the transcript."""
+        self.text = text
+        self.language = language
+        self.duration = duration
+        self.avg_logprob = avg_logprob
+        self.segments = TimedSpans()
+        self.words = TimedSpans()
+
+    @classmethod
+    def from_verbose_json(cls, response: Any) -> Transcript:
+        """Create a transcript from a verbose_json transcription response.
+
+        The language is reported by name and converted to its code.
+        """
+        transcript = cls(
+            response.text,
+            to_language_code(getattr(response, "language", None)),
+            getattr(response, "duration", None),
+        )
+        segments = getattr(response, "segments", None) or ()
+        for segment in segments:
+            transcript.segments.append(
+                segment.start, segment.end, segment.text.strip()
+            )
+        if segments:
+            transcript.avg_logprob = sum(
+                segment.avg_logprob for segment in segments
+            ) / len(segments)
+        for word in getattr(response, "words", None) or ():
+            transcript.words.append(word.start, word.end, word.word)
+        return transcript
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the transcript as a dict for events and service responses."""
+        result: dict[str, Any] = {"text": self.text}
+        if self.language is not None:
+            result["language"] = self.language
+        if self.duration is not None:
+            result["duration"] = self.duration
+        if self.segments:
+            result["segments"] = self.segments.as_list()
+        if self.words:
+            result["words"] = self.words.as_list()
+        return result
@@ -5,22 +5,38 @@ from __future__ import annotations
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+from .const import SIGNAL_OPTIONS_UPDATED
+from .project import (
+    async_acquire_data,
+    async_release_data,
+    async_update_requests_per_minute,
+)
 
 PLATFORMS = [Platform.STT, Platform.TTS]
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up a config entry."""
+    await async_acquire_data(hass, entry)
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    entry.async_on_unload(entry.add_update_listener(async_update_options))
-    return True
+    credentials = dict(entry.data)
 
+    async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Apply changed options in place, reloading only for new credentials."""
+        if dict(entry.data) != credentials:
+            await hass.config_entries.async_reload(entry.entry_id)
+            return
+        async_update_requests_per_minute(hass, entry)
+        async_dispatcher_send(hass, SIGNAL_OPTIONS_UPDATED.format(entry.entry_id))
 
-async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Handle options update."""
-    await hass.config_entries.async_reload(entry.entry_id)
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+    return True
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
+        async_release_data(hass, entry)
+    return unload_ok
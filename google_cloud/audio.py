@@ -0,0 +1,15 @@
+"""Audio helpers for the Google Cloud integration."""
+
+from __future__ import annotations
+
+import numpy as np
+
+# Raw PCM as delivered by the voice pipeline: signed 16-bit little endian
+PCM_DTYPE = np.dtype("<i2")
+
+
+def frame_rms(samples: np.ndarray, window: int) -> np.ndarray:
+    """Return the RMS level of consecutive windows of mono samples."""
+    usable = len(samples) - len(samples) % window
+    frames = samples[:usable].astype(np.float32).reshape(-1, window)
+    return np.sqrt(np.mean(np.square(frames), axis=1))
@@ -0,0 +1,76 @@
+"""Cooperative cancellation of in-flight Google Cloud requests."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable
+from dataclasses import dataclass
+import time
+from typing import Any, TypeVar
+
+_T = TypeVar("_T")
+
+
+@dataclass(slots=True)
+class CancellationStats:
+    """Counters of cancelled requests.
+
+    The latency is the time from the cancellation until the gRPC call was
+    aborted. Requests that returned a result anyway are counted as leaked.
+    """
+
+    cancelled: int = 0
+    stopping: int = 0
+    leaked: int = 0
+    latency_total: float = 0.0
+    latency_max: float = 0.0
+
+    def record(self, latency: float, leaked: bool) -> None:
+        """Record a cancelled request that stopped."""
+        self.cancelled += 1
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+        if leaked:
+            self.leaked += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters, with latencies in milliseconds."""
+        return {
+            "cancelled": self.cancelled,
+            "stopping": self.stopping,
+            "leaked": self.leaked,
+            "latency_avg_ms": (
+                round(self.latency_total / self.cancelled * 1000, 1)
+                if self.cancelled
+                else None
+            ),
+            "latency_max_ms": round(self.latency_max * 1000, 1),
+        }
+
+
+async def async_cancellable(stats: CancellationStats, work: Awaitable[_T]) -> _T:
+    """Await a request, aborting it and recording how long that took when cancelled.
+
+    The caller is released as soon as it is cancelled, while the request
+    unwinds in its own task. The task only finishes once its gRPC call was
+    aborted, or once a scheduled request left the queue, so its duration is
+    the cancellation latency, and a result means the request ran to
+    completion and leaked.
+    """
+    task = asyncio.ensure_future(work)
+    try:
+        return await asyncio.shield(task)
+    except asyncio.CancelledError:
+        cancelled_at = time.monotonic()
+        task.cancel()
+        stats.stopping += 1
+
+        def _done(task: asyncio.Future[_T]) -> None:
+            stats.stopping -= 1
+            stats.record(
+                time.monotonic() - cancelled_at,
+                not task.cancelled() and task.exception() is None,
+            )
+
+        task.add_done_callback(_done)
+        raise
@@ -19,18 +19,36 @@ from homeassistant.config_entries import (
 )
 from homeassistant.core import callback
 from homeassistant.helpers.selector import (
+    BooleanSelector,
     FileSelector,
     FileSelectorConfig,
+    NumberSelector,
+    NumberSelectorConfig,
     SelectSelector,
     SelectSelectorConfig,
     SelectSelectorMode,
 )
 
 from .const import (
+    CONF_GATE_MAX_CLIPPING,
+    CONF_GATE_MIN_LEVEL,
+    CONF_GATE_MIN_SPEECH_RATIO,
     CONF_KEY_FILE,
+    CONF_MP3_BITRATE,
+    CONF_OGG_BITRATE,
+    CONF_PHRASE_BANK,
+    CONF_REQUESTS_PER_MINUTE,
     CONF_SERVICE_ACCOUNT_INFO,
+    CONF_SPEECH_GATE,
     CONF_STT_MODEL,
+    CONF_TRANSCODE,
+    DEFAULT_GATE_MAX_CLIPPING,
+    DEFAULT_GATE_MIN_LEVEL,
+    DEFAULT_GATE_MIN_SPEECH_RATIO,
     DEFAULT_LANG,
+    DEFAULT_MP3_BITRATE,
+    DEFAULT_OGG_BITRATE,
+    DEFAULT_REQUESTS_PER_MINUTE,
     DEFAULT_STT_MODEL,
     DOMAIN,
     SUPPORTED_STT_MODELS,
@@ -171,6 +189,51 @@ class GoogleCloudOptionsFlowHandler(OptionsFlow):
                         **tts_options_schema(
                             self.config_entry.options, voices, from_config_flow=True
                         ).schema,
+                        vol.Optional(
+                            CONF_PHRASE_BANK,
+                            default=False,
+                        ): BooleanSelector(),
+                        vol.Optional(
+                            CONF_TRANSCODE,
+                            default=False,
+                        ): BooleanSelector(),
+                        vol.Optional(
+                            CONF_MP3_BITRATE,
+                            default=DEFAULT_MP3_BITRATE,
+                        ): vol.All(
+                            NumberSelector(
+                                NumberSelectorConfig(
+                                    min=32,
+                                    max=320,
+                                    step=8,
+                                    unit_of_measurement="kbit/s",
+                                )
+                            ),
+                            vol.Coerce(int),
+                        ),
+                        vol.Optional(
+                            CONF_OGG_BITRATE,
+                            default=DEFAULT_OGG_BITRATE,
+                        ): vol.All(
+                            NumberSelector(
+                                NumberSelectorConfig(
+                                    min=6,
+                                    max=256,
+                                    step=2,
+                                    unit_of_measurement="kbit/s",
+                                )
+                            ),
+                            vol.Coerce(int),
+                        ),
+                        vol.Optional(
+                            CONF_REQUESTS_PER_MINUTE,
+                            default=DEFAULT_REQUESTS_PER_MINUTE,
+                        ): vol.All(
+                            NumberSelector(
+                                NumberSelectorConfig(min=1, max=100000, step=1)
+                            ),
+                            vol.Coerce(int),
+                        ),
                         vol.Optional(
                             CONF_STT_MODEL,
                             default=DEFAULT_STT_MODEL,
@@ -180,6 +243,34 @@ class GoogleCloudOptionsFlowHandler(OptionsFlow):
                                 options=SUPPORTED_STT_MODELS,
                             )
                         ),
+                        vol.Optional(
+                            CONF_SPEECH_GATE,
+                            default=False,
+                        ): BooleanSelector(),
+                        vol.Optional(
+                            CONF_GATE_MIN_LEVEL,
+                            default=DEFAULT_GATE_MIN_LEVEL,
+                        ): NumberSelector(
+                            NumberSelectorConfig(
+                                min=-90, max=0, step=1, unit_of_measurement="dBFS"
+                            )
+                        ),
+                        vol.Optional(
+                            CONF_GATE_MIN_SPEECH_RATIO,
+                            default=DEFAULT_GATE_MIN_SPEECH_RATIO,
+                        ): NumberSelector(
+                            NumberSelectorConfig(
+                                min=0, max=100, step=1, unit_of_measurement="%"
+                            )
+                        ),
+                        vol.Optional(
+                            CONF_GATE_MAX_CLIPPING,
+                            default=DEFAULT_GATE_MAX_CLIPPING,
+                        ): NumberSelector(
+                            NumberSelectorConfig(
+                                min=0, max=100, step=1, unit_of_measurement="%"
+                            )
+                        ),
                     }
                 ),
                 self.config_entry.options,
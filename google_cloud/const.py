@@ -10,6 +10,14 @@ CONF_KEY_FILE = "key_file"
 
 DEFAULT_LANG = "en-US"
 
+CONF_REQUESTS_PER_MINUTE = "requests_per_minute"
+
+# Sent with the entry ID when options were changed without a reload
+SIGNAL_OPTIONS_UPDATED = f"{DOMAIN}_options_updated_{{}}"
+
+# https://cloud.google.com/text-to-speech/quotas
+DEFAULT_REQUESTS_PER_MINUTE = 1000
+
 # TTS constants
 CONF_GENDER = "gender"
 CONF_VOICE = "voice"
@@ -19,15 +27,43 @@ CONF_PITCH = "pitch"
 CONF_GAIN = "gain"
 CONF_PROFILES = "profiles"
 CONF_TEXT_TYPE = "text_type"
+CONF_PHRASE_BANK = "phrase_bank"
+CONF_TRANSCODE = "transcode"
+CONF_MP3_BITRATE = "mp3_bitrate"
+CONF_OGG_BITRATE = "ogg_bitrate"
+
+# Names of the SsmlVoiceGender and AudioEncoding enums of the TTS SDK, so
+# the option schemas can be built without importing it
+SSML_GENDERS = ["SSML_VOICE_GENDER_UNSPECIFIED", "MALE", "FEMALE", "NEUTRAL"]
+AUDIO_ENCODINGS = [
+    "AUDIO_ENCODING_UNSPECIFIED",
+    "LINEAR16",
+    "MP3",
+    "OGG_OPUS",
+    "MULAW",
+    "ALAW",
+]
 
 DEFAULT_SPEED = 1.0
 DEFAULT_PITCH = 0
 DEFAULT_GAIN = 0
+# Bitrates of locally transcoded speech in kbit/s
+DEFAULT_MP3_BITRATE = 128
+DEFAULT_OGG_BITRATE = 48
 
 # STT constants
 CONF_STT_MODEL = "stt_model"
 
+CONF_SPEECH_GATE = "speech_gate"
+CONF_GATE_MIN_LEVEL = "gate_min_level"
+CONF_GATE_MIN_SPEECH_RATIO = "gate_min_speech_ratio"
+CONF_GATE_MAX_CLIPPING = "gate_max_clipping"
+
 DEFAULT_STT_MODEL = "latest_short"
+# Speech gate thresholds: dBFS, percent of windows, percent of samples
+DEFAULT_GATE_MIN_LEVEL = -50
+DEFAULT_GATE_MIN_SPEECH_RATIO = 5
+DEFAULT_GATE_MAX_CLIPPING = 10
 
 # https://cloud.google.com/speech-to-text/docs/transcription-model
 SUPPORTED_STT_MODELS = [
@@ -0,0 +1,35 @@
+"""Diagnostics support for Google Cloud."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_SERVICE_ACCOUNT_INFO, DOMAIN
+from .project import GoogleCloudData
+
+TO_REDACT = {CONF_SERVICE_ACCOUNT_INFO}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    diagnostics: dict[str, Any] = {
+        "data": async_redact_data(dict(entry.data), TO_REDACT),
+        "options": dict(entry.options),
+    }
+    data: GoogleCloudData | None = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if data is not None:
+        diagnostics["stt_cancellation"] = data.stt_cancellation.as_dict()
+        diagnostics["tts_single_flight"] = data.tts_single_flight.as_dict()
+        if data.speech_gate is not None:
+            diagnostics["speech_gate"] = dict(data.speech_gate.decisions)
+        diagnostics["scheduler"] = {
+            "requests_per_minute": data.scheduler.requests_per_minute,
+            "waiting": data.scheduler.waiting,
+        }
+    return diagnostics
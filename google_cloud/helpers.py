@@ -2,16 +2,13 @@
 
 from __future__ import annotations
 
-from collections.abc import Mapping
-import functools
-import operator
-from typing import Any
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
 
-from google.cloud import texttospeech
-from google.oauth2.service_account import Credentials
 import voluptuous as vol
 
-from homeassistant.components.tts import CONF_LANG
+from homeassistant.components.tts import CONF_LANG, Voice
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.selector import (
     NumberSelector,
@@ -22,6 +19,7 @@ from homeassistant.helpers.selector import (
 )
 
 from .const import (
+    AUDIO_ENCODINGS,
     CONF_ENCODING,
     CONF_GAIN,
     CONF_GENDER,
@@ -35,28 +33,205 @@ from .const import (
     DEFAULT_LANG,
     DEFAULT_PITCH,
     DEFAULT_SPEED,
+    SSML_GENDERS,
 )
 
+if TYPE_CHECKING:
+    from google.cloud import texttospeech
+
 DEFAULT_VOICE = ""
 
+OptionsKey = tuple[tuple[str, Any], ...]
+
+
+def _freeze(value: Any) -> Any:
+    """Return a hashable copy of an option value, freezing nested values."""
+    if isinstance(value, Mapping):
+        return options_key(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        frozen = tuple(_freeze(item) for item in value)
+        return frozenset(frozen) if isinstance(value, (set, frozenset)) else frozen
+    return value
+
+
+def options_key(options: Mapping[str, Any]) -> OptionsKey:
+    """Return a hashable key of TTS options that doesn't depend on their order."""
+    return tuple(sorted((key, _freeze(value)) for key, value in options.items()))
+
+
+@dataclass(frozen=True, slots=True)
+class SynthesisTemplate:
+    """A synthesize request built from validated options, without the text."""
+
+    options_key: OptionsKey
+    text_type: str
+    voice: texttospeech.VoiceSelectionParams
+    audio_config: texttospeech.AudioConfig
+    extension: str
+
+    def request(self, message: str) -> texttospeech.SynthesizeSpeechRequest:
+        """Return the synthesize request for a message."""
+        # pylint: disable-next=import-outside-toplevel
+        from google.cloud import texttospeech
+
+        return texttospeech.SynthesizeSpeechRequest(
+            input=texttospeech.SynthesisInput(**{self.text_type: message}),
+            voice=self.voice,
+            audio_config=self.audio_config,
+        )
+
+
+def synthesis_template(
+    language: str, options: Mapping[str, Any], voices: VoiceIndex
+) -> SynthesisTemplate:
+    """Build the request template of validated TTS options.
+
+    The SDK was imported with the clients of the config entry, or of the
+    legacy provider, before any request is made.
+    """
+    # pylint: disable-next=import-outside-toplevel
+    from google.cloud import texttospeech
+
+    encoding: texttospeech.AudioEncoding = texttospeech.AudioEncoding[
+        options[CONF_ENCODING]
+    ]  # type: ignore[misc]
+    gender: texttospeech.SsmlVoiceGender | None = texttospeech.SsmlVoiceGender[
+        options[CONF_GENDER]
+    ]  # type: ignore[misc]
+    voice = options[CONF_VOICE]
+    if voice:
+        gender = None
+        language = voices.voice_language(voice, language)
+
+    if encoding == texttospeech.AudioEncoding.MP3:
+        extension = "mp3"
+    elif encoding == texttospeech.AudioEncoding.OGG_OPUS:
+        extension = "ogg"
+    else:
+        extension = "wav"
+
+    return SynthesisTemplate(
+        options_key=options_key(options),
+        text_type=options[CONF_TEXT_TYPE],
+        voice=texttospeech.VoiceSelectionParams(
+            language_code=language,
+            ssml_gender=gender,
+            name=voice,
+        ),
+        # Avoid: "This voice does not support speaking rate or pitch parameters at this time."
+        # by not specifying the fields unless they differ from the defaults
+        audio_config=texttospeech.AudioConfig(
+            audio_encoding=encoding,
+            speaking_rate=(
+                options[CONF_SPEED] if options[CONF_SPEED] != DEFAULT_SPEED else None
+            ),
+            pitch=(
+                options[CONF_PITCH] if options[CONF_PITCH] != DEFAULT_PITCH else None
+            ),
+            volume_gain_db=(
+                options[CONF_GAIN] if options[CONF_GAIN] != DEFAULT_GAIN else None
+            ),
+            effects_profile_id=options[CONF_PROFILES],
+        ),
+        extension=extension,
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class VoiceInfo:
+    """A voice of the Google Cloud TTS catalog."""
+
+    name: str
+    language_codes: tuple[str, ...]
+
+
+def voice_language(name: str) -> str:
+    """Return the language code a voice name starts with."""
+    return "-".join(name.split("-", 2)[:2])
+
+
+class VoiceIndex(Mapping[str, list[str]]):
+    """Voices of the catalog indexed by name and language.
+
+    As a mapping it returns the voice names of each language code, including
+    every language of multi-language voices.
+    """
+
+    def __init__(self, voices: list[VoiceInfo] | None = None) -> None:
+        """Init the voice index."""
+        self._voices: dict[str, VoiceInfo] = {}
+        self._by_language: dict[str, list[str]] = {}
+        self._supported_voices: dict[str, list[Voice]] = {}
+        for voice in voices or ():
+            self.add(voice)
+
+    def add(self, voice: VoiceInfo) -> None:
+        """Add a voice to the index."""
+        self._voices[voice.name] = voice
+        self._supported_voices.clear()
+        for language_code in voice.language_codes:
+            self._by_language.setdefault(language_code, []).append(voice.name)
+
+    def __getitem__(self, language_code: str) -> list[str]:
+        """Return the voice names of a language."""
+        return self._by_language[language_code]
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the language codes."""
+        return iter(self._by_language)
+
+    def __len__(self) -> int:
+        """Return the number of language codes."""
+        return len(self._by_language)
+
+    @property
+    def names(self) -> list[str]:
+        """Return the names of all voices."""
+        return list(self._voices)
+
+    def voice_language(self, name: str, language: str) -> str:
+        """Return the language to request a voice with.
+
+        The requested language is kept if the voice speaks it, otherwise the
+        voice's own language is used.
+        """
+        if (voice := self._voices.get(name)) is None:
+            return language if name.startswith(language) else voice_language(name)
+        if language in voice.language_codes:
+            return language
+        return voice.language_codes[0]
+
+    def supported_voices(self, language: str) -> list[Voice] | None:
+        """Return the voices of a language, built once per language."""
+        if (voices := self._supported_voices.get(language)) is not None:
+            return voices
+        if not (names := self._by_language.get(language)):
+            return None
+        voices = self._supported_voices[language] = [
+            Voice(name, name) for name in names
+        ]
+        return voices
+
 
 async def async_tts_voices(
     client: texttospeech.TextToSpeechAsyncClient,
-) -> dict[str, list[str]]:
-    """Get TTS voice model names keyed by language."""
-    voices: dict[str, list[str]] = {}
+) -> VoiceIndex:
+    """Get the TTS voices of the catalog."""
     list_voices_response = await client.list_voices()
-    for voice in list_voices_response.voices:
-        language_code = voice.language_codes[0]
-        if language_code not in voices:
-            voices[language_code] = []
-        voices[language_code].append(voice.name)
-    return voices
+    return VoiceIndex(
+        [
+            VoiceInfo(
+                name=voice.name,
+                language_codes=tuple(voice.language_codes),
+            )
+            for voice in list_voices_response.voices
+        ]
+    )
 
 
 def tts_options_schema(
     config_options: Mapping[str, Any],
-    voices: dict[str, list[str]],
+    voices: VoiceIndex,
     from_config_flow: bool = False,
 ) -> vol.Schema:
     """Return schema for TTS options with default values from config or constants."""
@@ -70,14 +245,14 @@ def tts_options_schema(
                 CONF_GENDER,
                 default=defaults.get(
                     CONF_GENDER,
-                    texttospeech.SsmlVoiceGender.NEUTRAL.name,  # type: ignore[attr-defined]
+                    "NEUTRAL",
                 ),
             ): vol.All(
                 vol.Upper,
                 SelectSelector(
                     SelectSelectorConfig(
                         mode=SelectSelectorMode.DROPDOWN,
-                        options=list(texttospeech.SsmlVoiceGender.__members__),
+                        options=SSML_GENDERS,
                     )
                 ),
             ),
@@ -87,21 +262,21 @@ def tts_options_schema(
             ): SelectSelector(
                 SelectSelectorConfig(
                     mode=SelectSelectorMode.DROPDOWN,
-                    options=["", *functools.reduce(operator.iadd, voices.values(), [])],
+                    options=["", *voices.names],
                 )
             ),
             vol.Optional(
                 CONF_ENCODING,
                 default=defaults.get(
                     CONF_ENCODING,
-                    texttospeech.AudioEncoding.MP3.name,  # type: ignore[attr-defined]
+                    "MP3",
                 ),
             ): vol.All(
                 vol.Upper,
                 SelectSelector(
                     SelectSelectorConfig(
                         mode=SelectSelectorMode.DROPDOWN,
-                        options=list(texttospeech.AudioEncoding.__members__),
+                        options=AUDIO_ENCODINGS,
                     )
                 ),
             ),
@@ -162,7 +337,7 @@ def tts_platform_schema() -> vol.Schema:
             vol.Optional(CONF_LANG, default=DEFAULT_LANG): cv.matches_regex(
                 r"[a-z]{2,3}-[A-Z]{2}|"
             ),
-            **tts_options_schema({}, {}).schema,
+            **tts_options_schema({}, VoiceIndex()).schema,
             vol.Optional(CONF_VOICE, default=DEFAULT_VOICE): cv.matches_regex(
                 r"[a-z]{2,3}-[A-Z]{2}-.*-[A-Z]|"
             ),
@@ -180,4 +355,7 @@ def validate_service_account_info(info: Mapping[str, str]) -> None:
         ValueError: If the info is not in the expected format.
 
     """
+    # pylint: disable-next=import-outside-toplevel
+    from google.oauth2.service_account import Credentials
+
     Credentials.from_service_account_info(info)  # type:ignore[no-untyped-call]
@@ -0,0 +1,213 @@
+"""Phrase bank of pre-rendered Google Cloud TTS audio."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Iterator, Mapping
+import logging
+from typing import Any
+
+from homeassistant.components.tts import ATTR_LANGUAGE, ATTR_MESSAGE, ATTR_OPTIONS
+from homeassistant.const import ATTR_ENTITY_ID, CONF_TARGET
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.template import is_template_string
+
+from .helpers import OptionsKey
+
+_LOGGER = logging.getLogger(__name__)
+
+# Phrases synthesized at the same time while warming up, kept low so the
+# warm-up never competes with interactive requests for quota
+PHRASE_BANK_CONCURRENCY = 2
+PHRASE_BANK_MAX_PHRASES = 500
+PHRASE_BANK_MAX_BYTES = 32 * 1024 * 1024
+
+TTS_SPEAK_SERVICE = "tts.speak"
+
+PhraseKey = tuple[str, str, OptionsKey]
+
+
+def phrase_key(message: str, language: str, options: OptionsKey) -> PhraseKey:
+    """Return the key of a phrase with the key of its validated options."""
+    return (message, language, options)
+
+
+def _walk(config: Any) -> Iterator[Mapping[str, Any]]:
+    """Yield every mapping nested in an automation or script config."""
+    if isinstance(config, Mapping):
+        yield config
+        for value in config.values():
+            yield from _walk(value)
+    elif isinstance(config, list):
+        for value in config:
+            yield from _walk(value)
+
+
+def _targets_entity(action: Mapping[str, Any], entity_id: str) -> bool:
+    """Return if a tts.speak action targets the entity."""
+    for container in (action, action.get(CONF_TARGET), action.get("data")):
+        if not isinstance(container, Mapping):
+            continue
+        targets = container.get(ATTR_ENTITY_ID)
+        if targets == entity_id or (
+            isinstance(targets, list) and entity_id in targets
+        ):
+            return True
+    return False
+
+
+def find_static_phrases(
+    configs: list[Any], entity_id: str
+) -> list[tuple[str, str | None, dict[str, Any]]]:
+    """Return the static tts.speak messages of automation and script configs.
+
+    Only actions targeting the entity are included. Messages, languages and
+    options containing templates are skipped since their text is only known
+    when the action runs.
+    """
+    phrases: dict[
+        tuple[str, str | None, str], tuple[str, str | None, dict[str, Any]]
+    ] = {}
+    for config in configs:
+        for action in _walk(config):
+            if action.get("action", action.get("service")) != TTS_SPEAK_SERVICE:
+                continue
+            data = action.get("data")
+            if not isinstance(data, Mapping) or not _targets_entity(action, entity_id):
+                continue
+            message = data.get(ATTR_MESSAGE)
+            language = data.get(ATTR_LANGUAGE)
+            options = data.get(ATTR_OPTIONS) or {}
+            if (
+                not isinstance(message, str)
+                or is_template_string(message)
+                or (language is not None and not isinstance(language, str))
+                or (language is not None and is_template_string(language))
+                or not isinstance(options, Mapping)
+                or any(
+                    isinstance(value, str) and is_template_string(value)
+                    for value in options.values()
+                )
+            ):
+                continue
+            phrases.setdefault(
+                (message, language, repr(sorted(options.items()))),
+                (message, language, dict(options)),
+            )
+    return list(phrases.values())
+
+
+def automation_and_script_configs(hass: HomeAssistant) -> list[Any]:
+    """Return the raw configs of all automations and scripts."""
+    configs: list[Any] = []
+    for domain in ("automation", "script"):
+        if (component := hass.data.get(domain)) is None:
+            continue
+        configs.extend(
+            raw_config
+            for entity in component.entities
+            if (raw_config := getattr(entity, "raw_config", None)) is not None
+        )
+    return configs
+
+
+class PhraseBank:
+    """Compact store of pre-rendered phrases.
+
+    The audio of all phrases is appended to a single buffer, indexed by
+    phrase key, instead of being kept as one bytes object per phrase.
+    """
+
+    def __init__(
+        self,
+        max_phrases: int = PHRASE_BANK_MAX_PHRASES,
+        max_bytes: int = PHRASE_BANK_MAX_BYTES,
+    ) -> None:
+        """Init the phrase bank."""
+        self._max_phrases = max_phrases
+        self._max_bytes = max_bytes
+        self._audio = bytearray()
+        self._index: dict[PhraseKey, tuple[str, int, int]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of phrases."""
+        return len(self._index)
+
+    def __contains__(self, key: object) -> bool:
+        """Return if a phrase is in the bank."""
+        return key in self._index
+
+    @property
+    def size(self) -> int:
+        """Return the size of the stored audio in bytes."""
+        return len(self._audio)
+
+    def get(self, key: PhraseKey) -> tuple[str, bytes] | None:
+        """Return the extension and audio of a phrase."""
+        if (entry := self._index.get(key)) is None:
+            return None
+        extension, offset, length = entry
+        return extension, bytes(self._audio[offset : offset + length])
+
+    def add(self, key: PhraseKey, extension: str, audio: bytes) -> bool:
+        """Store a phrase, returning False if the bank is full."""
+        if key in self._index:
+            return True
+        if (
+            len(self._index) >= self._max_phrases
+            or len(self._audio) + len(audio) > self._max_bytes
+        ):
+            return False
+        self._index[key] = (extension, len(self._audio), len(audio))
+        self._audio += audio
+        return True
+
+
+async def async_warm_up_phrase_bank(
+    bank: PhraseBank,
+    phrases: list[tuple[str, str | None, dict[str, Any]]],
+    synthesize: Callable[
+        [str, str | None, dict[str, Any]],
+        Awaitable[tuple[PhraseKey, str, bytes] | None],
+    ],
+    concurrency: int = PHRASE_BANK_CONCURRENCY,
+) -> None:
+    """Synthesize phrases into the bank with bounded concurrency.
+
+    ``synthesize`` returns the key, extension and audio of a phrase, or None
+    if it can't be synthesized.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    full = False
+
+    async def _async_synthesize(
+        message: str, language: str | None, options: dict[str, Any]
+    ) -> None:
+        nonlocal full
+        async with semaphore:
+            if full:
+                return
+            try:
+                result = await synthesize(message, language, options)
+            except Exception as err:  # noqa: BLE001
+                _LOGGER.debug("Error pre-rendering %r: %s", message, err)
+                return
+            if result is not None and not bank.add(*result):
+                full = True
+                _LOGGER.warning(
+                    "Phrase bank is full, %s phrases are not pre-rendered",
+                    len(phrases) - len(bank),
+                )
+
+    await asyncio.gather(
+        *(
+            _async_synthesize(message, language, options)
+            for message, language, options in phrases
+        )
+    )
+    _LOGGER.debug(
+        "Pre-rendered %s of %s phrases in %s bytes",
+        len(bank),
+        len(phrases),
+        bank.size,
+    )
@@ -0,0 +1,156 @@
+"""Clients and schedulers shared by the config entries of a Google Cloud project."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+
+from .cancellation import CancellationStats
+from .const import (
+    CONF_REQUESTS_PER_MINUTE,
+    CONF_SERVICE_ACCOUNT_INFO,
+    DEFAULT_REQUESTS_PER_MINUTE,
+    DOMAIN,
+)
+from .scheduler import RequestScheduler
+from .single_flight import SingleFlight
+from .speech_gate import SpeechGate
+
+if TYPE_CHECKING:
+    from google.cloud import speech_v1, texttospeech
+
+DATA_PROJECTS = f"{DOMAIN}_projects"
+
+
+@dataclass(slots=True)
+class GoogleCloudAccount:
+    """Clients of a service account, shared by the config entries using it."""
+
+    tts_client: texttospeech.TextToSpeechAsyncClient
+    stt_client: speech_v1.SpeechAsyncClient
+    entry_ids: set[str] = field(default_factory=set)
+
+
+@dataclass(slots=True)
+class GoogleCloudProject:
+    """Request scheduler and service accounts of a Google Cloud project."""
+
+    scheduler: RequestScheduler
+    accounts: dict[str, GoogleCloudAccount] = field(default_factory=dict)
+    entry_ids: set[str] = field(default_factory=set)
+
+
+@dataclass(slots=True)
+class GoogleCloudData:
+    """Shared state used by a config entry."""
+
+    account: GoogleCloudAccount
+    scheduler: RequestScheduler
+    stt_cancellation: CancellationStats = field(default_factory=CancellationStats)
+    speech_gate: SpeechGate | None = None
+    tts_single_flight: SingleFlight[tuple[str, bytes]] = field(
+        default_factory=SingleFlight
+    )
+
+
+def _project_id(service_account_info: dict[str, Any]) -> str:
+    """Return the project of a service account."""
+    return str(service_account_info.get("project_id", ""))
+
+
+def _create_account(service_account_info: dict[str, Any]) -> GoogleCloudAccount:
+    """Create the clients of a service account.
+
+    The SDKs are imported here, in the executor, rather than when the
+    integration is loaded, since importing them and building the clients
+    takes a noticeable time on slower hosts.
+    """
+    # pylint: disable-next=import-outside-toplevel
+    from google.cloud import speech_v1, texttospeech
+
+    # pylint: disable-next=import-outside-toplevel
+    from google.oauth2.service_account import Credentials
+
+    credentials = Credentials.from_service_account_info(  # type: ignore[no-untyped-call]
+        service_account_info
+    )
+    return GoogleCloudAccount(
+        texttospeech.TextToSpeechAsyncClient(credentials=credentials),
+        speech_v1.SpeechAsyncClient(credentials=credentials),
+    )
+
+
+async def async_acquire_data(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> GoogleCloudData:
+    """Return the clients and scheduler of a config entry.
+
+    Config entries of the same project share one scheduler, and entries
+    using the same service account share its credentials and clients.
+    """
+    service_account_info = entry.data[CONF_SERVICE_ACCOUNT_INFO]
+    requests_per_minute = entry.options.get(
+        CONF_REQUESTS_PER_MINUTE, DEFAULT_REQUESTS_PER_MINUTE
+    )
+    projects: dict[str, GoogleCloudProject] = hass.data.setdefault(DATA_PROJECTS, {})
+    project_id = _project_id(service_account_info)
+    if (project := projects.get(project_id)) is None:
+        project = projects[project_id] = GoogleCloudProject(
+            RequestScheduler(requests_per_minute)
+        )
+    elif requests_per_minute < project.scheduler.requests_per_minute:
+        # The quota is per project, the lowest configured quota is the safest
+        project.scheduler.requests_per_minute = requests_per_minute
+
+    project.entry_ids.add(entry.entry_id)
+    client_email = str(service_account_info.get("client_email", ""))
+    if (account := project.accounts.get(client_email)) is None:
+        created = await hass.async_add_executor_job(
+            _create_account, service_account_info
+        )
+        # Another entry of the account may have been set up in the meantime
+        account = project.accounts.setdefault(client_email, created)
+    account.entry_ids.add(entry.entry_id)
+    data = GoogleCloudData(account, project.scheduler)
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = data
+    return data
+
+
+@callback
+def async_update_requests_per_minute(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply the lowest request quota of the entries of a project to its scheduler."""
+    projects: dict[str, GoogleCloudProject] = hass.data.get(DATA_PROJECTS, {})
+    project_id = _project_id(entry.data[CONF_SERVICE_ACCOUNT_INFO])
+    if (project := projects.get(project_id)) is None:
+        return
+    quotas = [
+        project_entry.options.get(
+            CONF_REQUESTS_PER_MINUTE, DEFAULT_REQUESTS_PER_MINUTE
+        )
+        for entry_id in project.entry_ids
+        if (project_entry := hass.config_entries.async_get_entry(entry_id))
+        is not None
+    ]
+    if quotas:
+        project.scheduler.requests_per_minute = min(quotas)
+
+
+@callback
+def async_release_data(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Release the shared state of an unloaded config entry."""
+    hass.data.get(DOMAIN, {}).pop(entry.entry_id, None)
+    projects: dict[str, GoogleCloudProject] = hass.data.get(DATA_PROJECTS, {})
+    project_id = _project_id(entry.data[CONF_SERVICE_ACCOUNT_INFO])
+    if (project := projects.get(project_id)) is None:
+        return
+    project.entry_ids.discard(entry.entry_id)
+    for client_email, account in list(project.accounts.items()):
+        account.entry_ids.discard(entry.entry_id)
+        if not account.entry_ids:
+            del project.accounts[client_email]
+    if not project.entry_ids:
+        project.scheduler.close()
+        del projects[project_id]
@@ -0,0 +1,190 @@
+"""Quota-aware request scheduler for Google Cloud."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict, deque
+from collections.abc import Awaitable, Callable
+import logging
+import time
+from typing import TypeVar
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# Requests of a higher priority class are always sent first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_BULK)
+
+# Requests that may be sent at once after an idle period, in seconds of quota
+BURST_SECONDS = 2.0
+# Pause after the project ran out of quota, doubled while it keeps happening
+BACKOFF_INITIAL = 1.0
+BACKOFF_MAX = 30.0
+
+
+class RequestScheduler:
+    """Schedule the requests of all config entries of a Google Cloud project.
+
+    Requests take a token from a bucket refilled at the project's quota.
+    Waiting requests are served by priority class, and round robin across
+    config entries within a class, so a burst of one entry doesn't starve
+    the others. When Google reports the quota is exhausted anyway, no
+    requests are sent until a backoff period has passed.
+    """
+
+    def __init__(self, requests_per_minute: int) -> None:
+        """Init the scheduler."""
+        self._rate = requests_per_minute / 60
+        self._capacity = max(1.0, self._rate * BURST_SECONDS)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._backoff = BACKOFF_INITIAL
+        self._queues: dict[int, OrderedDict[str, deque[asyncio.Future[None]]]] = {
+            priority: OrderedDict() for priority in PRIORITIES
+        }
+        self._timer: asyncio.TimerHandle | None = None
+
+    @property
+    def requests_per_minute(self) -> int:
+        """Return the request rate."""
+        return round(self._rate * 60)
+
+    @requests_per_minute.setter
+    def requests_per_minute(self, requests_per_minute: int) -> None:
+        """Change the request rate."""
+        self._refill()
+        self._rate = requests_per_minute / 60
+        self._capacity = max(1.0, self._rate * BURST_SECONDS)
+        self._tokens = min(self._tokens, self._capacity)
+
+    @property
+    def waiting(self) -> int:
+        """Return the number of requests waiting for a token."""
+        return sum(
+            len(waiters)
+            for queues in self._queues.values()
+            for waiters in queues.values()
+        )
+
+    def _refill(self) -> None:
+        """Add the tokens earned since the last refill."""
+        now = time.monotonic()
+        self._tokens = min(
+            self._capacity, self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+
+    def _next_waiter(self) -> asyncio.Future[None] | None:
+        """Pop the next waiting request by priority and round robin."""
+        for queues in self._queues.values():
+            while queues:
+                entry_id, waiters = next(iter(queues.items()))
+                waiter = waiters.popleft()
+                if waiters:
+                    queues.move_to_end(entry_id)
+                else:
+                    del queues[entry_id]
+                if not waiter.done():
+                    return waiter
+        return None
+
+    def _dispatch(self) -> None:
+        """Hand out tokens to waiting requests."""
+        self._timer = None
+        self._refill()
+        now = time.monotonic()
+        if now < self._paused_until:
+            self._schedule(self._paused_until - now)
+            return
+        while self._tokens >= 1:
+            if (waiter := self._next_waiter()) is None:
+                return
+            self._tokens -= 1
+            waiter.set_result(None)
+        if self.waiting:
+            self._schedule((1 - self._tokens) / self._rate)
+
+    def _schedule(self, delay: float) -> None:
+        """Dispatch again after a delay."""
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                delay, self._dispatch
+            )
+
+    async def async_acquire(self, entry_id: str, priority: int) -> None:
+        """Wait until a request of a config entry may be sent."""
+        self._refill()
+        if (
+            self._tokens >= 1
+            and time.monotonic() >= self._paused_until
+            and not any(self._queues[p] for p in PRIORITIES if p <= priority)
+        ):
+            self._tokens -= 1
+            return
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._queues[priority].setdefault(entry_id, deque()).append(waiter)
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The token was granted after all, give it to the next request
+                self._tokens += 1
+                self._dispatch()
+            raise
+
+    def throttle(self) -> None:
+        """Pause all requests after the project's quota was exhausted."""
+        self._paused_until = time.monotonic() + self._backoff
+        _LOGGER.warning(
+            "Google Cloud quota exhausted, pausing requests for %.0f seconds",
+            self._backoff,
+        )
+        self._backoff = min(self._backoff * 2, BACKOFF_MAX)
+        self._tokens = 0
+
+    async def async_run(
+        self,
+        entry_id: str,
+        priority: int,
+        call: Callable[[], Awaitable[_T]],
+        retries: int = 0,
+    ) -> _T:
+        """Run a request when the scheduler allows it.
+
+        Requests failing with ResourceExhausted pause the scheduler and are
+        retried up to ``retries`` times.
+        """
+        # Imported with the clients, which are created before any request
+        # pylint: disable-next=import-outside-toplevel
+        from google.api_core.exceptions import ResourceExhausted
+
+        attempt = 0
+        while True:
+            await self.async_acquire(entry_id, priority)
+            try:
+                result = await call()
+            except ResourceExhausted:
+                self.throttle()
+                if attempt >= retries:
+                    raise
+                attempt += 1
+                continue
+            self._backoff = BACKOFF_INITIAL
+            return result
+
+    def close(self) -> None:
+        """Cancel the requests still waiting."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for queues in self._queues.values():
+            for waiters in queues.values():
+                for waiter in waiters:
+                    waiter.cancel()
+            queues.clear()
@@ -0,0 +1,70 @@
+"""Sharing of identical in-flight Google Cloud requests."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Coroutine, Hashable
+from dataclasses import dataclass
+from typing import Any, Generic, TypeVar
+
+_T = TypeVar("_T")
+
+
+@dataclass(slots=True)
+class _Flight(Generic[_T]):
+    """A request in flight and the number of callers awaiting it."""
+
+    task: asyncio.Task[_T]
+    waiters: int = 0
+
+
+class SingleFlight(Generic[_T]):
+    """Run one request for concurrent callers asking for the same thing.
+
+    The first caller starts the request in its own task and callers with
+    the same key arriving while it runs await that task too, so they all
+    get its result or its error. A cancelled caller only stops waiting; the
+    request is cancelled once no caller is waiting for it anymore. Finished
+    requests are forgotten, results are not cached.
+    """
+
+    def __init__(self) -> None:
+        """Initialize with no requests in flight."""
+        self._flights: dict[Hashable, _Flight[_T]] = {}
+        self.calls = 0
+        self.deduplicated = 0
+
+    async def async_run(
+        self, key: Hashable, work: Callable[[], Coroutine[Any, Any, _T]]
+    ) -> _T:
+        """Return the result of the request of a key, starting it if needed."""
+        self.calls += 1
+        if (flight := self._flights.get(key)) is None:
+            flight = self._flights[key] = _Flight(asyncio.create_task(work()))
+
+            def _forget(task: asyncio.Task[_T]) -> None:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+
+            flight.task.add_done_callback(_forget)
+        else:
+            self.deduplicated += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.task.done():
+                # Every caller was cancelled, a new caller starts over
+                flight.task.cancel()
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters for diagnostics."""
+        return {
+            "calls": self.calls,
+            "deduplicated": self.deduplicated,
+            "in_flight": len(self._flights),
+        }
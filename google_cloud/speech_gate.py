@@ -0,0 +1,138 @@
+"""Pre-flight check for speech in audio before it is sent to Google Cloud STT."""
+
+from __future__ import annotations
+
+from collections import Counter
+import math
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from .audio import PCM_DTYPE, frame_rms
+
+if TYPE_CHECKING:
+    from collections.abc import Buffer
+
+# Length of the windows whose level decides if they contain speech
+SPEECH_WINDOW_SECONDS = 0.03
+# Samples at or beyond this magnitude are counted as clipped
+CLIPPING_LEVEL = 32700
+FULL_SCALE = 32768
+
+GATE_PASSED = "passed"
+GATE_SILENT = "silent"
+GATE_NO_SPEECH = "no_speech"
+GATE_CLIPPED = "clipped"
+
+
+def to_dbfs(level: float) -> float:
+    """Return a 16-bit sample level in dB relative to full scale."""
+    return 20 * math.log10(level / FULL_SCALE) if level > 0 else -math.inf
+
+
+class SpeechDetector:
+    """Running levels of 16-bit PCM audio, fed as a whole or chunk by chunk.
+
+    Every chunk is measured with a few vectorized passes. Samples that don't
+    fill a window yet are carried over to the next chunk.
+    """
+
+    def __init__(self, channels: int, sample_rate: int, speech_level: float) -> None:
+        """Init the detector for windows louder than speech_level dBFS."""
+        self._window = max(1, int(sample_rate * SPEECH_WINDOW_SECONDS)) * channels
+        self._speech_rms = FULL_SCALE * 10 ** (speech_level / 20)
+        self._carry = np.empty(0, dtype=PCM_DTYPE)
+        self.samples = 0
+        self.windows = 0
+        self.speech_windows = 0
+        self._square_sum = 0.0
+        self._peak = 0
+        self._clipped = 0
+
+    def add(self, pcm: Buffer) -> None:
+        """Measure a chunk of whole samples."""
+        samples = np.frombuffer(pcm, dtype=PCM_DTYPE)
+        if not len(samples):
+            return
+        magnitudes = np.abs(samples.astype(np.int32))
+        wide = samples.astype(np.float64)
+        self.samples += len(samples)
+        self._square_sum += float(np.dot(wide, wide))
+        self._peak = max(self._peak, int(magnitudes.max()))
+        self._clipped += int(np.count_nonzero(magnitudes >= CLIPPING_LEVEL))
+
+        if len(self._carry):
+            samples = np.concatenate((self._carry, samples))
+        usable = len(samples) - len(samples) % self._window
+        if usable:
+            levels = frame_rms(samples[:usable], self._window)
+            self.windows += len(levels)
+            self.speech_windows += int(np.count_nonzero(levels >= self._speech_rms))
+        self._carry = samples[usable:].copy()
+
+    @property
+    def rms(self) -> float:
+        """Return the RMS level in dBFS."""
+        if not self.samples:
+            return -math.inf
+        return to_dbfs(math.sqrt(self._square_sum / self.samples))
+
+    @property
+    def peak(self) -> float:
+        """Return the peak level in dBFS."""
+        return to_dbfs(self._peak)
+
+    @property
+    def clipping_ratio(self) -> float:
+        """Return the share of clipped samples."""
+        return self._clipped / self.samples if self.samples else 0.0
+
+    @property
+    def speech_ratio(self) -> float:
+        """Return the share of windows loud enough to be speech."""
+        return self.speech_windows / self.windows if self.windows else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the levels for logging."""
+        return {
+            "rms": round(self.rms, 1),
+            "peak": round(self.peak, 1),
+            "clipping_ratio": round(self.clipping_ratio, 4),
+            "speech_ratio": round(self.speech_ratio, 4),
+        }
+
+
+class SpeechGate:
+    """Decide if audio contains speech worth transcribing, and count decisions.
+
+    Audio is rejected when it never gets as loud as speech, when too few of
+    its windows are loud enough to be speech, or when too much of it is
+    clipped, which is what bumps and other noise on the microphone look like.
+    """
+
+    def __init__(
+        self, min_level: float, min_speech_ratio: float, max_clipping_ratio: float
+    ) -> None:
+        """Init the gate."""
+        self._min_level = min_level
+        self._min_speech_ratio = min_speech_ratio
+        self._max_clipping_ratio = max_clipping_ratio
+        self.decisions: Counter[str] = Counter()
+
+    def detector(self, channels: int, sample_rate: int) -> SpeechDetector:
+        """Return a detector for audio of the given format."""
+        return SpeechDetector(channels, sample_rate, self._min_level)
+
+    def decide(self, detector: SpeechDetector) -> str:
+        """Return the decision for the audio measured so far."""
+        if detector.peak < self._min_level:
+            return GATE_SILENT
+        if detector.clipping_ratio > self._max_clipping_ratio:
+            return GATE_CLIPPED
+        if detector.speech_ratio < self._min_speech_ratio:
+            return GATE_NO_SPEECH
+        return GATE_PASSED
+
+    def record(self, decision: str) -> None:
+        """Count a final decision."""
+        self.decisions[decision] += 1
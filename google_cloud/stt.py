@@ -2,11 +2,10 @@
 
 from __future__ import annotations
 
-from collections.abc import AsyncGenerator, AsyncIterable
+import asyncio
+from collections.abc import AsyncGenerator, AsyncIterable, AsyncIterator, Mapping
 import logging
-
-from google.api_core.exceptions import GoogleAPIError, Unauthenticated
-from google.cloud import speech_v1
+from typing import Any
 
 from homeassistant.components.stt import (
     AudioBitRates,
@@ -20,40 +19,75 @@ from homeassistant.components.stt import (
     SpeechToTextEntity,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
+from .cancellation import async_cancellable
 from .const import (
-    CONF_SERVICE_ACCOUNT_INFO,
+    CONF_GATE_MAX_CLIPPING,
+    CONF_GATE_MIN_LEVEL,
+    CONF_GATE_MIN_SPEECH_RATIO,
+    CONF_SPEECH_GATE,
     CONF_STT_MODEL,
+    DEFAULT_GATE_MAX_CLIPPING,
+    DEFAULT_GATE_MIN_LEVEL,
+    DEFAULT_GATE_MIN_SPEECH_RATIO,
     DEFAULT_STT_MODEL,
     DOMAIN,
+    SIGNAL_OPTIONS_UPDATED,
     STT_LANGUAGES,
 )
+from .project import GoogleCloudData
+from .scheduler import PRIORITY_INTERACTIVE
+from .speech_gate import GATE_PASSED, SpeechGate
 
 _LOGGER = logging.getLogger(__name__)
 
 
+async def _chain(
+    buffered: list[bytes], chunks: AsyncIterator[bytes]
+) -> AsyncGenerator[bytes]:
+    """Yield the buffered chunks, then the rest of the stream."""
+    for chunk in buffered:
+        yield chunk
+    buffered.clear()
+    async for chunk in chunks:
+        yield chunk
+
+
+def _speech_gate(
+    options: Mapping[str, Any], current: SpeechGate | None
+) -> SpeechGate | None:
+    """Return the speech gate of the options, keeping the decisions counted."""
+    if not options.get(CONF_SPEECH_GATE, False):
+        return None
+    speech_gate = SpeechGate(
+        options.get(CONF_GATE_MIN_LEVEL, DEFAULT_GATE_MIN_LEVEL),
+        options.get(CONF_GATE_MIN_SPEECH_RATIO, DEFAULT_GATE_MIN_SPEECH_RATIO) / 100,
+        options.get(CONF_GATE_MAX_CLIPPING, DEFAULT_GATE_MAX_CLIPPING) / 100,
+    )
+    if current is not None:
+        speech_gate.decisions = current.decisions
+    return speech_gate
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Google Cloud speech platform via config entry."""
-    service_account_info = config_entry.data[CONF_SERVICE_ACCOUNT_INFO]
-    client = speech_v1.SpeechAsyncClient.from_service_account_info(service_account_info)
-    async_add_entities([GoogleCloudSpeechToTextEntity(config_entry, client)])
+    data: GoogleCloudData = hass.data[DOMAIN][config_entry.entry_id]
+    data.speech_gate = _speech_gate(config_entry.options, None)
+    async_add_entities([GoogleCloudSpeechToTextEntity(config_entry, data)])
 
 
 class GoogleCloudSpeechToTextEntity(SpeechToTextEntity):
     """Google Cloud STT entity."""
 
-    def __init__(
-        self,
-        entry: ConfigEntry,
-        client: speech_v1.SpeechAsyncClient,
-    ) -> None:
+    def __init__(self, entry: ConfigEntry, data: GoogleCloudData) -> None:
         """Init Google Cloud STT entity."""
         self._attr_unique_id = f"{entry.entry_id}"
         self._attr_name = entry.title
@@ -64,9 +98,33 @@ class GoogleCloudSpeechToTextEntity(SpeechToTextEntity):
             entry_type=dr.DeviceEntryType.SERVICE,
         )
         self._entry = entry
-        self._client = client
+        self._data = data
+        self._client = data.account.stt_client
+        self._scheduler = data.scheduler
+        self._cancellation = data.stt_cancellation
+        self._speech_gate = data.speech_gate
         self._model = entry.options.get(CONF_STT_MODEL, DEFAULT_STT_MODEL)
 
+    async def async_added_to_hass(self) -> None:
+        """Follow option changes of the config entry."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_OPTIONS_UPDATED.format(self._entry.entry_id),
+                self._async_options_updated,
+            )
+        )
+
+    @callback
+    def _async_options_updated(self) -> None:
+        """Apply changed options, keeping the client and its connections."""
+        options = self._entry.options
+        self._model = options.get(CONF_STT_MODEL, DEFAULT_STT_MODEL)
+        self._speech_gate = self._data.speech_gate = _speech_gate(
+            options, self._data.speech_gate
+        )
+
     @property
     def supported_languages(self) -> list[str]:
         """Return a list of supported languages."""
@@ -97,10 +155,57 @@ class GoogleCloudSpeechToTextEntity(SpeechToTextEntity):
         """Return a list of supported channels."""
         return [AudioChannels.CHANNEL_MONO]
 
+    async def _async_wait_for_speech(
+        self, metadata: SpeechMetadata, stream: AsyncIterable[bytes]
+    ) -> AsyncIterable[bytes] | None:
+        """Buffer the audio stream until the speech gate lets it through.
+
+        Return the stream with the buffered audio in front, or None if the
+        stream ended without speech.
+        """
+        assert self._speech_gate is not None
+        detector = self._speech_gate.detector(
+            int(metadata.channel), int(metadata.sample_rate)
+        )
+        buffered: list[bytes] = []
+        chunks = aiter(stream)
+        async for chunk in chunks:
+            buffered.append(chunk)
+            detector.add(chunk)
+            if self._speech_gate.decide(detector) == GATE_PASSED:
+                self._speech_gate.record(GATE_PASSED)
+                return _chain(buffered, chunks)
+
+        decision = self._speech_gate.decide(detector)
+        self._speech_gate.record(decision)
+        _LOGGER.debug(
+            "Not recognizing audio, speech gate decided %s: %s",
+            decision,
+            detector.as_dict(),
+        )
+        return None
+
     async def async_process_audio_stream(
         self, metadata: SpeechMetadata, stream: AsyncIterable[bytes]
     ) -> SpeechResult:
         """Process an audio stream to STT service."""
+        if self._speech_gate is not None and metadata.codec == AudioCodecs.PCM:
+            # Nothing is sent to Google until the audio contains speech
+            if (gated := await self._async_wait_for_speech(metadata, stream)) is None:
+                return SpeechResult("", SpeechResultState.SUCCESS)
+            stream = gated
+
+        # Already imported with the client of the config entry
+        # pylint: disable-next=import-outside-toplevel
+        from google.api_core.exceptions import (
+            GoogleAPIError,
+            ResourceExhausted,
+            Unauthenticated,
+        )
+
+        # pylint: disable-next=import-outside-toplevel
+        from google.cloud import speech_v1
+
         streaming_config = speech_v1.StreamingRecognitionConfig(
             config=speech_v1.RecognitionConfig(
                 encoding=(
@@ -114,6 +219,8 @@ class GoogleCloudSpeechToTextEntity(SpeechToTextEntity):
             )
         )
 
+        cancelled = False
+
         async def request_generator() -> (
             AsyncGenerator[speech_v1.StreamingRecognizeRequest]
         ):
@@ -121,23 +228,46 @@ class GoogleCloudSpeechToTextEntity(SpeechToTextEntity):
             yield speech_v1.StreamingRecognizeRequest(streaming_config=streaming_config)
             # All subsequent requests must only contain audio_content
             async for audio_content in stream:
+                if cancelled:
+                    # Stop reading the satellite's audio
+                    return
                 yield speech_v1.StreamingRecognizeRequest(audio_content=audio_content)
 
-        try:
+        async def async_recognize() -> str:
+            nonlocal cancelled
             responses = await self._client.streaming_recognize(
                 requests=request_generator(),
                 timeout=10,
             )
 
             transcript = ""
-            async for response in responses:
-                _LOGGER.debug("response: %s", response)
-                if not response.results:
-                    continue
-                result = response.results[0]
-                if not result.alternatives:
-                    continue
-                transcript += response.results[0].alternatives[0].transcript
+            try:
+                async for response in responses:
+                    _LOGGER.debug("response: %s", response)
+                    if not response.results:
+                        continue
+                    result = response.results[0]
+                    if not result.alternatives:
+                        continue
+                    transcript += response.results[0].alternatives[0].transcript
+            except asyncio.CancelledError:
+                # Abort the call so gRPC stops sending audio and waiting for results
+                cancelled = True
+                responses.cancel()
+                raise
+            return transcript
+
+        try:
+            # Not retried, the audio stream can only be read once
+            transcript = await async_cancellable(
+                self._cancellation,
+                self._scheduler.async_run(
+                    self._entry.entry_id, PRIORITY_INTERACTIVE, async_recognize
+                ),
+            )
+        except ResourceExhausted as err:
+            _LOGGER.error("Google Cloud STT quota exhausted: %s", err)
+            return SpeechResult(None, SpeechResultState.ERROR)
         except GoogleAPIError as err:
             _LOGGER.error("Error occurred during Google Cloud STT call: %s", err)
             if isinstance(err, Unauthenticated):
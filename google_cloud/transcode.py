@@ -0,0 +1,110 @@
+"""Local transcoding of synthesized speech for Google Cloud TTS."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Hashable
+import io
+import logging
+import wave
+
+_LOGGER = logging.getLogger(__name__)
+
+# Output arguments of each format speech can be transcoded to. WAV is
+# written as raw PCM and wrapped locally, since ffmpeg can't fill in the
+# sizes of a WAV header when writing to a pipe. The bitrate of the lossy
+# formats is passed with the request.
+TRANSCODE_FORMATS: dict[str, list[str]] = {
+    "mp3": ["-f", "mp3", "-c:a", "libmp3lame"],
+    "ogg": ["-f", "ogg", "-c:a", "libopus"],
+    "flac": ["-f", "flac"],
+    "wav": ["-f", "s16le", "-c:a", "pcm_s16le"],
+}
+
+AUDIO_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+
+class AudioCache:
+    """Least recently used cache of audio, bounded by its total size."""
+
+    def __init__(self, max_bytes: int = AUDIO_CACHE_MAX_BYTES) -> None:
+        """Init the audio cache."""
+        self._max_bytes = max_bytes
+        self._size = 0
+        self._audio: OrderedDict[Hashable, bytes] = OrderedDict()
+
+    def get(self, key: Hashable) -> bytes | None:
+        """Return cached audio."""
+        if (audio := self._audio.get(key)) is not None:
+            self._audio.move_to_end(key)
+        return audio
+
+    def put(self, key: Hashable, audio: bytes) -> None:
+        """Cache audio, evicting the least recently used audio beyond the limit."""
+        if len(audio) > self._max_bytes:
+            return
+        if (previous := self._audio.pop(key, None)) is not None:
+            self._size -= len(previous)
+        self._audio[key] = audio
+        self._size += len(audio)
+        while self._size > self._max_bytes:
+            _key, evicted = self._audio.popitem(last=False)
+            self._size -= len(evicted)
+
+
+def _wav_format(wav_audio: bytes) -> tuple[int, int]:
+    """Return the sample rate and channel count of WAV audio."""
+    with wave.open(io.BytesIO(wav_audio), "rb") as wav_file:
+        return wav_file.getframerate(), wav_file.getnchannels()
+
+
+async def async_transcode(
+    ffmpeg_binary: str,
+    wav_audio: bytes,
+    extension: str,
+    sample_rate: int | None = None,
+    channels: int | None = None,
+    bitrate: int | None = None,
+) -> bytes:
+    """Transcode WAV audio with ffmpeg, streaming it through pipes.
+
+    No temporary files are used: the audio is fed to ffmpeg's stdin while
+    the result is read from its stdout. The bitrate is in kbit/s.
+    """
+    command = [ffmpeg_binary, "-nostdin", "-f", "wav", "-i", "pipe:"]
+    if sample_rate is not None:
+        command.extend(["-ar", str(sample_rate)])
+    if channels is not None:
+        command.extend(["-ac", str(channels)])
+    if bitrate is not None:
+        command.extend(["-b:a", f"{bitrate}k"])
+    command.extend([*TRANSCODE_FORMATS[extension], "pipe:"])
+
+    proc = await asyncio.create_subprocess_exec(
+        *command,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        audio, stderr = await proc.communicate(wav_audio)
+    except asyncio.CancelledError:
+        proc.kill()
+        await proc.wait()
+        raise
+    if proc.returncode != 0:
+        _LOGGER.error(stderr.decode(errors="replace"))
+        raise RuntimeError(f"Unexpected error while running ffmpeg: {command}")
+
+    if extension != "wav":
+        return audio
+
+    source_rate, source_channels = _wav_format(wav_audio)
+    output = io.BytesIO()
+    with wave.open(output, "wb") as wav_file:
+        wav_file.setnchannels(channels or source_channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate or source_rate)
+        wav_file.writeframes(audio)
+    return output.getvalue()
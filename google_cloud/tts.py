@@ -2,15 +2,18 @@
 
 from __future__ import annotations
 
+from collections.abc import Mapping
 import logging
 from pathlib import Path
-from typing import Any, cast
+from typing import TYPE_CHECKING, Any, cast
 
-from google.api_core.exceptions import GoogleAPIError, Unauthenticated
-from google.cloud import texttospeech
 import voluptuous as vol
 
+from homeassistant.components.ffmpeg import get_ffmpeg_manager
 from homeassistant.components.tts import (
+    ATTR_PREFERRED_FORMAT,
+    ATTR_PREFERRED_SAMPLE_CHANNELS,
+    ATTR_PREFERRED_SAMPLE_RATE,
     CONF_LANG,
     PLATFORM_SCHEMA as TTS_PLATFORM_SCHEMA,
     Provider,
@@ -21,32 +24,86 @@ from homeassistant.components.tts import (
 from homeassistant.config_entries import SOURCE_IMPORT, ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.start import async_at_started
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 
 from .const import (
     CONF_ENCODING,
-    CONF_GAIN,
-    CONF_GENDER,
     CONF_KEY_FILE,
-    CONF_PITCH,
-    CONF_PROFILES,
-    CONF_SERVICE_ACCOUNT_INFO,
-    CONF_SPEED,
-    CONF_TEXT_TYPE,
-    CONF_VOICE,
-    DEFAULT_GAIN,
+    CONF_MP3_BITRATE,
+    CONF_OGG_BITRATE,
+    CONF_PHRASE_BANK,
+    CONF_TRANSCODE,
     DEFAULT_LANG,
-    DEFAULT_PITCH,
-    DEFAULT_SPEED,
+    DEFAULT_MP3_BITRATE,
+    DEFAULT_OGG_BITRATE,
     DOMAIN,
+    SIGNAL_OPTIONS_UPDATED,
 )
-from .helpers import async_tts_voices, tts_options_schema, tts_platform_schema
+from .helpers import (
+    OptionsKey,
+    SynthesisTemplate,
+    VoiceIndex,
+    async_tts_voices,
+    options_key,
+    synthesis_template,
+    tts_options_schema,
+    tts_platform_schema,
+)
+from .phrase_bank import (
+    PhraseBank,
+    PhraseKey,
+    async_warm_up_phrase_bank,
+    automation_and_script_configs,
+    find_static_phrases,
+    phrase_key,
+)
+from .project import GoogleCloudData
+from .scheduler import PRIORITY_BULK, PRIORITY_INTERACTIVE, RequestScheduler
+from .single_flight import SingleFlight
+from .transcode import TRANSCODE_FORMATS, AudioCache, async_transcode
+
+if TYPE_CHECKING:
+    from google.cloud import texttospeech
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORM_SCHEMA = TTS_PLATFORM_SCHEMA.extend(tts_platform_schema().schema)
 
+# Request templates kept per provider, one per distinct set of options
+TEMPLATE_CACHE_SIZE = 32
+
+# Synthesis is retried after the quota ran out, it can't have had side effects
+TTS_RETRIES = 2
+
+PREFERRED_OPTIONS = (
+    ATTR_PREFERRED_FORMAT,
+    ATTR_PREFERRED_SAMPLE_RATE,
+    ATTR_PREFERRED_SAMPLE_CHANNELS,
+)
+
+
+def transcode_bitrates(options: Mapping[str, Any]) -> dict[str, int]:
+    """Return the bitrates in kbit/s to transcode speech to lossy formats with."""
+    return {
+        "mp3": int(options.get(CONF_MP3_BITRATE, DEFAULT_MP3_BITRATE)),
+        "ogg": int(options.get(CONF_OGG_BITRATE, DEFAULT_OGG_BITRATE)),
+    }
+
+
+def _create_client(key_file: str | None) -> texttospeech.TextToSpeechAsyncClient:
+    """Create the client of the legacy provider, importing the SDK."""
+    # pylint: disable-next=import-outside-toplevel
+    from google.cloud import texttospeech
+
+    if key_file:
+        return texttospeech.TextToSpeechAsyncClient.from_service_account_file(
+            key_file
+        )
+    return texttospeech.TextToSpeechAsyncClient()
+
 
 async def async_get_engine(
     hass: HomeAssistant,
@@ -59,19 +116,18 @@ async def async_get_engine(
         if not Path(key_file).is_file():
             _LOGGER.error("File %s doesn't exist", key_file)
             return None
-    if key_file:
-        client = texttospeech.TextToSpeechAsyncClient.from_service_account_file(
-            key_file
-        )
-        if not hass.config_entries.async_entries(DOMAIN):
-            _LOGGER.debug("Creating config entry by importing: %s", config)
-            hass.async_create_task(
-                hass.config_entries.flow.async_init(
-                    DOMAIN, context={"source": SOURCE_IMPORT}, data=config
-                )
+    client = await hass.async_add_executor_job(_create_client, key_file)
+    if key_file and not hass.config_entries.async_entries(DOMAIN):
+        _LOGGER.debug("Creating config entry by importing: %s", config)
+        hass.async_create_task(
+            hass.config_entries.flow.async_init(
+                DOMAIN, context={"source": SOURCE_IMPORT}, data=config
             )
-    else:
-        client = texttospeech.TextToSpeechAsyncClient()
+        )
+    # Imported with the client
+    # pylint: disable-next=import-outside-toplevel
+    from google.api_core.exceptions import GoogleAPIError
+
     try:
         voices = await async_tts_voices(client)
     except GoogleAPIError as err:
@@ -91,12 +147,12 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Google Cloud text-to-speech."""
-    service_account_info = config_entry.data[CONF_SERVICE_ACCOUNT_INFO]
-    client: texttospeech.TextToSpeechAsyncClient = (
-        texttospeech.TextToSpeechAsyncClient.from_service_account_info(
-            service_account_info
-        )
-    )
+    data: GoogleCloudData = hass.data[DOMAIN][config_entry.entry_id]
+    client = data.account.tts_client
+    # Imported with the clients of the config entry
+    # pylint: disable-next=import-outside-toplevel
+    from google.api_core.exceptions import GoogleAPIError, Unauthenticated
+
     try:
         voices = await async_tts_voices(client)
     except GoogleAPIError as err:
@@ -106,6 +162,11 @@ async def async_setup_entry(
         return
     options_schema = tts_options_schema(dict(config_entry.options), voices)
     language = config_entry.options.get(CONF_LANG, DEFAULT_LANG)
+    ffmpeg_binary = (
+        get_ffmpeg_manager(hass).binary
+        if config_entry.options.get(CONF_TRANSCODE, False)
+        else None
+    )
     async_add_entities(
         [
             GoogleCloudTTSEntity(
@@ -114,6 +175,9 @@ async def async_setup_entry(
                 voices,
                 language,
                 options_schema,
+                data.scheduler,
+                ffmpeg_binary,
+                data.tts_single_flight,
             )
         ]
     )
@@ -125,7 +189,7 @@ class BaseGoogleCloudProvider:
     def __init__(
         self,
         client: texttospeech.TextToSpeechAsyncClient,
-        voices: dict[str, list[str]],
+        voices: VoiceIndex,
         language: str,
         options_schema: vol.Schema,
     ) -> None:
@@ -134,6 +198,17 @@ class BaseGoogleCloudProvider:
         self._voices = voices
         self._language = language
         self._options_schema = options_schema
+        self._phrase_bank: PhraseBank | None = None
+        self._templates: dict[tuple[str, OptionsKey], SynthesisTemplate] = {}
+        # Set to transcode locally from a single LINEAR16 synthesis
+        self._ffmpeg_binary: str | None = None
+        self._bitrates = transcode_bitrates({})
+        # Set for config entries, whose requests are scheduled per project
+        self._scheduler: RequestScheduler | None = None
+        self._scheduler_id = ""
+        self._audio_cache = AudioCache()
+        # Synthesis requests in flight, shared by identical concurrent calls
+        self._single_flight: SingleFlight[tuple[str, bytes]] = SingleFlight()
 
     @property
     def supported_languages(self) -> list[str]:
@@ -158,9 +233,38 @@ class BaseGoogleCloudProvider:
     @callback
     def async_get_supported_voices(self, language: str) -> list[Voice] | None:
         """Return a list of supported voices for a language."""
-        if not (voices := self._voices.get(language)):
-            return None
-        return [Voice(voice, voice) for voice in voices]
+        return self._voices.supported_voices(language)
+
+    def _set_options_schema(self, language: str, options_schema: vol.Schema) -> None:
+        """Replace the default language and options.
+
+        The request templates are built with the defaults of the schema, so
+        they are dropped. Cached audio is keyed by the options it was
+        synthesized with and stays valid.
+        """
+        self._language = language
+        self._options_schema = options_schema
+        self._templates.clear()
+
+    def _get_template(
+        self, language: str, options: dict[str, Any]
+    ) -> SynthesisTemplate:
+        """Return the request template of options, validating them on first use.
+
+        Templates are memoized by the options as passed in, so the hot path
+        only fills in the text. Their key is built from the validated options,
+        so options differing only in order or spelled-out defaults share it.
+        """
+        key = (language, options_key(options))
+        if (template := self._templates.get(key)) is not None:
+            return template
+        template = synthesis_template(
+            language, self._options_schema(options), self._voices
+        )
+        if len(self._templates) >= TEMPLATE_CACHE_SIZE:
+            del self._templates[next(iter(self._templates))]
+        self._templates[key] = template
+        return template
 
     async def _async_get_tts_audio(
         self,
@@ -169,62 +273,115 @@ class BaseGoogleCloudProvider:
         options: dict[str, Any],
     ) -> TtsAudioType:
         """Load TTS from Google Cloud."""
+        # The preferred format of the player is not a synthesis option
+        options = dict(options)
+        preferred = {
+            key: options.pop(key) for key in PREFERRED_OPTIONS if key in options
+        }
         try:
-            options = self._options_schema(options)
+            template = self._get_template(language, options)
         except vol.Invalid as err:
             _LOGGER.error("Error: %s when validating options: %s", err, options)
             return None, None
 
-        encoding: texttospeech.AudioEncoding = texttospeech.AudioEncoding[
-            options[CONF_ENCODING]
-        ]  # type: ignore[misc]
-        gender: texttospeech.SsmlVoiceGender | None = texttospeech.SsmlVoiceGender[
-            options[CONF_GENDER]
-        ]  # type: ignore[misc]
-        voice = options[CONF_VOICE]
-        if voice:
-            gender = None
-            if not voice.startswith(language):
-                language = voice[:5]
-
-        request = texttospeech.SynthesizeSpeechRequest(
-            input=texttospeech.SynthesisInput(**{options[CONF_TEXT_TYPE]: message}),
-            voice=texttospeech.VoiceSelectionParams(
-                language_code=language,
-                ssml_gender=gender,
-                name=voice,
-            ),
-            # Avoid: "This voice does not support speaking rate or pitch parameters at this time."
-            # by not specifying the fields unless they differ from the defaults
-            audio_config=texttospeech.AudioConfig(
-                audio_encoding=encoding,
-                speaking_rate=(
-                    options[CONF_SPEED]
-                    if options[CONF_SPEED] != DEFAULT_SPEED
-                    else None
-                ),
-                pitch=(
-                    options[CONF_PITCH]
-                    if options[CONF_PITCH] != DEFAULT_PITCH
-                    else None
-                ),
-                volume_gain_db=(
-                    options[CONF_GAIN] if options[CONF_GAIN] != DEFAULT_GAIN else None
-                ),
-                effects_profile_id=options[CONF_PROFILES],
-            ),
+        if self._phrase_bank is not None and (
+            phrase := self._phrase_bank.get(
+                phrase_key(message, language, template.options_key)
+            )
+        ):
+            return phrase
+
+        if self._ffmpeg_binary is not None:
+            return await self._async_get_transcoded(
+                message, language, options, template, preferred
+            )
+        return await self._async_synthesize(message, language, template)
+
+    async def _async_get_transcoded(
+        self,
+        message: str,
+        language: str,
+        options: dict[str, Any],
+        template: SynthesisTemplate,
+        preferred: dict[str, Any],
+    ) -> tuple[str, bytes]:
+        """Return speech in the preferred format, transcoded from LINEAR16.
+
+        Speech is synthesized once as LINEAR16 and every format requested
+        for it is transcoded locally, so players preferring different
+        formats share a single synthesis. Both are cached.
+        """
+        assert self._ffmpeg_binary is not None
+        extension = preferred.get(ATTR_PREFERRED_FORMAT, template.extension)
+        sample_rate = preferred.get(ATTR_PREFERRED_SAMPLE_RATE)
+        channels = preferred.get(ATTR_PREFERRED_SAMPLE_CHANNELS)
+
+        source_template = self._get_template(
+            language,
+            {**options, CONF_ENCODING: "LINEAR16"},
         )
+        source_key = phrase_key(message, language, source_template.options_key)
+        bitrate = self._bitrates.get(extension)
+        variant_key = (source_key, extension, sample_rate, channels, bitrate)
+        if (audio := self._audio_cache.get(variant_key)) is not None:
+            return extension, audio
+
+        if (source := self._audio_cache.get(source_key)) is None:
+            _extension, source = await self._async_synthesize(
+                message, language, source_template
+            )
+            self._audio_cache.put(source_key, source)
+        if (extension, sample_rate, channels) == ("wav", None, None):
+            return "wav", source
+        if extension not in TRANSCODE_FORMATS:
+            # Left to Home Assistant to convert
+            return "wav", source
 
-        response = await self._client.synthesize_speech(request, timeout=10)
+        try:
+            audio = await async_transcode(
+                self._ffmpeg_binary,
+                source,
+                extension,
+                sample_rate,
+                channels,
+                bitrate,
+            )
+        except (OSError, RuntimeError) as err:
+            _LOGGER.error("Error transcoding speech to %s: %s", extension, err)
+            return "wav", source
+        self._audio_cache.put(variant_key, audio)
+        return extension, audio
 
-        if encoding == texttospeech.AudioEncoding.MP3:
-            extension = "mp3"
-        elif encoding == texttospeech.AudioEncoding.OGG_OPUS:
-            extension = "ogg"
-        else:
-            extension = "wav"
+    async def _async_synthesize(
+        self,
+        message: str,
+        language: str,
+        template: SynthesisTemplate,
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> tuple[str, bytes]:
+        """Synthesize speech from a request template.
+
+        Concurrent calls for the same message, language and validated
+        options, like an announcement played on several speakers at once,
+        share a single request, at the priority of the first call.
+        """
+
+        async def _async_request() -> tuple[str, bytes]:
+            request = template.request(message)
+            if self._scheduler is None:
+                response = await self._client.synthesize_speech(request, timeout=10)
+            else:
+                response = await self._scheduler.async_run(
+                    self._scheduler_id,
+                    priority,
+                    lambda: self._client.synthesize_speech(request, timeout=10),
+                    retries=TTS_RETRIES,
+                )
+            return template.extension, response.audio_content
 
-        return extension, response.audio_content
+        return await self._single_flight.async_run(
+            phrase_key(message, language, template.options_key), _async_request
+        )
 
 
 class GoogleCloudTTSEntity(BaseGoogleCloudProvider, TextToSpeechEntity):
@@ -234,12 +391,21 @@ class GoogleCloudTTSEntity(BaseGoogleCloudProvider, TextToSpeechEntity):
         self,
         entry: ConfigEntry,
         client: texttospeech.TextToSpeechAsyncClient,
-        voices: dict[str, list[str]],
+        voices: VoiceIndex,
         language: str,
         options_schema: vol.Schema,
+        scheduler: RequestScheduler | None = None,
+        ffmpeg_binary: str | None = None,
+        single_flight: SingleFlight[tuple[str, bytes]] | None = None,
     ) -> None:
         """Init Google Cloud TTS entity."""
         super().__init__(client, voices, language, options_schema)
+        if single_flight is not None:
+            self._single_flight = single_flight
+        self._scheduler = scheduler
+        self._scheduler_id = entry.entry_id
+        self._ffmpeg_binary = ffmpeg_binary
+        self._bitrates = transcode_bitrates(entry.options)
         self._attr_unique_id = f"{entry.entry_id}"
         self._attr_name = entry.title
         self._attr_device_info = dr.DeviceInfo(
@@ -250,12 +416,101 @@ class GoogleCloudTTSEntity(BaseGoogleCloudProvider, TextToSpeechEntity):
         )
         self._entry = entry
 
+    async def async_added_to_hass(self) -> None:
+        """Pre-render the static phrases of automations once Home Assistant started."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_OPTIONS_UPDATED.format(self._entry.entry_id),
+                self._async_options_updated,
+            )
+        )
+        if not self._entry.options.get(CONF_PHRASE_BANK, False):
+            return
+        self._phrase_bank = PhraseBank()
+
+        async def _async_started(hass: HomeAssistant) -> None:
+            self._entry.async_create_background_task(
+                hass, self._async_warm_up_phrase_bank(), "google_cloud phrase bank"
+            )
+
+        self.async_on_remove(async_at_started(self.hass, _async_started))
+
+    @callback
+    def _async_options_updated(self) -> None:
+        """Apply changed options, keeping the voice list, client and caches.
+
+        The phrase bank is rendered again when it was just enabled, or when
+        the default language or options its phrases were rendered with
+        changed.
+        """
+        options = self._entry.options
+        defaults = (self._language, self.default_options)
+        self._set_options_schema(
+            options.get(CONF_LANG, DEFAULT_LANG),
+            tts_options_schema(dict(options), self._voices),
+        )
+        self._ffmpeg_binary = (
+            get_ffmpeg_manager(self.hass).binary
+            if options.get(CONF_TRANSCODE, False)
+            else None
+        )
+        self._bitrates = transcode_bitrates(options)
+        if not options.get(CONF_PHRASE_BANK, False):
+            self._phrase_bank = None
+        elif self._phrase_bank is None or defaults != (
+            self._language,
+            self.default_options,
+        ):
+            self._phrase_bank = PhraseBank()
+            self._entry.async_create_background_task(
+                self.hass,
+                self._async_warm_up_phrase_bank(),
+                "google_cloud phrase bank",
+            )
+
+    async def _async_warm_up_phrase_bank(self) -> None:
+        """Synthesize the static tts.speak messages targeting this entity."""
+        assert self._phrase_bank is not None
+        phrases = find_static_phrases(
+            automation_and_script_configs(self.hass), self.entity_id
+        )
+        if not phrases:
+            return
+
+        async def _async_render(
+            message: str, language: str | None, options: dict[str, Any]
+        ) -> tuple[PhraseKey, str, bytes]:
+            language = language or self._language
+            template = self._get_template(language, options)
+            extension, audio = await self._async_synthesize(
+                message, language, template, PRIORITY_BULK
+            )
+            return (
+                phrase_key(message, language, template.options_key),
+                extension,
+                audio,
+            )
+
+        await async_warm_up_phrase_bank(self._phrase_bank, phrases, _async_render)
+
     async def async_get_tts_audio(
         self, message: str, language: str, options: dict[str, Any]
     ) -> TtsAudioType:
         """Load TTS from Google Cloud."""
+        # pylint: disable-next=import-outside-toplevel
+        from google.api_core.exceptions import (
+            GoogleAPIError,
+            ResourceExhausted,
+            Unauthenticated,
+        )
+
         try:
             return await self._async_get_tts_audio(message, language, options)
+        except ResourceExhausted as err:
+            _LOGGER.error("Google Cloud TTS quota exhausted: %s", err)
+            return None, None
         except GoogleAPIError as err:
             _LOGGER.error("Error occurred during Google Cloud TTS call: %s", err)
             if isinstance(err, Unauthenticated):
@@ -269,7 +524,7 @@ class GoogleCloudTTSProvider(BaseGoogleCloudProvider, Provider):
     def __init__(
         self,
         client: texttospeech.TextToSpeechAsyncClient,
-        voices: dict[str, list[str]],
+        voices: VoiceIndex,
         language: str,
         options_schema: vol.Schema,
     ) -> None:
@@ -281,6 +536,9 @@ class GoogleCloudTTSProvider(BaseGoogleCloudProvider, Provider):
         self, message: str, language: str, options: dict[str, Any]
     ) -> TtsAudioType:
         """Load TTS from Google Cloud."""
+        # pylint: disable-next=import-outside-toplevel
+        from google.api_core.exceptions import GoogleAPIError
+
         try:
             return await self._async_get_tts_audio(message, language, options)
         except GoogleAPIError as err:
@@ -0,0 +1,138 @@
+"""Benchmark the import and setup time of the integrations.
+
+Each integration module is imported in a fresh interpreter with
+``-X importtime``, so earlier imports don't hide the cost of later ones.
+The time spent importing the heavy SDKs is reported separately, since
+those should only be imported on first use or in the executor.
+
+Usage:
+
+    python scripts/benchmark_startup.py [--max-import-ms MS] [--max-setup-ms MS]
+
+Exits with status 1 when a measurement exceeds its limit, so it can be run
+in CI to keep startup time from regressing.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from pathlib import Path
+import subprocess
+import sys
+import time
+
+ROOT = Path(__file__).resolve().parent.parent
+
+GOOGLE_SDKS = (
+    "google.api_core",
+    "grpc",
+    "google.cloud.speech_v1",
+    "google.cloud.texttospeech",
+    "google.oauth2.service_account",
+)
+
+# Modules Home Assistant imports when loading the integrations, with the
+# SDKs they must not import at module load
+MODULES: dict[str, tuple[str, ...]] = {
+    "custom_components.openai_stt": ("openai", "numpy"),
+    "custom_components.openai_stt.config_flow": ("openai",),
+    "custom_components.openai_stt.stt": ("openai",),
+    "google_cloud": GOOGLE_SDKS,
+    "google_cloud.stt": GOOGLE_SDKS,
+    "google_cloud.tts": GOOGLE_SDKS,
+}
+
+SETUP_CODE = """
+import asyncio
+import time
+from custom_components.openai_stt.backend import OpenAIBackend
+
+start = time.perf_counter()
+backend = OpenAIBackend("benchmark")
+backend.warm_up()
+print((time.perf_counter() - start) * 1000)
+asyncio.run(backend.async_close())
+"""
+
+
+def _run(args: list[str]) -> subprocess.CompletedProcess[str]:
+    """Run Python in a fresh interpreter from the repository root."""
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    return subprocess.run(
+        [sys.executable, *args],
+        capture_output=True,
+        check=False,
+        cwd=ROOT,
+        env=env,
+        text=True,
+    )
+
+
+def measure_import(
+    module: str, deferred_packages: tuple[str, ...]
+) -> tuple[float, list[str]] | None:
+    """Return the import time of a module in ms and the deferred SDKs it imported."""
+    result = _run(["-X", "importtime", "-c", f"import {module}"])
+    if result.returncode != 0:
+        print(f"{module}: not importable here, skipped")
+        return None
+    total = 0.0
+    deferred: set[str] = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _self_us, cumulative_us, name = (
+            part.strip() for part in line.removeprefix("import time:").split("|")
+        )
+        if not cumulative_us.isdigit():
+            continue
+        if name == module:
+            total = int(cumulative_us) / 1000
+        if name in deferred_packages:
+            deferred.add(name)
+    return total, sorted(deferred)
+
+
+def measure_setup() -> float | None:
+    """Return the time to create and warm up the OpenAI backend in ms."""
+    start = time.perf_counter()
+    result = _run(["-c", SETUP_CODE])
+    if result.returncode != 0:
+        print("setup: OpenAI backend not available here, skipped")
+        return None
+    print(f"interpreter with setup: {(time.perf_counter() - start) * 1000:.1f} ms")
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-import-ms", type=float)
+    parser.add_argument("--max-setup-ms", type=float)
+    args = parser.parse_args()
+
+    failed = False
+    for module, deferred_packages in MODULES.items():
+        if (measured := measure_import(module, deferred_packages)) is None:
+            continue
+        import_ms, deferred = measured
+        print(f"{module}: {import_ms:.1f} ms")
+        if deferred:
+            print(f"  imports {', '.join(deferred)} at module load")
+            failed = True
+        if args.max_import_ms is not None and import_ms > args.max_import_ms:
+            print(f"  exceeds {args.max_import_ms:.1f} ms")
+            failed = True
+
+    if (setup_ms := measure_setup()) is not None:
+        print(f"backend setup and warm up: {setup_ms:.1f} ms")
+        if args.max_setup_ms is not None and setup_ms > args.max_setup_ms:
+            print(f"  exceeds {args.max_setup_ms:.1f} ms")
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,293 @@
+"""Stand-in for the OpenAI transcription API, for replaying recorded sessions.
+
+Answers transcription requests after a simulated processing time, with the
+text recorded for the same audio in a session corpus, so the replay report
+measures the integration and the host rather than the API. Point an OpenAI
+STT entry at it with the base URL ``http://<host>:<port>/v1`` and a model
+like ``whisper-1``, then replay the corpus with the
+``openai_stt.replay_sessions`` service.
+
+Both the HTTP transcription endpoints and the realtime transcription
+WebSocket are served, so entries with realtime transcription enabled can
+be replayed too. The realtime stand-in has no voice activity detection,
+it transcribes the audio buffer when the client commits it.
+
+Usage:
+
+    python scripts/stand_in_server.py --corpus /config/openai_stt_sessions \\
+        [--port 8300] [--latency-ms 300] [--rtf 0.1] [--jitter-ms 50]
+
+Audio that isn't in the corpus is answered with an empty text. Run it with
+the Python environment of Home Assistant, which has aiohttp and numpy.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import glob
+import hashlib
+import io
+import itertools
+import json
+import os
+from pathlib import Path
+import random
+import sys
+import wave
+
+from aiohttp import WSMsgType, web
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# pylint: disable-next=wrong-import-position
+from custom_components.openai_stt.audio import PcmResampler  # noqa: E402
+from custom_components.openai_stt.realtime import (  # noqa: E402
+    REALTIME_SAMPLE_RATE,
+)
+
+CORPUS_INDEX = "index.jsonl"
+
+
+def _realtime_audio(session: dict, audio: bytes) -> bytes:
+    """Return a session's audio as the realtime transcription sends it."""
+    resampler = PcmResampler(session["metadata"]["sample_rate"], REALTIME_SAMPLE_RATE)
+    resampled = bytearray()
+    offset = 0
+    for _at, size in session["chunks"]:
+        resampled += resampler.process(audio[offset : offset + size])
+        offset += size
+    return bytes(resampled)
+
+
+def load_texts(path: str) -> dict[str, str]:
+    """Return the recorded texts of a corpus by the hash of their audio.
+
+    Each text is indexed both by the recorded audio and by the audio
+    resampled for the realtime API.
+    """
+    texts: dict[str, str] = {}
+    for index in glob.glob(
+        os.path.join(glob.escape(path), "**", CORPUS_INDEX), recursive=True
+    ):
+        directory = os.path.dirname(index)
+        with open(index, encoding="utf-8") as file:
+            for line in file:
+                session = json.loads(line)
+                with open(os.path.join(directory, f"{session['id']}.raw"), "rb") as raw:
+                    audio = raw.read()
+                text = session["result"]["text"] or ""
+                texts[hashlib.sha1(audio).hexdigest()] = text
+                if session["metadata"]["codec"] == "pcm":
+                    realtime = _realtime_audio(session, audio)
+                    texts[hashlib.sha1(realtime).hexdigest()] = text
+    return texts
+
+
+def read_wav(data: bytes) -> tuple[bytes, float]:
+    """Return the PCM data of a WAV file and its duration in seconds."""
+    with wave.open(io.BytesIO(data)) as wav:
+        frames = wav.getnframes()
+        return wav.readframes(frames), frames / wav.getframerate()
+
+
+class StandInServer:
+    """Answers transcription requests like the OpenAI API."""
+
+    def __init__(
+        self, texts: dict[str, str], latency: float, rtf: float, jitter: float
+    ) -> None:
+        """Initialize the server, with times in seconds."""
+        self._texts = texts
+        self._latency = latency
+        self._rtf = rtf
+        self._jitter = jitter
+        self.requests = 0
+        self.matched = 0
+        self._item_ids = itertools.count(1)
+
+    def _lookup(self, audio: bytes) -> str:
+        """Return the recorded text of audio, empty if it isn't in the corpus."""
+        self.requests += 1
+        text = self._texts.get(hashlib.sha1(audio).hexdigest())
+        if text is not None:
+            self.matched += 1
+        return text or ""
+
+    def _delay(self, duration: float) -> float:
+        """Return the simulated processing time of audio of a duration."""
+        return max(
+            0.0,
+            self._latency
+            + duration * self._rtf
+            + random.uniform(-self._jitter, self._jitter),
+        )
+
+    async def models(self, request: web.Request) -> web.Response:
+        """List the models."""
+        return web.json_response(
+            {
+                "object": "list",
+                "data": [
+                    {
+                        "id": model,
+                        "object": "model",
+                        "created": 0,
+                        "owned_by": "stand-in",
+                    }
+                    for model in ("whisper-1", "gpt-4o-mini-transcribe")
+                ],
+            }
+        )
+
+    async def transcribe(self, request: web.Request) -> web.StreamResponse:
+        """Answer a transcription after the simulated processing time."""
+        form = await request.post()
+        upload = form["file"]
+        assert isinstance(upload, web.FileField)
+        try:
+            pcm, duration = read_wav(upload.file.read())
+        except (EOFError, wave.Error):
+            pcm, duration = b"", 0.0
+        text = self._lookup(pcm)
+        await asyncio.sleep(self._delay(duration))
+
+        if form.get("stream") == "true":
+            response = web.StreamResponse(
+                headers={"Content-Type": "text/event-stream"}
+            )
+            await response.prepare(request)
+            event = {"type": "transcript.text.done", "text": text}
+            await response.write(f"data: {json.dumps(event)}\n\n".encode())
+            await response.write_eof()
+            return response
+        response_format = form.get("response_format", "json")
+        if response_format == "text":
+            return web.Response(text=text)
+        if response_format == "verbose_json":
+            return web.json_response(
+                {
+                    "task": "transcribe",
+                    "language": "english",
+                    "duration": duration,
+                    "text": text,
+                    "segments": [],
+                    "words": [],
+                }
+            )
+        return web.json_response({"text": text})
+
+    async def realtime(self, request: web.Request) -> web.WebSocketResponse:
+        """Serve a realtime transcription session.
+
+        Committed audio is transcribed in the background, like the server
+        does, so the client can keep streaming the next utterance.
+        """
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        buffer = bytearray()
+        tasks: set[asyncio.Task[None]] = set()
+
+        async def _send(event: dict) -> None:
+            if not ws.closed:
+                await ws.send_str(json.dumps(event))
+
+        async def _transcribe(item_id: str, audio: bytes) -> None:
+            text = self._lookup(audio)
+            await asyncio.sleep(self._delay(len(audio) / 2 / REALTIME_SAMPLE_RATE))
+            await _send(
+                {
+                    "type": "conversation.item.input_audio_transcription.delta",
+                    "item_id": item_id,
+                    "delta": text,
+                }
+            )
+            await _send(
+                {
+                    "type": "conversation.item.input_audio_transcription.completed",
+                    "item_id": item_id,
+                    "transcript": text,
+                }
+            )
+
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                event = json.loads(msg.data)
+                event_type = event.get("type")
+                if event_type == "transcription_session.update":
+                    await _send(
+                        {
+                            "type": "transcription_session.updated",
+                            "session": event.get("session", {}),
+                        }
+                    )
+                elif event_type == "input_audio_buffer.append":
+                    buffer += base64.b64decode(event["audio"])
+                elif event_type == "input_audio_buffer.clear":
+                    buffer.clear()
+                    await _send({"type": "input_audio_buffer.cleared"})
+                elif event_type == "input_audio_buffer.commit":
+                    if not buffer:
+                        await _send(
+                            {
+                                "type": "error",
+                                "error": {
+                                    "code": "input_audio_buffer_commit_empty",
+                                    "message": "The audio buffer is empty",
+                                },
+                            }
+                        )
+                        continue
+                    item_id = f"item_{next(self._item_ids)}"
+                    await _send(
+                        {"type": "input_audio_buffer.committed", "item_id": item_id}
+                    )
+                    task = asyncio.create_task(_transcribe(item_id, bytes(buffer)))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                    buffer.clear()
+        finally:
+            for task in tasks:
+                task.cancel()
+        return ws
+
+
+def main() -> None:
+    """Run the stand-in server until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", required=True)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8300)
+    parser.add_argument(
+        "--latency-ms", type=float, default=300, help="time to answer any request"
+    )
+    parser.add_argument(
+        "--rtf", type=float, default=0.1, help="time added per second of audio"
+    )
+    parser.add_argument(
+        "--jitter-ms", type=float, default=50, help="random variation of the time"
+    )
+    args = parser.parse_args()
+
+    texts = load_texts(args.corpus)
+    print(f"Indexed {len(texts)} recorded audio streams")
+    server = StandInServer(
+        texts, args.latency_ms / 1000, args.rtf, args.jitter_ms / 1000
+    )
+    app = web.Application(client_max_size=26 * 1024 * 1024)
+    app.router.add_get("/v1/models", server.models)
+    app.router.add_post("/v1/audio/transcriptions", server.transcribe)
+    app.router.add_post("/v1/audio/translations", server.transcribe)
+    app.router.add_get("/v1/realtime", server.realtime)
+    try:
+        web.run_app(app, host=args.host, port=args.port)
+    finally:
+        print(f"Answered {server.requests} requests, {server.matched} from the corpus")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Tests of the quota-aware request scheduler."""
+
+import asyncio
+import time
+
+import pytest
+
+from google_cloud.scheduler import (
+    BACKOFF_INITIAL,
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    RequestScheduler,
+)
+
+# The scheduler retries on the quota error of the Google Cloud SDK
+ResourceExhausted = pytest.importorskip("google.api_core.exceptions").ResourceExhausted
+
+
+def test_burst_then_refill() -> None:
+    """Test a burst is sent at once and later requests wait for the refill."""
+
+    async def _async_test() -> None:
+        # 20 requests per second, with a burst of 2 seconds of quota
+        scheduler = RequestScheduler(1200)
+        start = time.monotonic()
+        for _ in range(40):
+            await scheduler.async_acquire("entry", PRIORITY_INTERACTIVE)
+        assert time.monotonic() - start < 0.05
+        await scheduler.async_acquire("entry", PRIORITY_INTERACTIVE)
+        assert 0.03 < time.monotonic() - start < 0.5
+        scheduler.close()
+
+    asyncio.run(_async_test())
+
+
+def test_priority_and_round_robin() -> None:
+    """Test interactive requests go first, round robin across entries."""
+
+    async def _async_test() -> None:
+        scheduler = RequestScheduler(1200)
+        for _ in range(40):
+            await scheduler.async_acquire("entry", PRIORITY_INTERACTIVE)
+        order: list[str] = []
+
+        async def _request(entry_id: str, priority: int, name: str) -> None:
+            await scheduler.async_acquire(entry_id, priority)
+            order.append(name)
+
+        requests = []
+        for entry_id, priority, name in (
+            ("a", PRIORITY_BULK, "bulk"),
+            ("a", PRIORITY_INTERACTIVE, "a1"),
+            ("a", PRIORITY_INTERACTIVE, "a2"),
+            ("a", PRIORITY_INTERACTIVE, "a3"),
+            ("b", PRIORITY_INTERACTIVE, "b1"),
+        ):
+            requests.append(asyncio.create_task(_request(entry_id, priority, name)))
+            await asyncio.sleep(0)
+        assert scheduler.waiting == 5
+        await asyncio.wait_for(asyncio.gather(*requests), 2)
+        assert order == ["a1", "b1", "a2", "a3", "bulk"]
+        scheduler.close()
+
+    asyncio.run(_async_test())
+
+
+def test_cancelled_request_gives_up_its_place() -> None:
+    """Test a cancelled waiting request doesn't take a token."""
+
+    async def _async_test() -> None:
+        # 2 requests per second, with a burst of 4
+        scheduler = RequestScheduler(120)
+        for _ in range(4):
+            await scheduler.async_acquire("entry", PRIORITY_INTERACTIVE)
+        cancelled = asyncio.create_task(
+            scheduler.async_acquire("a", PRIORITY_INTERACTIVE)
+        )
+        waiting = asyncio.create_task(
+            scheduler.async_acquire("b", PRIORITY_INTERACTIVE)
+        )
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        start = time.monotonic()
+        await asyncio.wait_for(waiting, 2)
+        # The first token, after half a second, goes to the waiting request
+        assert time.monotonic() - start < 0.75
+        scheduler.close()
+
+    asyncio.run(_async_test())
+
+
+def test_resource_exhausted_pauses_and_retries() -> None:
+    """Test an exhausted quota pauses requests before the retry."""
+
+    async def _async_test() -> None:
+        scheduler = RequestScheduler(1200)
+        calls: list[float] = []
+
+        async def _call() -> str:
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                raise ResourceExhausted("quota")
+            return "done"
+
+        assert (
+            await scheduler.async_run("entry", PRIORITY_INTERACTIVE, _call, retries=1)
+            == "done"
+        )
+        assert calls[1] - calls[0] >= BACKOFF_INITIAL * 0.9
+
+        async def _exhausted() -> str:
+            raise ResourceExhausted("quota")
+
+        with pytest.raises(ResourceExhausted):
+            await scheduler.async_run("entry", PRIORITY_INTERACTIVE, _exhausted)
+        scheduler.close()
+
+    asyncio.run(_async_test())
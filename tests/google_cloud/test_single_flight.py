@@ -0,0 +1,137 @@
+"""Tests of sharing identical in-flight requests."""
+
+import asyncio
+
+from google_cloud.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_request() -> None:
+    """Test callers with the same key get the result of one request."""
+
+    async def _async_test() -> None:
+        single_flight: SingleFlight[str] = SingleFlight()
+        started = 0
+        release = asyncio.Event()
+
+        async def _work() -> str:
+            nonlocal started
+            started += 1
+            await release.wait()
+            return "audio"
+
+        callers = [
+            asyncio.create_task(single_flight.async_run("key", _work))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        assert await asyncio.gather(*callers) == ["audio"] * 3
+        assert started == 1
+        assert single_flight.as_dict() == {
+            "calls": 3,
+            "deduplicated": 2,
+            "in_flight": 0,
+        }
+
+    asyncio.run(_async_test())
+
+
+def test_error_reaches_every_caller() -> None:
+    """Test every caller gets the error of the shared request."""
+
+    async def _async_test() -> None:
+        single_flight: SingleFlight[str] = SingleFlight()
+
+        async def _work() -> str:
+            await asyncio.sleep(0)
+            raise ValueError("quota")
+
+        results = await asyncio.gather(
+            single_flight.async_run("key", _work),
+            single_flight.async_run("key", _work),
+            return_exceptions=True,
+        )
+        assert all(isinstance(result, ValueError) for result in results)
+
+    asyncio.run(_async_test())
+
+
+def test_finished_request_is_forgotten() -> None:
+    """Test a request is started again once the previous one finished."""
+
+    async def _async_test() -> None:
+        single_flight: SingleFlight[int] = SingleFlight()
+        started = 0
+
+        async def _work() -> int:
+            nonlocal started
+            started += 1
+            return started
+
+        assert await single_flight.async_run("key", _work) == 1
+        await asyncio.sleep(0)
+        assert single_flight.as_dict()["in_flight"] == 0
+        assert await single_flight.async_run("key", _work) == 2
+        assert single_flight.deduplicated == 0
+
+    asyncio.run(_async_test())
+
+
+def test_cancelled_caller_leaves_request_running() -> None:
+    """Test a cancelled caller doesn't cancel the request of the others."""
+
+    async def _async_test() -> None:
+        single_flight: SingleFlight[str] = SingleFlight()
+        release = asyncio.Event()
+
+        async def _work() -> str:
+            await release.wait()
+            return "audio"
+
+        first = asyncio.create_task(single_flight.async_run("key", _work))
+        second = asyncio.create_task(single_flight.async_run("key", _work))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        assert await second == "audio"
+        assert first.cancelled()
+
+    asyncio.run(_async_test())
+
+
+def test_last_waiter_cancellation_cancels_request() -> None:
+    """Test the request is cancelled and forgotten once nobody waits for it."""
+
+    async def _async_test() -> None:
+        single_flight: SingleFlight[str] = SingleFlight()
+        cancelled = asyncio.Event()
+        started = 0
+
+        async def _work() -> str:
+            nonlocal started
+            started += 1
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return "audio"
+
+        callers = [
+            asyncio.create_task(single_flight.async_run("key", _work))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        assert single_flight.as_dict()["in_flight"] == 0
+
+        async def _quick() -> str:
+            return "again"
+
+        # A new caller starts over instead of awaiting the cancelled request
+        assert await single_flight.async_run("key", _quick) == "again"
+
+    asyncio.run(_async_test())
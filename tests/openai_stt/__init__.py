@@ -0,0 +1 @@
+"""Tests of the OpenAI STT integration."""
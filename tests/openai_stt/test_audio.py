@@ -0,0 +1,39 @@
+"""Tests of the streaming PCM audio helpers."""
+import numpy as np
+
+from custom_components.openai_stt.audio import (
+    PCM_DTYPE,
+    PauseDetector,
+    PcmResampler,
+)
+
+
+def _tone(samples: int) -> bytes:
+    """Return a sine tone as mono 16-bit PCM."""
+    wave = np.sin(np.arange(samples) / 8) * 10000
+    return wave.astype(PCM_DTYPE).tobytes()
+
+
+def _chunked(audio: bytes, size: int) -> list[bytes]:
+    """Split audio into chunks of the given number of bytes."""
+    return [audio[start : start + size] for start in range(0, len(audio), size)]
+
+
+def test_resampler_odd_chunks() -> None:
+    """Test that chunks splitting a sample resample like whole samples."""
+    audio = _tone(1600)
+    even = PcmResampler(16000, 24000)
+    odd = PcmResampler(16000, 24000)
+    expected = b"".join(even.process(chunk) for chunk in _chunked(audio, 320))
+    assert b"".join(odd.process(chunk) for chunk in _chunked(audio, 321)) == expected
+
+
+def test_pause_detector_odd_chunks() -> None:
+    """Test that chunks splitting a sample are measured like whole samples."""
+    audio = _tone(8000) + bytes(16000)
+    even = PauseDetector(32000, -40, 0.3)
+    odd = PauseDetector(32000, -40, 0.3)
+    expected = [even.add(chunk) for chunk in _chunked(audio, 640)].index(True)
+    paused = [odd.add(chunk) for chunk in _chunked(audio, 641)].index(True)
+    assert odd.heard_speech
+    assert abs(paused * 641 - expected * 640) <= 641
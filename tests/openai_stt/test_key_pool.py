@@ -0,0 +1,133 @@
+"""Tests of the rate limit aware pool of OpenAI API keys."""
+import asyncio
+import time
+
+from custom_components.openai_stt.key_pool import (
+    BACKOFF_INITIAL,
+    BACKOFF_MAX,
+    ApiKeyPool,
+    PooledKey,
+    parse_api_keys,
+    parse_duration,
+)
+
+
+def _pool(count: int) -> ApiKeyPool:
+    """Return a pool of keys named key1, key2 and so on."""
+    return ApiKeyPool([PooledKey(f"key{number}") for number in range(1, count + 1)])
+
+
+def test_parse_duration() -> None:
+    """Test the durations of the rate limit reset headers."""
+    assert parse_duration("20ms") == 0.02
+    assert parse_duration("1s") == 1.0
+    assert parse_duration("6m0s") == 360.0
+    assert parse_duration("1h2m") == 3720.0
+    assert parse_duration("1.5") == 1.5
+    assert parse_duration("soon") is None
+    assert parse_duration(None) is None
+
+
+def test_parse_api_keys() -> None:
+    """Test keys are read one per line, with an optional organization."""
+    assert parse_api_keys("sk-1\n\n  sk-2 org-2 \n") == [
+        {"api_key": "sk-1", "organization": None},
+        {"api_key": "sk-2", "organization": "org-2"},
+    ]
+
+
+def test_acquire_key_with_most_headroom() -> None:
+    """Test requests go to the key with the most requests left."""
+
+    async def _async_test() -> None:
+        pool = _pool(3)
+        key1, key2, key3 = pool.keys
+        pool.update(key1, {"x-ratelimit-remaining-requests": "5"})
+        pool.update(key2, {"x-ratelimit-remaining-requests": "50"})
+        pool.update(key3, {"x-ratelimit-remaining-requests": "3"})
+        assert await pool.async_acquire() is key2
+        # Requests in flight count against the headroom
+        key2.in_flight = 47
+        assert await pool.async_acquire() is key1
+        pool.release(key1)
+        assert key1.in_flight == 0
+
+    asyncio.run(_async_test())
+
+
+def test_unknown_headroom_spreads_by_in_flight() -> None:
+    """Test keys without rate limit headers take turns."""
+
+    async def _async_test() -> None:
+        pool = _pool(2)
+        assert await pool.async_acquire() is pool.keys[0]
+        assert await pool.async_acquire() is pool.keys[1]
+
+    asyncio.run(_async_test())
+
+
+def test_exhausted_key_paused_until_reset() -> None:
+    """Test a key with no requests left is skipped until its limit resets."""
+
+    async def _async_test() -> None:
+        pool = _pool(2)
+        key1, key2 = pool.keys
+        pool.update(
+            key1,
+            {
+                "x-ratelimit-remaining-requests": "0",
+                "x-ratelimit-reset-requests": "50ms",
+            },
+        )
+        pool.update(key2, {"x-ratelimit-remaining-requests": "0"})
+        assert key1.paused_until > time.monotonic()
+        # Without a reset time the key isn't paused
+        assert await pool.async_acquire() is key2
+
+    asyncio.run(_async_test())
+
+
+def test_429_backoff() -> None:
+    """Test a throttled key backs off exponentially while the others serve."""
+
+    async def _async_test() -> None:
+        pool = _pool(2)
+        key1, key2 = pool.keys
+        pool.update(key1, {"x-ratelimit-remaining-requests": "100"})
+        pool.update(key2, {"x-ratelimit-remaining-requests": "10"})
+
+        now = time.monotonic()
+        pool.throttle(key1, {})
+        assert key1.paused_until - now >= BACKOFF_INITIAL
+        assert key1.backoff == BACKOFF_INITIAL * 2
+        assert await pool.async_acquire() is key2
+
+        # A longer retry-after is respected
+        pool.throttle(key1, {"retry-after": "10"})
+        assert key1.paused_until - time.monotonic() > 9
+        assert key1.backoff == BACKOFF_INITIAL * 4
+        assert key1.throttled == 2
+
+        for _ in range(10):
+            pool.throttle(key1, {})
+        assert key1.backoff == BACKOFF_MAX
+
+        pool.succeeded(key1)
+        assert key1.backoff == BACKOFF_INITIAL
+
+    asyncio.run(_async_test())
+
+
+def test_acquire_waits_while_all_keys_paused() -> None:
+    """Test acquiring waits for the first key to resume."""
+
+    async def _async_test() -> None:
+        pool = _pool(2)
+        key1, key2 = pool.keys
+        start = time.monotonic()
+        key1.paused_until = start + 0.1
+        key2.paused_until = start + 5
+        assert await asyncio.wait_for(pool.async_acquire(), 2) is key1
+        assert time.monotonic() - start >= 0.09
+
+    asyncio.run(_async_test())
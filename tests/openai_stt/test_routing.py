@@ -0,0 +1,97 @@
+"""Tests of routing transcriptions to a fast or an accurate model."""
+from custom_components.openai_stt.routing import (
+    MAX_SHORT_CLIP,
+    MIN_SHORT_CLIP,
+    ROUTE_LOAD,
+    ROUTE_LONG,
+    ROUTE_SHORT,
+    TUNING_SAMPLES,
+    TUNING_STEP,
+    LatencyHistogram,
+    ModelRouter,
+)
+
+
+def _router(short_clip: float = 4.0) -> ModelRouter:
+    """Return a router with a latency target of 2 seconds."""
+    return ModelRouter("fast", "accurate", short_clip, 2.0, max_load=2)
+
+
+def test_route_by_length_and_load() -> None:
+    """Test clips are routed by their length, and to the fast model under load."""
+    router = _router()
+    assert router.route(1.0) == (ROUTE_SHORT, "fast")
+    assert router.route(6.0) == (ROUTE_LONG, "accurate")
+    assert router.route(None) == (ROUTE_LONG, "accurate")
+    router.in_flight = 2
+    assert router.route(6.0) == (ROUTE_LOAD, "fast")
+    assert not router.should_retry(-2.0)
+    router.in_flight = 0
+    assert router.should_retry(-2.0)
+    assert not router.should_retry(-0.1)
+    assert not router.should_retry(None)
+
+
+def test_slow_accurate_model_raises_threshold() -> None:
+    """Test the threshold is raised when clips near it miss the target."""
+    router = _router()
+    for _ in range(TUNING_SAMPLES - 1):
+        router.record(ROUTE_LONG, 5.0, 3.0)
+    assert router.short_clip == 4.0
+    router.record(ROUTE_LONG, 5.0, 3.0)
+    assert router.short_clip == 4.0 * TUNING_STEP
+    assert router.adjustments == 1
+
+
+def test_fast_accurate_model_lowers_threshold() -> None:
+    """Test the threshold is lowered when clips near it are well within target."""
+    router = _router()
+    for _ in range(TUNING_SAMPLES):
+        router.record(ROUTE_LONG, 5.0, 0.5)
+    assert router.short_clip == 4.0 / TUNING_STEP
+
+
+def test_latency_within_target_keeps_threshold() -> None:
+    """Test the threshold is kept when clips near it meet the target."""
+    router = _router()
+    for _ in range(TUNING_SAMPLES):
+        router.record(ROUTE_LONG, 5.0, 1.5)
+    assert router.short_clip == 4.0
+    assert router.adjustments == 0
+
+
+def test_only_clips_near_threshold_tune() -> None:
+    """Test short clips and clips far above the threshold are not sampled."""
+    router = _router()
+    for _ in range(TUNING_SAMPLES):
+        router.record(ROUTE_SHORT, 1.0, 3.0)
+        router.record(ROUTE_LONG, 20.0, 3.0)
+        router.record(ROUTE_LONG, None, 3.0)
+    assert router.short_clip == 4.0
+    assert router.latency[ROUTE_LONG].count == TUNING_SAMPLES * 2
+
+
+def test_threshold_stays_within_bounds() -> None:
+    """Test tuning never moves the threshold past its bounds."""
+    router = _router(MAX_SHORT_CLIP)
+    for _ in range(TUNING_SAMPLES):
+        router.record(ROUTE_LONG, MAX_SHORT_CLIP, 10.0)
+    assert router.short_clip == MAX_SHORT_CLIP
+
+    router = _router(MIN_SHORT_CLIP)
+    for _ in range(TUNING_SAMPLES):
+        router.record(ROUTE_LONG, MIN_SHORT_CLIP, 0.1)
+    assert router.short_clip == MIN_SHORT_CLIP
+
+
+def test_latency_histogram() -> None:
+    """Test latencies are counted in buckets and reported in milliseconds."""
+    histogram = LatencyHistogram()
+    for latency in (0.1, 0.2, 0.6, 4.0):
+        histogram.record(latency)
+    assert histogram.percentile(0.5) == 0.25
+    assert histogram.percentile(0.9) == 5.0
+    report = histogram.as_dict()
+    assert report["count"] == 4
+    assert report["avg_ms"] == 1225.0
+    assert report["buckets"]["le_250ms"] == 2